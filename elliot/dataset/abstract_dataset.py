@@ -9,8 +9,9 @@ class ForceRequiredAttributeDefinitionMeta(type):
         return class_object
 
     def check_required_attributes(cls, class_object):
+        # lazily built attributes are class properties: checking them must not trigger their construction
         missing_attrs = [f"{attr}" for attr in class_object.required_attributes
-                         if not hasattr(class_object, attr)]
+                         if not isinstance(getattr(cls, attr, None), property) and not hasattr(class_object, attr)]
         if missing_attrs:
             raise NotImplementedError("class '%s' requires attribute%s %s" %
                                  (class_object.__class__.__name__, "s" * (len(missing_attrs) > 1),
@@ -0,0 +1,112 @@
+"""
+Module description:
+
+"""
+
+__version__ = '0.3.1'
+__author__ = 'Vito Walter Anelli, Claudio Pomo'
+__email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
+
+import numpy as np
+import scipy.sparse as sp
+
+
+class CandidateMask(object):
+    """
+    Boolean users x items candidate mask backed by a CSR matrix.
+
+    It replaces the dense allunrated/test/validation masks: rows are densified only when they are
+    requested, so mask[offset:offset_stop] costs a batch x items block and mask[user] a single row.
+    With complement=True the candidates are the cells that are *not* stored in the matrix (e.g. the
+    items a user did not rate in the training set).
+    """
+
+    def __init__(self, matrix: sp.spmatrix, complement: bool = False):
+        matrix = sp.csr_matrix(matrix, dtype=bool)
+        matrix.eliminate_zeros()
+        matrix.sort_indices()
+        self._set_matrix(matrix, complement)
+
+    @classmethod
+    def from_csr(cls, matrix: sp.csr_matrix, complement: bool = False):
+        """
+        Wrap a boolean CSR matrix in canonical format (sorted indices, no explicit zeros) without copying it,
+        e.g. a matrix backed by memory-mapped arrays
+        """
+        mask = cls.__new__(cls)
+        mask._set_matrix(matrix, complement)
+        return mask
+
+    def _set_matrix(self, matrix: sp.csr_matrix, complement: bool):
+        self._matrix = matrix
+        self._complement = complement
+        self.shape = self._matrix.shape
+        self.ndim = 2
+        self.dtype = np.dtype(bool)
+
+    @property
+    def matrix(self) -> sp.csr_matrix:
+        return self._matrix
+
+    @property
+    def complement(self) -> bool:
+        return self._complement
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            rows, cols = key
+            if isinstance(rows, (int, np.integer)):
+                if isinstance(cols, (int, np.integer)):
+                    return self.is_candidate(rows, cols)
+                return self.user_row(rows)[cols]
+            return self[rows][:, cols]
+        if isinstance(key, (int, np.integer)):
+            return self.user_row(key)
+        if isinstance(key, slice) and key.step in (None, 1):
+            start, stop, _ = key.indices(self.shape[0])
+            return self._densify(self._matrix[start:stop])
+        return self._densify(self._matrix[key])
+
+    def is_candidate(self, user: int, item: int) -> bool:
+        indices = self._matrix.indices[self._matrix.indptr[user]:self._matrix.indptr[user + 1]]
+        pos = np.searchsorted(indices, item)
+        stored = pos < len(indices) and indices[pos] == item
+        return bool(stored) != self._complement
+
+    def are_candidates(self, users, items) -> np.ndarray:
+        """Element-wise candidate check of the (users[n], items[n]) pairs"""
+        if not len(users):
+            return np.zeros(0, dtype=bool)
+        stored = np.asarray(self._matrix[users, items]).ravel()
+        return stored != self._complement
+
+    def user_row(self, user: int) -> np.ndarray:
+        if user < 0:
+            user += self.shape[0]
+        row = np.full(self.shape[1], self._complement, dtype=bool)
+        row[self._matrix.indices[self._matrix.indptr[user]:self._matrix.indptr[user + 1]]] = not self._complement
+        return row
+
+    def _densify(self, sub: sp.csr_matrix) -> np.ndarray:
+        block = np.full(sub.shape, self._complement, dtype=bool)
+        block[np.repeat(np.arange(sub.shape[0]), np.diff(sub.indptr)), sub.indices] = not self._complement
+        return block
+
+    def user_candidates(self, user: int) -> np.ndarray:
+        """Sorted internal ids of the candidate items of a user"""
+        stored = self._matrix.indices[self._matrix.indptr[user]:self._matrix.indptr[user + 1]]
+        if not self._complement:
+            return stored
+        return np.setdiff1d(np.arange(self.shape[1]), stored, assume_unique=True)
+
+    def count_nonzero(self, axis=None):
+        stored = np.diff(self._matrix.indptr)
+        per_user = self.shape[1] - stored if self._complement else stored
+        return per_user if axis == 1 else int(per_user.sum())
+
+    def __array__(self, dtype=None, copy=None):
+        dense = self._densify(self._matrix)
+        return dense if dtype is None else dense.astype(dtype)
@@ -9,6 +9,7 @@ __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 
 import copy
 import os
+from itertools import chain
 from types import SimpleNamespace
 
 import numpy as np
@@ -18,10 +19,14 @@ import typing as t
 import logging as pylog
 
 from elliot.dataset.abstract_dataset import AbstractDataset
+from elliot.dataset.candidate_mask import CandidateMask
+from elliot.dataset.dataset_cache import DataSetCache
+from elliot.dataset.interactions_reader import InteractionsReader
 from elliot.splitter.base_splitter import Splitter
 from elliot.prefiltering.standard_prefilters import PreFilter
 from elliot.negative_sampling.negative_sampling import NegativeSampler
 from elliot.utils import logging
+from elliot.utils.read import find_interactions
 
 from elliot.dataset.modular_loaders.loader_coordinator_mixin import LoaderCoordinator
 
@@ -43,15 +48,27 @@ class DataSetLoader(LoaderCoordinator):
         self.kwargs = kwargs
         self.config = config
         self.column_names = ['userId', 'itemId', 'rating', 'timestamp']
+        self._cache = None
+        self._cached = None
         if config.config_test:
             return
+        if DataSetCache.is_enabled(config):
+            self._cache = DataSetCache(config)
+            self._cached = self._cache.load()
+            if self._cached:
+                self.logger.info(f"Datasets loaded from cache {self._cache.folder}")
+                self.side_information = SimpleNamespace()
+                if self._cached[1]:
+                    self.disable_paired_tests()
+                return
+        self._reader = InteractionsReader.from_config(config, self.column_names, self.logger)
         if config.data_config.strategy == "fixed":
             path_train_data = config.data_config.train_path
             path_val_data = getattr(config.data_config, "validation_path", None)
             path_test_data = config.data_config.test_path
 
-            self.train_dataframe = pd.read_csv(path_train_data, sep="\t", header=None, names=self.column_names)
-            self.test_dataframe = pd.read_csv(path_test_data, sep="\t", header=None, names=self.column_names)
+            self.train_dataframe = self._reader.read(path_train_data)
+            self.test_dataframe = self._reader.read(path_test_data)
 
             # self.train_dataframe, self.side_information = self.coordinate_information(self.train_dataframe, sides=config.data_config.side_information)
             # self.train_dataframe = pd.read_csv(path_train_data, sep="\t", header=None, names=self.column_names)
@@ -67,7 +84,7 @@ class DataSetLoader(LoaderCoordinator):
                 self.train_dataframe["rating"] = 1
 
             if path_val_data:
-                self.validation_dataframe = pd.read_csv(path_val_data, sep="\t", header=None, names=self.column_names)
+                self.validation_dataframe = self._reader.read(path_val_data)
                 self.validation_dataframe = self.check_timestamp(self.validation_dataframe)
 
                 if config.binarize == True or all(self.train_dataframe["rating"].isna()):
@@ -93,7 +110,7 @@ class DataSetLoader(LoaderCoordinator):
             self.logger.info("There will be the splitting")
             path_dataset = config.data_config.dataset_path
 
-            self.dataframe = pd.read_csv(path_dataset, sep="\t", header=None, names=self.column_names)
+            self.dataframe = self._reader.read(path_dataset)
             self.dataframe, self.side_information = self.coordinate_information(self.dataframe,
                                                                                 sides=config.data_config.side_information,
                                                                                 logger=self.logger)
@@ -115,10 +132,13 @@ class DataSetLoader(LoaderCoordinator):
             raise Exception("Strategy option not recognized")
 
         if isinstance(self.tuple_list[0][1], list):
-            self.logger.warning("You are using a splitting strategy with folds. "
-                                "Paired TTest and Wilcoxon Test are not available!")
-            self.config.evaluation.paired_ttest = False
-            self.config.evaluation.wilcoxon_test = False
+            self.disable_paired_tests()
+
+    def disable_paired_tests(self):
+        self.logger.warning("You are using a splitting strategy with folds. "
+                            "Paired TTest and Wilcoxon Test are not available!")
+        self.config.evaluation.paired_ttest = False
+        self.config.evaluation.wilcoxon_test = False
 
     def check_timestamp(self, d: pd.DataFrame) -> pd.DataFrame:
         if all(d["timestamp"].isna()):
@@ -129,20 +149,22 @@ class DataSetLoader(LoaderCoordinator):
         tuple_list = []
         for dirs in os.listdir(folder_path):
             for test_dir in dirs:
-                test_ = pd.read_csv(os.sep.join([folder_path, test_dir, "test.tsv"]), sep="\t", names=self.column_names)
+                test_ = self._reader.read(find_interactions(os.sep.join([folder_path, test_dir]), "test"))
                 val_dirs = [os.sep.join([folder_path, test_dir, val_dir]) for val_dir in os.listdir(os.sep.join([folder_path, test_dir])) if os.path.isdir(os.sep.join([folder_path, test_dir, val_dir]))]
                 val_list = []
                 for val_dir in val_dirs:
-                    train_ = pd.read_csv(os.sep.join([val_dir, "train.tsv"]), sep="\t", names=self.column_names)
-                    val_ = pd.read_csv(os.sep.join([val_dir, "val.tsv"]), sep="\t", names=self.column_names)
+                    train_ = self._reader.read(find_interactions(val_dir, "train"))
+                    val_ = self._reader.read(find_interactions(val_dir, "val"))
                     val_list.append((train_, val_))
                 if not val_list:
-                    val_list = pd.read_csv(os.sep.join([folder_path, test_dir, "train.tsv"]), sep="\t", names=self.column_names)
+                    val_list = self._reader.read(find_interactions(os.sep.join([folder_path, test_dir]), "train"))
                 tuple_list.append((val_list, test_))
 
         return tuple_list
 
     def generate_dataobjects(self) -> t.List[object]:
+        if self._cached:
+            return self.generate_cached_dataobjects()
         data_list = []
         for p1, (train_val, test) in enumerate(self.tuple_list):
             # testset level
@@ -159,6 +181,23 @@ class DataSetLoader(LoaderCoordinator):
                 single_dataobject = DataSet(self.config, (train_val, test), self.side_information, self.args,
                                                               self.kwargs)
                 data_list.append([single_dataobject])
+        if self._cache:
+            self._cache.store([[d.to_arrays() for d in val_list] for val_list in data_list],
+                              isinstance(self.tuple_list[0][1], list))
+            self.logger.info(f"Datasets stored in cache {self._cache.folder}")
+        return data_list
+
+    def generate_cached_dataobjects(self) -> t.List[object]:
+        data_list = []
+        for p1, val_arrays in enumerate(self._cached[0]):
+            val_list = []
+            for p2, arrays in enumerate(val_arrays):
+                self.logger.info(f"Test Fold {p1} - Validation Fold {p2}" if len(val_arrays) > 1 else f"Test Fold {p1}")
+                single_dataobject = DataSet.from_arrays(self.config, arrays, self.side_information, self.args,
+                                                        self.kwargs)
+                single_dataobject.write_negative_samples()
+                val_list.append(single_dataobject)
+            data_list.append(val_list)
         return data_list
 
     def generate_dataobjects_mock(self) -> t.List[object]:
@@ -197,25 +236,21 @@ class DataSet(AbstractDataset):
         else:
             self.side_information = side_information_data
 
-        self.train_dict = self.dataframe_to_dict(data_tuple[0])
-
-        self.users = list(self.train_dict.keys())
-        self.items = list({k for a in self.train_dict.values() for k in a.keys()})
-        self.num_users = len(self.users)
-        self.num_items = len(self.items)
-        self.transactions = sum(len(v) for v in self.train_dict.values())
-
-        sparsity = 1 - (self.transactions / (self.num_users * self.num_items))
-        self.logger.info(f"Statistics\tUsers:\t{self.num_users}\tItems:\t{self.num_items}\tTransactions:\t{self.transactions}\t"
-                         f"Sparsity:\t{sparsity}")
+        self._train_dict = None
+        self._i_train_dict = None
+        self._train_columns = self.factorize_interactions(data_tuple[0])
 
-        self.private_users = {p: u for p, u in enumerate(self.users)}
-        self.public_users = {v: k for k, v in self.private_users.items()}
-        self.private_items = {p: i for p, i in enumerate(self.items)}
-        self.public_items = {v: k for k, v in self.private_items.items()}
+        self.users = self._train_columns.users
+        # same item order the legacy set comprehension over train_dict produced
+        _, first_occurrence = np.unique(self._train_columns.item_codes, return_index=True)
+        self.items = list(set(self._train_columns.item_uniques[
+                                  self._train_columns.item_codes[np.sort(first_occurrence)]].tolist()))
+        self.build_indices()
 
-        self.i_train_dict = {self.public_users[user]: {self.public_items[i]: v for i, v in items.items()}
-                                for user, items in self.train_dict.items()}
+        # factorization codes are already public user indices, item codes must be remapped on the public item order
+        self._train_columns.item_codes = pd.Index(self.items).get_indexer(
+            self._train_columns.item_uniques)[self._train_columns.item_codes]
+        self._train_columns.item_uniques = np.asarray(self.items)
 
         self.sp_i_train = self.build_sparse()
         self.sp_i_train_ratings = self.build_sparse_ratings()
@@ -228,7 +263,8 @@ class DataSet(AbstractDataset):
                                                                            self.sp_i_train, None, self.test_dict)
                 sp_i_test = self.to_bool_sparse(self.test_dict)
                 test_candidate_items = test_neg_samples + sp_i_test
-                self.test_mask = np.where((test_candidate_items.toarray() == True), True, False)
+                self.test_mask = CandidateMask(test_candidate_items)
+                self.keep_negative_samples(test_neg_samples)
         else:
             self.val_dict = self.build_dict(data_tuple[1], self.users)
             self.test_dict = self.build_dict(data_tuple[2], self.users)
@@ -239,45 +275,269 @@ class DataSet(AbstractDataset):
                 sp_i_val = self.to_bool_sparse(self.val_dict)
                 sp_i_test = self.to_bool_sparse(self.test_dict)
                 val_candidate_items = val_neg_samples + sp_i_val
-                self.val_mask = np.where((val_candidate_items.toarray() == True), True, False)
+                self.val_mask = CandidateMask(val_candidate_items)
                 test_candidate_items = test_neg_samples + sp_i_test
-                self.test_mask = np.where((test_candidate_items.toarray() == True), True, False)
+                self.test_mask = CandidateMask(test_candidate_items)
+                self.keep_negative_samples(test_neg_samples)
 
-        self.allunrated_mask = np.where((self.sp_i_train.toarray() == 0), True, False)
+        self.allunrated_mask = CandidateMask(self.sp_i_train, complement=True)
 
-    def dataframe_to_dict(self, data):
-        users = list(data['userId'].unique())
+    @classmethod
+    def from_arrays(cls, config, arrays, side_information_data, *args, **kwargs):
+        """
+        Rebuild a DataSet from the arrays of to_arrays, without factorizing and sampling the data again
+        :param arrays: dictionary of arrays, e.g. loaded from a DataSetCache
+        """
+        self = cls.__new__(cls)
+        self.logger = logging.get_logger(cls.__name__, pylog.CRITICAL if config.config_test else pylog.DEBUG)
+        self.config = config
+        self.args = args
+        self.kwargs = kwargs
+        self.side_information = side_information_data
+
+        self._train_dict = None
+        self._i_train_dict = None
+        self.users = list(arrays["users"])
+        self.items = arrays["items"].tolist()
+        self._train_columns = SimpleNamespace(users=self.users,
+                                              item_uniques=arrays["items"],
+                                              user_codes=arrays["user_codes"],
+                                              item_codes=arrays["item_codes"],
+                                              ratings=arrays["ratings"])
+        self.build_indices()
+
+        shape = (self.num_users, self.num_items)
+        if "sp_i_train_indptr" in arrays:
+            self.sp_i_train = self.csr_from_arrays(arrays, "sp_i_train", shape)
+            self.sp_i_train_ratings = self.csr_from_arrays(arrays, "sp_i_train_ratings", shape)
+        else:
+            self.sp_i_train = self.build_sparse()
+            self.sp_i_train_ratings = self.build_sparse_ratings()
+
+        self.test_dict = self.arrays_to_dict(arrays, "test", self.users)
+        if "val_indptr" in arrays:
+            self.val_dict = self.arrays_to_dict(arrays, "val", self.users)
+        for name in ["val_mask", "test_mask", "test_negatives"]:
+            if f"{name}_indptr" in arrays:
+                if f"{name}_data" not in arrays:
+                    arrays = dict(arrays, **{f"{name}_data": np.ones(len(arrays[f"{name}_indices"]), dtype=bool)})
+                matrix = self.csr_from_arrays(arrays, name, shape)
+                if name == "test_negatives":
+                    self._test_negatives = matrix
+                else:
+                    setattr(self, name, CandidateMask.from_csr(matrix))
+
+        if "allunrated_mask_indptr" in arrays:
+            self.allunrated_mask = CandidateMask.from_csr(self.csr_from_arrays(arrays, "allunrated_mask", shape),
+                                                          complement=True)
+        else:
+            self.allunrated_mask = CandidateMask(self.sp_i_train, complement=True)
+        return self
+
+    @staticmethod
+    def csr_from_arrays(arrays, name, shape):
+        return sp.csr_matrix((arrays[f"{name}_data"], arrays[f"{name}_indices"], arrays[f"{name}_indptr"]),
+                             shape=shape, copy=False)
+
+    def share(self, folder: str):
+        """
+        Export the arrays of the DataSet (id maps, train matrices, candidate masks, test and validation
+        triples) to .npy files of folder. From then on, a pickled DataSet only carries the folder: the
+        unpickled copy, e.g. in the worker processes of a JobScheduler, maps the files copy-on-write instead
+        of receiving the arrays. A folder under /dev/shm keeps the files in POSIX shared memory.
+        :param folder: destination folder, reserved to this DataSet
+        """
+        arrays = self.to_arrays()
+        for name in ["sp_i_train", "sp_i_train_ratings", "val_mask", "test_mask", "allunrated_mask"]:
+            matrix = getattr(self, name, None)
+            if isinstance(matrix, CandidateMask):
+                matrix = matrix.matrix
+            if matrix is not None:
+                arrays[f"{name}_indptr"] = matrix.indptr
+                arrays[f"{name}_indices"] = matrix.indices
+                arrays[f"{name}_data"] = matrix.data
+        os.makedirs(folder, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.sep.join([folder, f"{name}.npy"]), array)
+        self._shared_folder = os.path.abspath(folder)
+
+    @classmethod
+    def attach(cls, folder: str, config, side_information_data, args=(), kwargs=None):
+        """
+        Rebuild a DataSet exported with share on memory-mapped arrays
+        """
+        arrays = {}
+        for file_name in os.listdir(folder):
+            if file_name.endswith(".npy"):
+                path = os.sep.join([folder, file_name])
+                try:
+                    arrays[file_name[:-4]] = np.load(path, mmap_mode="c")
+                except ValueError:
+                    # -- arrays of Python objects (e.g. mixed type ids) cannot be mapped
+                    arrays[file_name[:-4]] = np.load(path, allow_pickle=True)
+        self = cls.from_arrays(config, arrays, side_information_data, *args, **(kwargs or {}))
+        self._shared_folder = folder
+        return self
+
+    def __reduce_ex__(self, protocol):
+        shared_folder = getattr(self, "_shared_folder", None)
+        if shared_folder is None:
+            return super().__reduce_ex__(protocol)
+        return DataSet.attach, (shared_folder, self.config, self.side_information, self.args, self.kwargs)
+
+    def to_arrays(self) -> t.Dict[str, np.ndarray]:
+        """
+        Arrays the DataSet can be rebuilt from with from_arrays
+        """
+        arrays = {"users": np.asarray(self.users),
+                  "items": np.asarray(self.items),
+                  "user_codes": self._train_columns.user_codes,
+                  "item_codes": self._train_columns.item_codes,
+                  "ratings": self._train_columns.ratings}
+        for name, ratings in [("val", self.get_validation()), ("test", self.test_dict)]:
+            if ratings is not None:
+                arrays.update(self.dict_to_arrays(ratings, self.users, name))
+        for name in ["val_mask", "test_mask"]:
+            mask = getattr(self, name, None)
+            if mask is not None:
+                arrays[f"{name}_indptr"] = mask.matrix.indptr
+                arrays[f"{name}_indices"] = mask.matrix.indices
+        negatives = getattr(self, "_test_negatives", None)
+        if negatives is not None:
+            arrays["test_negatives_indptr"] = negatives.indptr
+            arrays["test_negatives_indices"] = negatives.indices
+        return arrays
+
+    def keep_negative_samples(self, negative_items: sp.csr_matrix):
+        """
+        Keep the test negatives of the random strategy, written to its file_path while sampling,
+        so that a DataSet restored from the cache can write the same file again
+        """
+        if getattr(self.config.negative_sampling, "strategy", None) == "random":
+            negative_items = sp.csr_matrix(negative_items, dtype=bool)
+            negative_items.sort_indices()
+            self._test_negatives = negative_items
+
+    def write_negative_samples(self):
+        """
+        Write the kept negatives to the file_path of the random strategy, as the sampling did
+        """
+        negatives = getattr(self, "_test_negatives", None)
+        if negatives is not None:
+            NegativeSampler.write_to_file(negatives, self.private_users, self.private_items,
+                                          self.config.negative_sampling.file_path)
+
+    @staticmethod
+    def dict_to_arrays(ratings: t.Dict, users, name: str) -> t.Dict[str, np.ndarray]:
+        """
+        Store a {user: {item: rating}} dictionary of build_dict in CSR layout: the ratings of users[n] are
+        the entries indptr[n]:indptr[n + 1] of the items and ratings arrays
+        """
+        rows = [ratings.get(u, {}) for u in users]
+        lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+        return {f"{name}_indptr": np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+                f"{name}_items": np.asarray(list(chain.from_iterable(rows))),
+                f"{name}_ratings": np.asarray(list(chain.from_iterable(map(dict.values, rows))), dtype=np.float64)}
+
+    @staticmethod
+    def arrays_to_dict(arrays, name, users) -> t.Dict:
+        """
+        Rebuild the {user: {item: rating}} dictionary of build_dict from its arrays in CSR layout
+        """
+        indptr = arrays[f"{name}_indptr"].tolist()
+        items = arrays[f"{name}_items"].tolist()
+        ratings = arrays[f"{name}_ratings"].tolist()
+        return {u: dict(zip(items[start:stop], ratings[start:stop]))
+                for u, start, stop in zip(users, indptr[:-1], indptr[1:])}
+
+    def build_indices(self):
+        self.num_users = len(self.users)
+        self.num_items = len(self.items)
+        self.transactions = len(self._train_columns.ratings)
 
+        sparsity = 1 - (self.transactions / (self.num_users * self.num_items))
+        self.logger.info(f"Statistics\tUsers:\t{self.num_users}\tItems:\t{self.num_items}\tTransactions:\t{self.transactions}\t"
+                         f"Sparsity:\t{sparsity}")
+
+        self.private_users = {p: u for p, u in enumerate(self.users)}
+        self.public_users = {v: k for k, v in self.private_users.items()}
+        self.private_items = {p: i for p, i in enumerate(self.items)}
+        self.public_items = {v: k for k, v in self.private_items.items()}
+
+    @property
+    def train_dict(self):
+        if self._train_dict is None:
+            self._train_dict = self.columns_to_dict(self._train_columns, self.users, self.items)
+        return self._train_dict
+
+    @property
+    def i_train_dict(self):
+        if self._i_train_dict is None:
+            self._i_train_dict = self.columns_to_dict(self._train_columns, range(self.num_users),
+                                                      range(self.num_items))
+        return self._i_train_dict
+
+    @staticmethod
+    def factorize_interactions(data):
+        """
+        Factorize user and item ids once and deduplicate the (user, item) pairs
+        :param data: dataframe with userId, itemId and rating columns
+        :return: namespace of user-grouped interaction columns, users and items ordered by first appearance
+        """
+        user_codes, user_uniques = pd.factorize(data['userId'])
+        item_codes, item_uniques = pd.factorize(data['itemId'])
+        ratings = data['rating'].to_numpy()
+
+        # a repeated pair keeps the position of its first occurrence and the rating of its last one
+        keys = user_codes.astype(np.int64) * len(item_uniques) + item_codes
+        _, first = np.unique(keys, return_index=True)
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last
+        by_row = np.argsort(first, kind='stable')
+        first, last = first[by_row], last[by_row]
+        by_user = np.argsort(user_codes[first], kind='stable')
+        first, last = first[by_user], last[by_user]
+
+        return SimpleNamespace(users=list(np.asarray(user_uniques)),
+                               item_uniques=np.asarray(item_uniques),
+                               user_codes=user_codes[first],
+                               item_codes=item_codes[first],
+                               ratings=ratings[last])
+
+    @staticmethod
+    def columns_to_dict(columns, users, items):
+        """
+        Build the nested {user: {item: rating}} dictionary from factorized interaction columns
+        """
+        boundaries = np.flatnonzero(np.diff(columns.user_codes)) + 1
+        item_codes = np.split(columns.item_codes, boundaries)
+        ratings = np.split(columns.ratings, boundaries)
+        return {users[u_items[0]]: dict(zip(map(items.__getitem__, i_codes.tolist()), u_ratings.tolist()))
+                for u_items, i_codes, u_ratings in zip(np.split(columns.user_codes, boundaries), item_codes, ratings)
+                if len(u_items)}
+
+    def dataframe_to_dict(self, data):
         "Conversion to Dictionary"
-        ratings = {}
-        for u in users:
-            sel_ = data[data['userId'] == u]
-            ratings[u] = dict(zip(sel_['itemId'], sel_['rating']))
-        return ratings
+        columns = self.factorize_interactions(data)
+        return self.columns_to_dict(columns, columns.users, columns.item_uniques.tolist())
 
     def build_dict(self, dataframe, users):
-        ratings = {}
-        for u in users:
-            sel_ = dataframe[dataframe['userId'] == u]
-            ratings[u] = dict(zip(sel_['itemId'], sel_['rating']))
+        ratings = {u: {} for u in users}
+        for u, i, r in zip(dataframe['userId'].tolist(), dataframe['itemId'].tolist(), dataframe['rating'].tolist()):
+            user_ratings = ratings.get(u)
+            if user_ratings is not None:
+                user_ratings[i] = r
         return ratings
 
     def build_sparse(self):
-
-        rows_cols = [(u, i) for u, items in self.i_train_dict.items() for i in items.keys()]
-        rows = [u for u, _ in rows_cols]
-        cols = [i for _, i in rows_cols]
-        data = sp.csr_matrix((np.ones_like(rows), (rows, cols)), dtype='float32',
+        data = sp.csr_matrix((np.ones(self.transactions),
+                              (self._train_columns.user_codes, self._train_columns.item_codes)), dtype='float32',
                              shape=(len(self.users), len(self.items)))
         return data
 
     def build_sparse_ratings(self):
-        rows_cols_ratings = [(u, i, r) for u, items in self.i_train_dict.items() for i, r in items.items()]
-        rows = [u for u, _, _ in rows_cols_ratings]
-        cols = [i for _, i, _ in rows_cols_ratings]
-        ratings = [r for _, _, r in rows_cols_ratings]
-
-        data = sp.csr_matrix((ratings, (rows, cols)), dtype='float32',
+        data = sp.csr_matrix((self._train_columns.ratings,
+                              (self._train_columns.user_codes, self._train_columns.item_codes)), dtype='float32',
                              shape=(len(self.users), len(self.items)))
 
         return data
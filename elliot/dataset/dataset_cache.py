@@ -0,0 +1,125 @@
+"""
+Module description:
+
+"""
+
+__version__ = '0.3.1'
+__author__ = 'Vito Walter Anelli, Claudio Pomo'
+__email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
+
+import hashlib
+import json
+import os
+import typing as t
+from types import SimpleNamespace
+
+import numpy as np
+
+_sections = ["data_config", "splitting", "prefiltering", "binarize", "negative_sampling", "random_seed"]
+# version of the archive layout, part of the fingerprint so that archives of older layouts are rebuilt
+_format = 3
+
+
+def _to_builtin(obj):
+    if isinstance(obj, SimpleNamespace):
+        obj = vars(obj)
+    if isinstance(obj, dict):
+        return {str(k): _to_builtin(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_builtin(v) for v in obj]
+    return obj
+
+
+class DataSetCache(object):
+    """
+    On-disk cache of the DataSet objects built by DataSetLoader.
+
+    Every DataSet is stored as an NPZ archive of its arrays (id maps, train interactions, test and
+    validation triples, candidate masks of the negative sampling) in a folder named after a hash of
+    the input files (path, size and modification time) and of the configuration sections that affect
+    loading, filtering and splitting. A repeated experiment rebuilds the DataSets from the archives
+    without reading, filtering or splitting the data again.
+    """
+
+    def __init__(self, config):
+        data_config = config.data_config
+        folder = getattr(data_config, "cache", False)
+        if not isinstance(folder, str):
+            folder = os.path.abspath(os.sep.join([config.path_output_rec_result, "..", "dataset_cache"]))
+        self._folder = os.sep.join([folder, self.fingerprint(config)])
+
+    @staticmethod
+    def is_enabled(config) -> bool:
+        data_config = config.data_config
+        return bool(getattr(data_config, "cache", False)) and not data_config.side_information \
+               and data_config.dataloader == "DataSetLoader"
+
+    @staticmethod
+    def input_files(config) -> t.List[str]:
+        data_config = config.data_config
+        if data_config.strategy == "fixed":
+            paths = [data_config.train_path, getattr(data_config, "validation_path", None), data_config.test_path]
+        elif data_config.strategy == "dataset":
+            paths = [data_config.dataset_path]
+        elif data_config.strategy == "hierarchy":
+            paths = [os.sep.join([root, f]) for root, _, files in os.walk(data_config.root_folder) for f in files]
+        else:
+            paths = []
+        negative_files = getattr(getattr(config, "negative_sampling", None), "files", None) or []
+        paths.extend(negative_files if isinstance(negative_files, list) else [negative_files])
+        return sorted(os.path.abspath(p) for p in paths if p)
+
+    @classmethod
+    def fingerprint(cls, config) -> str:
+        files = []
+        for path in cls.input_files(config):
+            stat = os.stat(path)
+            files.append([path, stat.st_size, stat.st_mtime_ns])
+        sections = {s: _to_builtin(getattr(config, s, None)) for s in _sections}
+        sections["data_config"] = {k: v for k, v in sections["data_config"].items() if k != "cache"}
+        description = json.dumps({"files": files, "sections": sections, "format": _format}, sort_keys=True,
+                                 default=str)
+        return hashlib.sha1(description.encode("utf-8")).hexdigest()
+
+    @property
+    def folder(self) -> str:
+        return self._folder
+
+    def load(self) -> t.Optional[t.Tuple[t.List[t.List[t.Dict]], bool]]:
+        """
+        :return: the arrays of the DataSets, grouped by test fold, and the folds flag of the loader,
+        None if the cache does not hold this configuration
+        """
+        meta_path = os.sep.join([self._folder, "meta.json"])
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as meta_file:
+            meta = json.load(meta_file)
+        data_list = []
+        for p1, n_folds in enumerate(meta["folds"]):
+            val_list = []
+            for p2 in range(n_folds):
+                with np.load(self._fold_path(p1, p2), allow_pickle=True) as archive:
+                    val_list.append({k: archive[k] for k in archive.files})
+            data_list.append(val_list)
+        return data_list, meta["multiple_tests"]
+
+    def store(self, data_list: t.List[t.List[t.Dict]], multiple_tests: bool):
+        """
+        :param data_list: the arrays of the DataSets, grouped by test fold
+        :param multiple_tests: folds flag of the loader, restored with the DataSets
+        """
+        os.makedirs(self._folder, exist_ok=True)
+        for p1, val_list in enumerate(data_list):
+            for p2, arrays in enumerate(val_list):
+                path = self._fold_path(p1, p2)
+                with open(path + ".tmp", "wb") as archive:
+                    np.savez(archive, **arrays)
+                os.replace(path + ".tmp", path)
+        # -- meta is written last: an interrupted store is never read back
+        with open(os.sep.join([self._folder, "meta.json"]), "w") as meta_file:
+            json.dump({"folds": [len(val_list) for val_list in data_list], "multiple_tests": multiple_tests},
+                      meta_file)
+
+    def _fold_path(self, p1: int, p2: int) -> str:
+        return os.sep.join([self._folder, f"dataset_{p1}_{p2}.npz"])
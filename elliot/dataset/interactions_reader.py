@@ -0,0 +1,230 @@
+"""
+Module description:
+
+"""
+
+__version__ = '0.3.1'
+__author__ = 'Vito Walter Anelli, Claudio Pomo'
+__email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
+
+import typing as t
+
+import numpy as np
+import pandas as pd
+
+from elliot.utils.read import interactions_format
+
+_id_columns = ['userId', 'itemId']
+_int32 = np.iinfo(np.int32)
+
+# bytes of text per row, used to turn chunk_size into the block size of the pyarrow reader
+_pyarrow_row_bytes = 32
+
+class IdFactorizer(object):
+    """
+    Incremental factorization of the non-numeric ids of the interaction files.
+
+    Ids are fed chunk by chunk and file by file, and get their codes in order of first appearance, as
+    pd.factorize over the concatenated chunks would give. Every id is stored once: the id columns of all
+    the chunks and files read by the same reader reference the same objects, instead of one string per row.
+    """
+
+    def __init__(self):
+        self._codes = {}
+        self._uniques = []
+
+    def __len__(self):
+        return len(self._uniques)
+
+    @property
+    def uniques(self) -> np.ndarray:
+        return np.array(self._uniques, dtype=object)
+
+    def add(self, values) -> t.Tuple[np.ndarray, np.ndarray]:
+        """
+        :param values: raw ids of a chunk
+        :return: codes of the values (-1 for missing ones) and the shared id objects of the values
+        """
+        chunk_codes, chunk_uniques = pd.factorize(values)
+        mapping = np.empty(len(chunk_uniques), dtype=np.int64)
+        shared = np.empty(len(chunk_uniques), dtype=object)
+        # -- the Python loop only runs on the distinct ids of the chunk
+        for position, value in enumerate(chunk_uniques.tolist()):
+            code = self._codes.get(value)
+            if code is None:
+                code = len(self._uniques)
+                self._codes[value] = code
+                self._uniques.append(value)
+            mapping[position] = code
+            shared[position] = self._uniques[code]
+        ids = shared[chunk_codes]
+        ids[chunk_codes < 0] = np.nan
+        return np.where(chunk_codes < 0, -1, mapping[chunk_codes]), ids
+
+
+def _id_text(values: pd.Series) -> pd.Series:
+    """
+    Ids of a chunk as text, the way they read in the file: missing ids stay missing
+    """
+    text = values.astype(object)
+    present = text.notna()
+    if values.dtype.kind == "f":
+        # -- integer ids of a chunk with missing ones are parsed as floats: 12.0 reads 12
+        text[present] = [str(int(v)) if float(v).is_integer() else str(v) for v in text[present]]
+    else:
+        text[present] = text[present].map(str)
+    return text
+
+
+class InteractionsReader(object):
+    """
+    Typed reader of the tab separated interaction files (userId, itemId, rating, timestamp).
+
+    Columns get compact dtypes: int32 ids (int64 when they do not fit), float32 ratings and int64
+    timestamps. With a chunk_size, files are streamed chunk by chunk and every chunk is compacted before
+    the next one is parsed, so the full frame with default dtypes is never held in memory. Non-numeric ids
+    are interned through an IdFactorizer shared by all the files read, e.g. train, validation and test.
+    The type of the ids does not depend on the chunks: when a column holds a non-numeric id, all its ids
+    in the file and in the files read afterwards are strings, so 1 and '1' are the same id.
+    The pyarrow engine is used when requested and installed, the pandas C parser otherwise.
+    """
+
+    def __init__(self, column_names: t.List[str], chunk_size: int = 0, engine: str = "c", logger=None):
+        """
+        :param column_names: names of the columns of the files
+        :param chunk_size: rows parsed at once, 0 to parse whole files
+        :param engine: 'c' (pandas) or 'pyarrow'
+        :param logger: logger of the loader
+        """
+        self._column_names = column_names
+        self._chunk_size = int(chunk_size or 0)
+        self._engine = engine
+        self._factorizers = {column: IdFactorizer() for column in _id_columns}
+        if engine == "pyarrow":
+            try:
+                import pyarrow.csv
+            except ImportError:
+                if logger:
+                    logger.warning("pyarrow is not installed: interaction files are parsed with pandas")
+                self._engine = "c"
+        elif engine != "c":
+            raise ValueError(f"Reading engine {engine} not recognized. Allowed values are: c, pyarrow")
+
+    @classmethod
+    def from_config(cls, config, column_names: t.List[str], logger=None):
+        data_config = config.data_config
+        return cls(column_names, getattr(data_config, "chunk_size", 0), getattr(data_config, "engine", "c"), logger)
+
+    def read(self, path: str) -> pd.DataFrame:
+        """
+        Read an interaction file: tab separated text, or parquet, feather and npz by extension
+        """
+        file_format = interactions_format(path)
+        if file_format == "tsv":
+            chunks = [self._compact(chunk) for chunk in self._chunks(path)]
+        else:
+            chunks = [self._compact(self._complete(self._read_columnar(path, file_format)))]
+        self._align_ids(chunks)
+        data = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+        del chunks
+        if "timestamp" in data.columns:
+            timestamps = data["timestamp"]
+            if timestamps.dtype.kind == "f" and timestamps.notna().all() \
+                    and np.array_equal(timestamps.to_numpy(), np.floor(timestamps.to_numpy())):
+                data["timestamp"] = timestamps.astype(np.int64)
+        return data
+
+    def _align_ids(self, chunks: t.List[pd.DataFrame]):
+        """
+        Turn the numeric ids of the chunks into strings when the column holds non-numeric ids
+        """
+        for column, factorizer in self._factorizers.items():
+            if not len(factorizer):
+                continue
+            for chunk in chunks:
+                if column in chunk.columns and chunk[column].dtype.kind in "iuf":
+                    chunk[column] = factorizer.add(_id_text(chunk[column]))[1]
+
+    def _chunks(self, path: str) -> t.Iterator[pd.DataFrame]:
+        if self._engine == "pyarrow":
+            yield from self._pyarrow_chunks(path)
+            return
+        reader = pd.read_csv(path, sep="\t", header=None, names=self._column_names,
+                             dtype={"rating": np.float32} if "rating" in self._column_names else None,
+                             chunksize=self._chunk_size or None)
+        if isinstance(reader, pd.DataFrame):
+            yield reader
+        else:
+            try:
+                yield from reader
+            finally:
+                reader.close()
+
+    @staticmethod
+    def _read_columnar(path: str, file_format: str) -> pd.DataFrame:
+        if file_format == "parquet":
+            return pd.read_parquet(path)
+        if file_format == "feather":
+            return pd.read_feather(path)
+        with np.load(path, allow_pickle=True) as archive:
+            return pd.DataFrame({column: archive[column] for column in archive.files})
+
+    def _complete(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Name the columns of a columnar file as the text ones, adding the missing ones as NaN
+        """
+        if not set(data.columns).issubset(self._column_names):
+            data.columns = self._column_names[:len(data.columns)]
+        for name in self._column_names:
+            if name not in data.columns:
+                data[name] = np.nan
+        return data[self._column_names]
+
+    def _pyarrow_chunks(self, path: str) -> t.Iterator[pd.DataFrame]:
+        import pyarrow as pa
+        from pyarrow import csv
+
+        with open(path) as file:
+            n_columns = len(file.readline().rstrip("\r\n").split("\t"))
+        names = self._column_names[:n_columns]
+        # -- pyarrow infers the types on the first block and fails on later blocks with non-numeric ids
+        column_types = {"userId": pa.string(), "itemId": pa.string(), "rating": pa.float32(), "timestamp": pa.int64()}
+        read_options = csv.ReadOptions(column_names=names)
+        if self._chunk_size:
+            read_options.block_size = max(2 ** 20, self._chunk_size * _pyarrow_row_bytes)
+        parse_options = csv.ParseOptions(delimiter="\t")
+        convert_options = csv.ConvertOptions(column_types={k: v for k, v in column_types.items() if k in names})
+
+        def complete(chunk):
+            for name in self._column_names[n_columns:]:
+                chunk[name] = np.nan
+            return chunk
+
+        if self._chunk_size:
+            reader = csv.open_csv(path, read_options=read_options, parse_options=parse_options,
+                                  convert_options=convert_options)
+            for batch in reader:
+                yield complete(batch.to_pandas())
+        else:
+            yield complete(csv.read_csv(path, read_options=read_options, parse_options=parse_options,
+                                        convert_options=convert_options).to_pandas())
+
+    def _compact(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        for column in _id_columns:
+            if column not in chunk.columns:
+                continue
+            values = chunk[column]
+            if pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+                # -- dtypes are inferred chunk by chunk: a text chunk may only hold numbers, or mix them with strings
+                numbers = pd.to_numeric(values, errors="coerce")
+                if (numbers.isna() & values.notna()).any():
+                    chunk[column] = self._factorizers[column].add(_id_text(values))[1]
+                    continue
+                values = numbers
+            if values.dtype.kind in "iu":
+                if len(values) == 0 or (values.min() >= _int32.min and values.max() <= _int32.max):
+                    values = values.astype(np.int32)
+            chunk[column] = values
+        if "rating" in chunk.columns and chunk["rating"].dtype != np.float32:
+            chunk["rating"] = chunk["rating"].astype(np.float32)
+        return chunk
@@ -13,6 +13,8 @@ from PIL import Image
 import numpy as np
 import random
 
+from elliot.dataset.samplers.sampling_core import SamplingCore
+
 
 class Sampler:
     def __init__(self, indexed_ratings, item_indices, images_path, output_image_size, epochs):
@@ -20,12 +22,10 @@ class Sampler:
         random.seed(42)
         self._indexed_ratings = indexed_ratings
         self._item_indices = item_indices
-        self._users = list(self._indexed_ratings.keys())
-        self._nusers = len(self._users)
-        self._items = list({k for a in self._indexed_ratings.values() for k in a.keys()})
-        self._nitems = len(self._items)
-        self._ui_dict = {u: list(set(indexed_ratings[u])) for u in indexed_ratings}
-        self._lui_dict = {u: len(v) for u, v in self._ui_dict.items()}
+        self._core = SamplingCore(indexed_ratings)
+        self._nusers = self._core.n_users
+        self._items = np.unique(self._core.indices).tolist()
+        self._nitems = self._core.n_items
 
         self._images_path = images_path
         self._output_image_size = output_image_size
@@ -56,40 +56,16 @@ class Sampler:
         return user.numpy(), pos.numpy(), im_pos, neg.numpy(), im_neg
 
     def step(self, events: int, batch_size: int):
-        r_int = np.random.randint
-        n_users = self._nusers
-        n_items = self._nitems
-        ui_dict = self._ui_dict
-        lui_dict = self._lui_dict
-
-        user, pos, neg = [], [], []
-
+        core = self._core
         actual_inter = (events // batch_size) * batch_size * self._epochs
-
-        counter_inter = 1
-
-        def sample():
-            u = r_int(n_users)
-            ui = ui_dict[u]
-            lui = lui_dict[u]
-            if lui == n_items:
-                sample()
-            i = ui[r_int(lui)]
-
-            j = r_int(n_items)
-            while j in ui:
-                j = r_int(n_items)
-            user.append(u), pos.append(i), neg.append(j)
-
-        for ep in range(self._epochs):
-            for _ in range(0, events):
-                sample()
-                if counter_inter == actual_inter:
-                    return user, pos, neg
-                else:
-                    counter_inter += 1
-
-        return user, pos, neg
+        total = events * self._epochs
+        if 0 < actual_inter <= total:
+            total = actual_inter
+
+        user = core.sample_users(total)
+        pos = core.sample_positives(user)
+        neg = core.sample_negatives(user)
+        return user.astype(np.int32), pos.astype(np.int32), neg.astype(np.int32)
 
     def pipeline(self, num_users, batch_size):
         def load_func(u, p, n):
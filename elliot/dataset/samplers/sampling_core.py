@@ -0,0 +1,174 @@
+"""
+Module description:
+
+"""
+
+__version__ = '0.3.1'
+__author__ = 'Vito Walter Anelli, Claudio Pomo'
+__email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
+
+import queue
+import threading
+import typing as t
+
+import numpy as np
+import scipy.sparse as sp
+
+_end = object()
+
+
+def _dict_to_csr(indexed_ratings: t.Dict) -> sp.csr_matrix:
+    """
+    CSR matrix of a dict of dicts {private user: {private item: rating}}, with a row for every user up to the last
+    """
+    n_users = max(indexed_ratings, default=-1) + 1
+    users = np.repeat(np.fromiter(indexed_ratings, dtype=np.int64, count=len(indexed_ratings)),
+                      [len(row) for row in indexed_ratings.values()])
+    items = np.fromiter((i for row in indexed_ratings.values() for i in row), dtype=np.int64, count=len(users))
+    values = np.fromiter((r for row in indexed_ratings.values() for r in row.values()), dtype=np.float64,
+                         count=len(users))
+    n_items = int(items.max()) + 1 if len(items) else 0
+    return sp.csr_matrix((values, (users, items)), shape=(n_users, n_items))
+
+
+class SamplingCore(object):
+    """
+    Vectorized sampling of training triples over the CSR structure of the interactions.
+
+    The indptr, indices and ratings of the training matrix are used as they are, and the (user, item) pairs
+    as sorted flat keys user * width + item. Whole batches of users, positives and negatives are drawn
+    with NumPy; a negative is rejected when its key is found with searchsorted, and only the rejected
+    ones are drawn again.
+    Draws come from a private RandomState, so that prefetching batches in a background thread does not
+    interleave with the global NumPy stream.
+    """
+
+    def __init__(self, ratings, seed: int = 42):
+        """
+        :param ratings: users x items sparse matrix of the training ratings, e.g. DataSet.sp_i_train_ratings,
+        or dict of dicts {private user: {private item: rating}}
+        :param seed: seed of the random stream
+        """
+        self._random = np.random.RandomState(seed)
+        if isinstance(ratings, dict):
+            ratings = _dict_to_csr(ratings)
+        ratings = sp.csr_matrix(ratings)
+        if not ratings.has_sorted_indices:
+            # -- the matrix of the DataSet is shared: it is sorted on a copy
+            ratings = ratings.copy()
+            ratings.sort_indices()
+        self._n_users = ratings.shape[0]
+        self._indptr = ratings.indptr.astype(np.int64)
+        self._indices = ratings.indices.astype(np.int64)
+        self._ratings = ratings.data.astype(np.float64)
+        self._lengths = np.diff(self._indptr)
+        self._n_items = int(np.count_nonzero(np.bincount(self._indices))) if len(self._indices) else 0
+        self._width = max(self._n_items, int(self._indices.max()) + 1 if len(self._indices) else 0)
+        self._keys = np.repeat(np.arange(self._n_users, dtype=np.int64), self._lengths) * self._width \
+                     + self._indices
+        # -- users who rated every item have no negatives to draw
+        self._sampleable = np.flatnonzero((self._lengths > 0) & (self._lengths < self._n_items))
+
+    @property
+    def random(self) -> np.random.RandomState:
+        return self._random
+
+    @property
+    def n_users(self) -> int:
+        return self._n_users
+
+    @property
+    def n_items(self) -> int:
+        return self._n_items
+
+    @property
+    def indptr(self) -> np.ndarray:
+        return self._indptr
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self._indices
+
+    def sample_users(self, size: int) -> np.ndarray:
+        return self._sampleable[self._random.randint(len(self._sampleable), size=size)]
+
+    def sample_positions(self, users: np.ndarray) -> np.ndarray:
+        """
+        :return: CSR positions of a random positive of every user
+        """
+        offsets = (self._random.random_sample(len(users)) * self._lengths[users]).astype(np.int64)
+        return self._indptr[users] + offsets
+
+    def sample_positives(self, users: np.ndarray) -> np.ndarray:
+        return self._indices[self.sample_positions(users)]
+
+    def user_items(self, users: np.ndarray) -> t.Tuple[np.ndarray, np.ndarray]:
+        """
+        :return: (position of the user in users, item) of all the positives of the users
+        """
+        lengths = self._lengths[users]
+        rows = np.repeat(np.arange(len(users)), lengths)
+        offsets = np.arange(len(rows)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return rows, self._indices[np.repeat(self._indptr[users], lengths) + offsets]
+
+    def ratings_at(self, positions: np.ndarray) -> np.ndarray:
+        return self._ratings[positions]
+
+    def is_positive(self, users: np.ndarray, items: np.ndarray) -> np.ndarray:
+        keys = users * self._width + items
+        found = np.searchsorted(self._keys, keys)
+        found[found == len(self._keys)] = 0
+        return self._keys[found] == keys if len(self._keys) else np.zeros(len(keys), dtype=bool)
+
+    def sample_negatives(self, users: np.ndarray) -> np.ndarray:
+        """
+        :return: a random item not rated by every user, the same distribution of the legacy rejection loop
+        """
+        items = self._random.randint(self._n_items, size=len(users))
+        rejected = np.flatnonzero(self.is_positive(users, items))
+        while len(rejected):
+            items[rejected] = self._random.randint(self._n_items, size=len(rejected))
+            rejected = rejected[self.is_positive(users[rejected], items[rejected])]
+        return items
+
+
+def prefetch(batches: t.Iterable, depth: int = 0) -> t.Iterator:
+    """
+    Run a batch generator ahead in a background thread
+    :param batches: iterable of batches
+    :param depth: number of batches prepared in advance, 0 to iterate in the calling thread
+    """
+    if depth < 1:
+        yield from batches
+        return
+
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for batch in batches:
+                while not stop.is_set():
+                    try:
+                        buffer.put(batch, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+                if stop.is_set():
+                    return
+            buffer.put(_end)
+        except Exception as error:
+            buffer.put(error)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            batch = buffer.get()
+            if batch is _end:
+                return
+            if isinstance(batch, Exception):
+                raise batch
+            yield batch
+    finally:
+        stop.set()
@@ -0,0 +1,200 @@
+"""
+Module description:
+
+"""
+
+__version__ = '0.3.1'
+__author__ = 'Vito Walter Anelli, Claudio Pomo'
+__email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
+
+import threading
+import typing as t
+import weakref
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+class Clustering(object):
+    """
+    Clusters of users or items, read from a tab separated file of (public id, cluster) rows.
+
+    clusters holds the cluster of every private id, -1 for the ids the file does not list. Cluster ids
+    are used as indices, as in the legacy metrics: n_clusters is the number of distinct ones, and sizes
+    counts the ids of each cluster over all the rows of the file, including the ids unknown to the dataset.
+    groups holds the public ids of each cluster, for the metrics that also count the test items unknown to
+    the training set.
+    """
+
+    def __init__(self, path: str, public_ids: t.Dict, n_ids: int):
+        """
+        :param path: clustering file
+        :param public_ids: {public id: private id} of the clustered users or items
+        :param n_ids: number of private ids
+        """
+        frame = pd.read_csv(path, sep="\t", header=None)
+        self._n_clusters = frame[1].nunique()
+        # -- as dict(zip(ids, clusters)): the last row of a repeated id wins
+        frame = frame.drop_duplicates(0, keep="last")
+        values = frame[1].to_numpy(dtype=np.int64)
+        self._n_entries = len(frame)
+        self._sizes = _read_only(np.bincount(values, minlength=self._n_clusters))
+        self._groups = {int(cluster): frozenset(ids.tolist()) for cluster, ids in frame.groupby(1)[0]}
+
+        private = np.array([public_ids.get(i, -1) for i in frame[0].tolist()], dtype=np.int64)
+        known = private >= 0
+        clusters = np.full(n_ids, -1, dtype=np.int32)
+        clusters[private[known]] = values[known]
+        self._clusters = _read_only(clusters)
+
+    @property
+    def n_clusters(self) -> int:
+        return self._n_clusters
+
+    @property
+    def n_entries(self) -> int:
+        """Number of distinct ids listed in the file"""
+        return self._n_entries
+
+    @property
+    def sizes(self) -> np.ndarray:
+        return self._sizes
+
+    @property
+    def clusters(self) -> np.ndarray:
+        return self._clusters
+
+    @property
+    def groups(self) -> t.Dict[int, t.FrozenSet]:
+        """{cluster: public ids of the cluster}"""
+        return self._groups
+
+
+class FeatureMap(object):
+    """
+    Features of the items, read from a tab separated file of (public item, feature, feature, ...) rows.
+
+    features is a private items x features binary CSR matrix (float32, ready for sparse products); only the
+    features of the items of the dataset get a column.
+    """
+
+    def __init__(self, path: str, public_items: t.Dict, n_items: int, separator: str = '\t'):
+        """
+        :param path: feature file
+        :param public_items: {public item: private item}
+        :param n_items: number of private items
+        :param separator: separator of the fields of a row
+        """
+        item_features = {}
+        with open(path) as file:
+            for line in file:
+                line = line.split(separator)
+                item_features[int(line[0])] = set(int(f) for f in line[1:])
+
+        rows, features = [], []
+        for item, item_feature_set in item_features.items():
+            private = public_items.get(item, -1)
+            if private >= 0:
+                rows.extend([private] * len(item_feature_set))
+                features.extend(item_feature_set)
+        columns, uniques = pd.factorize(np.array(features, dtype=np.int64))
+        self._features = sp.csr_matrix((np.ones(len(rows), dtype=np.float32),
+                                        (np.array(rows, dtype=np.int64), columns)),
+                                       shape=(n_items, len(uniques)), dtype=np.float32)
+
+    @property
+    def n_features(self) -> int:
+        """Number of distinct features of the items of the dataset"""
+        return self._features.shape[1]
+
+    @property
+    def features(self) -> sp.csr_matrix:
+        return self._features
+
+
+class EvaluationContext(object):
+    """
+    Immutable evaluation data shared by all the metrics evaluated on the same DataSet.
+
+    Metric objects are rebuilt for every cutoff of every evaluation, so anything they derive from the
+    training set or from side files is computed here, once per DataSet, as NumPy arrays indexed by
+    private user and item ids: training item counts, EPC and EFD novelty vectors, user and item
+    clusterings and item feature maps. Side files are read on first request and cached by path.
+    """
+
+    _contexts = weakref.WeakKeyDictionary()
+    _contexts_lock = threading.Lock()
+
+    def __init__(self, data):
+        """
+        :param data: dataset object
+        """
+        # -- only the id maps are kept: a reference to the DataSet would keep it alive as a key of _contexts
+        self._public_users, self._num_users = data.public_users, data.num_users
+        self._public_items, self._num_items = data.public_items, data.num_items
+        self._lock = threading.Lock()
+        self._side_data = {}
+
+        counts = np.diff(sp.csc_matrix(data.sp_i_train).indptr).astype(np.int32)
+        self._item_counts = _read_only(counts)
+
+        self._epc_novelty = _read_only(1 - counts / data.num_users)
+
+        present = counts > 0
+        norm = counts.sum()
+        efd_novelty = np.zeros(len(counts))
+        if present.any():
+            efd_novelty[:] = -np.log(counts[present].min() / norm) / np.log(2)
+            efd_novelty[present] = -np.log(counts[present] / norm) / np.log(2)
+        self._efd_novelty = _read_only(efd_novelty)
+
+    @classmethod
+    def of(cls, data) -> "EvaluationContext":
+        """
+        Context of a DataSet, built on first request and kept as long as the DataSet is alive
+        """
+        with cls._contexts_lock:
+            context = cls._contexts.get(data)
+            if context is None:
+                context = cls(data)
+                cls._contexts[data] = context
+        return context
+
+    @property
+    def item_counts(self) -> np.ndarray:
+        """Number of training users of every item"""
+        return self._item_counts
+
+    @property
+    def epc_novelty(self) -> np.ndarray:
+        """Expected Popularity Complement novelty of every item: 1 - counts / users"""
+        return self._epc_novelty
+
+    @property
+    def efd_novelty(self) -> np.ndarray:
+        """Expected Free Discovery novelty of every item: -log2(counts / sum of counts)"""
+        return self._efd_novelty
+
+    def _cached(self, key, build):
+        with self._lock:
+            if key not in self._side_data:
+                self._side_data[key] = build()
+            return self._side_data[key]
+
+    def user_clustering(self, path: str) -> Clustering:
+        return self._cached(("users", path),
+                            lambda: Clustering(path, self._public_users, self._num_users))
+
+    def item_clustering(self, path: str) -> Clustering:
+        return self._cached(("items", path),
+                            lambda: Clustering(path, self._public_items, self._num_items))
+
+    def item_features(self, path: str) -> FeatureMap:
+        return self._cached(("features", path),
+                            lambda: FeatureMap(path, self._public_items, self._num_items))
@@ -29,9 +29,13 @@ import numpy as np
 
 import elliot.dataset.dataset as ds
 from elliot.utils import logging
+from elliot.utils.recommendations import TopKRecommendations
 from . import metrics
+from .metrics.base_metric import BaseMetric
+from .statistical_significance import UserValues
 from . import popularity_utils
 from . import relevance
+from .evaluation_context import EvaluationContext
 
 
 class Evaluator(object):
@@ -60,17 +64,20 @@ class Evaluator(object):
         #     raise Exception("Validation metric must be in list of general metrics")
         self._test = data.get_test()
 
-        self._pop = popularity_utils.Popularity(self._data)
+        self._context = EvaluationContext.of(self._data)
+        self._pop = popularity_utils.Popularity(self._data, counts=self._context.item_counts)
 
-        self._evaluation_objects = SimpleNamespace(relevance=relevance.Relevance(self._test, self._rel_threshold),
+        self._evaluation_objects = SimpleNamespace(relevance=relevance.Relevance(self._test, self._rel_threshold, self._data),
                                                    pop=self._pop,
+                                                   context=self._context,
                                                    num_items=self._data.num_items,
                                                    data = self._data,
                                                    additional_metrics=self._complex_metrics)
         if data.get_validation():
             self._val = data.get_validation()
-            self._val_evaluation_objects = SimpleNamespace(relevance=relevance.Relevance(self._val, self._rel_threshold),
+            self._val_evaluation_objects = SimpleNamespace(relevance=relevance.Relevance(self._val, self._rel_threshold, self._data),
                                                            pop=self._pop,
+                                                           context=self._context,
                                                            num_items=self._data.num_items,
                                                            data = self._data,
                                                            additional_metrics=self._complex_metrics)
@@ -79,8 +86,11 @@ class Evaluator(object):
     def eval(self, recommendations):
         """
         Runtime Evaluation of Accuracy Performance (top-k)
+        :param recommendations: (validation, test) recommendations, as TopKRecommendations or legacy dictionaries
         :return:
         """
+        recommendations = tuple(self._select_test_users(TopKRecommendations.from_dict(recs, self._data), test_data)
+                                for recs, (test_data, _) in zip(recommendations, self._get_test_data()))
         result_dict = {}
         for k in self._k:
             val_results, val_statistical_results, test_results, test_statistical_results = self.eval_at_k(recommendations, k)
@@ -91,6 +101,47 @@ class Evaluator(object):
             result_dict[k] = local_result_dict
         return result_dict
 
+    def eval_monitored(self, recommendations, monitored, users=None):
+        """
+        Fast evaluation of the monitored metrics only, on the validation set (the test set when missing)
+        :param recommendations: (validation, test) recommendations, as TopKRecommendations or legacy dictionaries
+        :param monitored: {cutoff: [metric names]}
+        :param users: private ids of the users the metrics are averaged on, all the evaluated users when None
+        :return: result dictionary shaped as the one of eval, with the monitored validation results only
+        """
+        position = 0 if hasattr(self, '_val') else 1
+        test_data, eval_objs = self._get_test_data()[position]
+        recommendations = self._select_test_users(TopKRecommendations.from_dict(recommendations[position],
+                                                                                self._data), test_data)
+        if users is not None:
+            recommendations = recommendations.select_users(np.isin(recommendations.users, users))
+
+        result_dict = {}
+        for k, names in monitored.items():
+            eval_objs.cutoff = k
+            results = {}
+            for m in metrics.parse_metrics(names):
+                metric_object = m(recommendations, self._data.config, self._params, eval_objs)
+                results[metric_object.name()] = metric_object.eval()
+            result_dict[k] = {"val_results": results,
+                              "val_statistical_results": {},
+                              "test_results": {},
+                              "test_statistical_results": {}}
+        return result_dict
+
+    def sample_monitored_users(self, size, seed=42) -> np.ndarray:
+        """
+        Fixed sample of the users the monitored metrics are evaluated on
+        :param size: number of users, or share of them when lower than 1
+        :param seed: seed of the sample
+        :return: sorted private ids of the sampled users
+        """
+        test_data = self._val if hasattr(self, '_val') else self._test
+        users = np.array(sorted(self._data.public_users[u] for u, items in test_data.items()
+                                if items and u in self._data.public_users), dtype=np.int64)
+        size = int(round(size * len(users))) if size < 1 else min(int(size), len(users))
+        return np.sort(np.random.RandomState(seed).choice(users, size, replace=False))
+
     def eval_at_k(self, recommendations, k):
         val_test = ["Validation", "Test"]
         result_list = []
@@ -114,19 +165,34 @@ class Evaluator(object):
                  self._evaluation_objects if hasattr(self, '_evaluation_objects') else None)
                 ]
 
+    @staticmethod
+    def _select_test_users(recommendations, test_data):
+        """
+        Restrict the recommendations to the users with test data, once for all the cutoffs
+        """
+        if not test_data:
+            return recommendations
+        return recommendations.select_users(np.array([bool(test_data.get(u, [])) for u in recommendations], dtype=bool))
+
     def _process_test_data(self, recommendations, test_data, eval_objs, val_test):
         if (not test_data) or (not eval_objs):
             return None, None
         else:
-            recommendations = {u: recs for u, recs in recommendations.items() if test_data.get(u, [])}
             rounding_factor = 5
             eval_start_time = time()
 
-            metric_objects = [m(recommendations, self._data.config, self._params, eval_objs) for m in self._metrics]
+            results = {}
+            statistical_results = {}
+            for m in self._metrics:
+                metric_object = m(recommendations, self._data.config, self._params, eval_objs)
+                results[metric_object.name()], user_values = self._eval_metric(metric_object)
+                if user_values is not None:
+                    statistical_results[metric_object.name()] = UserValues.from_dict(user_values,
+                                                                                     self._data.public_users)
             for metric in self._complex_metrics:
-                metric_objects.extend(metrics.parse_metric(metric["metric"])(recommendations, self._data.config,
-                                                                             self._params, eval_objs, metric).get())
-            results = {m.name(): m.eval() for m in metric_objects}
+                for metric_object in metrics.parse_metric(metric["metric"])(recommendations, self._data.config,
+                                                                            self._params, eval_objs, metric).get():
+                    results[metric_object.name()] = metric_object.eval()
 
             str_results = {k: str(round(v, rounding_factor)) for k, v in results.items()}
             # res_print = "\t".join([":".join(e) for e in str_results.items()])
@@ -137,15 +203,20 @@ class Evaluator(object):
             self.logger.info(f"Results")
             [self.logger.info("\t".join(e)) for e in str_results.items()]
 
-            statistical_results = {}
-            if self._paired_ttest:
-                statistical_results = {metric_object.name(): metric_object.eval_user_metric()
-                                       for metric_object in
-                                       [m(recommendations, self._data.config, self._params, eval_objs) for m
-                                        in self._metrics]
-                                       if isinstance(metric_object, metrics.StatisticalMetric)}
             return results, statistical_results
 
+    def _eval_metric(self, metric_object):
+        """
+        Evaluate a simple metric, computing its per user values at most once
+        :return: the value of the metric, and its per user values when the statistical tests need them
+        """
+        statistical = self._paired_ttest and isinstance(metric_object, metrics.StatisticalMetric)
+        if type(metric_object).eval is BaseMetric.eval:
+            # -- the default eval averages eval_user_metric: the same values feed the statistical tests
+            user_values = metric_object.eval_user_metric()
+            return np.average(list(user_values.values())), user_values if statistical else None
+        return metric_object.eval(), metric_object.eval_user_metric() if statistical else None
+
     def _compute_needed_recommendations(self):
         for m in self._metrics:
             if m.needs_full_recommendations():
@@ -164,3 +235,12 @@ class Evaluator(object):
 
     def get_needed_recommendations(self):
         return self._needed_recommendations
+
+    def get_monitored_recommendations(self, monitored):
+        """
+        Length of the recommendation lists needed by eval_monitored
+        :param monitored: {cutoff: [metric names]}
+        """
+        if any(m.needs_full_recommendations() for names in monitored.values() for m in metrics.parse_metrics(names)):
+            return self._data.num_items
+        return max(monitored)
@@ -82,6 +82,10 @@ class F1(BaseMetric):
         Evaluation function
         :return: the overall averaged value of F-score
         """
+        ranking = self._evaluation_objects.relevance.get_ranking_relevance(self._recommendations)
+        if ranking is not None:
+            return ranking.user_metric(ranking.f_score(self._cutoff, self._squared_beta), ranking.binary_users)
+
         return {u: F1.__user_f1(u_r, self._cutoff, self._relevance.get_user_rel(u), self._squared_beta)
              for u, u_r in self._recommendations.items() if len(self._relevance.get_user_rel(u))}
 
@@ -80,6 +80,10 @@ class HR(BaseMetric):
         Evaluation function
         :return: the overall averaged value of Hit Rate per user
         """
+        ranking = self._evaluation_objects.relevance.get_ranking_relevance(self._recommendations)
+        if ranking is not None:
+            return ranking.user_metric(ranking.hit_rate(self._cutoff), ranking.binary_users)
+
         return {u: HR.__user_HR(u_r, self._cutoff, self._relevance.get_user_rel(u))
              for u, u_r in self._recommendations.items() if len(self._relevance.get_user_rel(u))}
 
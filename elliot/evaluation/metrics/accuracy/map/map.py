@@ -94,6 +94,10 @@ class MAP(BaseMetric):
         Evaluation function
         :return: the overall averaged value of Mean Average Precision per user
         """
+        ranking = self._evaluation_objects.relevance.get_ranking_relevance(self._recommendations)
+        if ranking is not None:
+            return ranking.user_metric(ranking.average_precision(self._cutoff), ranking.binary_users)
+
         return {u: MAP.__user_ap(u_r, self._cutoff, self._relevance.get_user_rel(u))
              for u, u_r in self._recommendations.items() if len(self._relevance.get_user_rel(u))}
 
@@ -89,6 +89,10 @@ class MAR(BaseMetric):
         Evaluation function
         :return: the overall averaged value of Mean Average Recall per user
         """
+        ranking = self._evaluation_objects.relevance.get_ranking_relevance(self._recommendations)
+        if ranking is not None:
+            return ranking.user_metric(ranking.average_recall(self._cutoff), ranking.binary_users)
+
         return {u: MAR.__user_ar(u_r, self._cutoff, self._relevance.get_user_rel(u))
              for u, u_r in self._recommendations.items() if len(self._relevance.get_user_rel(u))}
 
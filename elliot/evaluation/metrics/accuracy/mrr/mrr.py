@@ -84,6 +84,10 @@ class MRR(BaseMetric):
         Evaluation function
         :return: the overall averaged value of Mean Reciprocal Rank per user
         """
+        ranking = self._evaluation_objects.relevance.get_ranking_relevance(self._recommendations)
+        if ranking is not None:
+            return ranking.user_metric(ranking.reciprocal_rank(self._cutoff), ranking.binary_users)
+
         return {u: MRR.__user_mrr(u_r, self._cutoff, self._relevance.get_user_rel(u))
              for u, u_r in self._recommendations.items() if len(self._relevance.get_user_rel(u))}
 
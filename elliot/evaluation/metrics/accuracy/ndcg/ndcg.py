@@ -128,6 +128,9 @@ class nDCG(BaseMetric):
         Evaluation function
         :return: the overall averaged value of normalized Discounted Cumulative Gain per user
         """
+        ranking = self._evaluation_objects.relevance.get_ranking_relevance(self._recommendations)
+        if ranking is not None:
+            return ranking.user_metric(ranking.ndcg(self._cutoff), ranking.discounted_users)
 
         return {u: self.__user_ndcg(u_r, u, self._cutoff)
              for u, u_r in self._recommendations.items() if len(self._relevance.get_user_rel(u))}
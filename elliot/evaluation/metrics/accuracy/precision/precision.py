@@ -80,6 +80,10 @@ class Precision(BaseMetric):
         Evaluation function
         :return: the overall averaged value of Precision
         """
+        ranking = self._evaluation_objects.relevance.get_ranking_relevance(self._recommendations)
+        if ranking is not None:
+            return ranking.user_metric(ranking.precision(self._cutoff), ranking.binary_users)
+
         return {u: self.__user_precision(u_r, u, self._cutoff)
              for u, u_r in self._recommendations.items() if len(self._relevance.get_user_rel(u))}
 
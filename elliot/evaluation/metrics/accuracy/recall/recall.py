@@ -80,5 +80,9 @@ class Recall(BaseMetric):
         Evaluation Function
         :return: the overall averaged value of Recall per user
         """
+        ranking = self._evaluation_objects.relevance.get_ranking_relevance(self._recommendations)
+        if ranking is not None:
+            return ranking.user_metric(ranking.recall(self._cutoff), ranking.binary_users)
+
         return {u: self.__user_recall(u_r, u, self._cutoff)
              for u, u_r in self._recommendations.items() if len(self._relevance.get_user_rel(u))}
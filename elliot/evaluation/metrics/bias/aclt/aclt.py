@@ -7,10 +7,9 @@ __version__ = '0.3.1'
 __author__ = 'Vito Walter Anelli, Claudio Pomo'
 __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 
-import operator
-
 import numpy as np
 from elliot.evaluation.metrics.base_metric import BaseMetric
+from elliot.utils.recommendations import TopKRecommendations
 
 
 class ACLT(BaseMetric):
@@ -47,7 +46,7 @@ class ACLT(BaseMetric):
         """
         super().__init__(recommendations, config, params, eval_objects)
         self._cutoff = self._evaluation_objects.cutoff
-        self._long_tail = self._evaluation_objects.pop.get_long_tail()
+        self._long_tail = self._evaluation_objects.pop.long_tail_mask
 
     @staticmethod
     def name():
@@ -57,32 +56,11 @@ class ACLT(BaseMetric):
         """
         return "ACLT"
 
-    @staticmethod
-    def __user_aclt(user_recommendations, cutoff, long_tail):
-        """
-        Per User Average coverage of long tail items
-        :param user_recommendations: list of user recommendation in the form [(item1,value1),...]
-        :param cutoff: numerical threshold to limit the recommendation list
-        :param user_relevant_items: list of user relevant items in the form [item1,...]
-        :return: the value of the Average Recommendation Popularity metric for the specific user
-        """
-        return len(set([i for i,v in user_recommendations[:cutoff]]) & set(long_tail))
-
-    # def eval(self):
-    #     """
-    #     Evaluation function
-    #     :return: the overall averaged value of ACLT
-    #     """
-    #     return np.average(
-    #         [ACLT.__user_aclt(u_r, self._cutoff, self._long_tail)
-    #          for u, u_r in self._recommendations.items()]
-    #     )
-
     def eval_user_metric(self):
         """
         Evaluation function
         :return: the overall averaged value of ACLT
         """
-        return {u: ACLT.__user_aclt(u_r, self._cutoff, self._long_tail)
-             for u, u_r in self._recommendations.items()}
-
+        recommendations = TopKRecommendations.from_dict(self._recommendations, self._evaluation_objects.data)
+        recommendations = recommendations.top(self._cutoff)
+        return recommendations.user_values(recommendations.gather(self._long_tail, False).sum(axis=1))
@@ -7,10 +7,9 @@ __version__ = '0.3.1'
 __author__ = 'Vito Walter Anelli, Claudio Pomo'
 __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 
-import operator
-
 import numpy as np
 from elliot.evaluation.metrics.base_metric import BaseMetric
+from elliot.utils.recommendations import TopKRecommendations
 
 
 class APLT(BaseMetric):
@@ -47,7 +46,7 @@ class APLT(BaseMetric):
         """
         super().__init__(recommendations, config, params, eval_objects)
         self._cutoff = self._evaluation_objects.cutoff
-        self._long_tail = self._evaluation_objects.pop.get_long_tail()
+        self._long_tail = self._evaluation_objects.pop.long_tail_mask
 
     @staticmethod
     def name():
@@ -57,32 +56,13 @@ class APLT(BaseMetric):
         """
         return "APLT"
 
-    @staticmethod
-    def __user_aplt(user_recommendations, cutoff, long_tail):
-        """
-        Per User Average percentage of long tail items
-        :param user_recommendations: list of user recommendation in the form [(item1,value1),...]
-        :param cutoff: numerical threshold to limit the recommendation list
-        :param user_relevant_items: list of user relevant items in the form [item1,...]
-        :return: the value of the Average Recommendation Popularity metric for the specific user
-        """
-        return len(set([i for i,v in user_recommendations[:cutoff]]) & set(long_tail)) / len(user_recommendations[:cutoff])
-
-    # def eval(self):
-    #     """
-    #     Evaluation function
-    #     :return: the overall averaged value of APLT
-    #     """
-    #     return np.average(
-    #         [APLT.__user_aplt(u_r, self._cutoff, self._long_tail)
-    #          for u, u_r in self._recommendations.items()]
-    #     )
-
     def eval_user_metric(self):
         """
         Evaluation function
         :return: the overall averaged value of APLT
         """
-        return {u: APLT.__user_aplt(u_r, self._cutoff, self._long_tail)
-             for u, u_r in self._recommendations.items()}
-
+        recommendations = TopKRecommendations.from_dict(self._recommendations, self._evaluation_objects.data)
+        recommendations = recommendations.top(self._cutoff)
+        lengths = recommendations.lengths
+        long_tail = recommendations.gather(self._long_tail, False).sum(axis=1)
+        return recommendations.user_values(np.divide(long_tail, lengths, out=np.zeros(len(lengths)), where=lengths > 0))
@@ -9,6 +9,7 @@ __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 
 import numpy as np
 from elliot.evaluation.metrics.base_metric import BaseMetric
+from elliot.utils.recommendations import TopKRecommendations
 
 
 class ARP(BaseMetric):
@@ -43,7 +44,7 @@ class ARP(BaseMetric):
         """
         super().__init__(recommendations, config, params, eval_objects)
         self._cutoff = self._evaluation_objects.cutoff
-        self._pop_items = self._evaluation_objects.pop.get_pop_items()
+        self._pop_items = self._evaluation_objects.pop.counts
 
     @staticmethod
     def name():
@@ -53,32 +54,13 @@ class ARP(BaseMetric):
         """
         return "ARP"
 
-    @staticmethod
-    def __user_arp(user_recommendations, cutoff, pop_items):
-        """
-        Per User Average Recommendation Popularity
-        :param user_recommendations: list of user recommendation in the form [(item1,value1),...]
-        :param cutoff: numerical threshold to limit the recommendation list
-        :param user_relevant_items: list of user relevant items in the form [item1,...]
-        :return: the value of the Average Recommendation Popularity metric for the specific user
-        """
-        return sum([pop_items[i] for i, v in user_recommendations[:cutoff]]) / len(user_recommendations[:cutoff])
-
-    # def eval(self):
-    #     """
-    #     Evaluation function
-    #     :return: the overall averaged value of ARP
-    #     """
-    #     return np.average(
-    #         [ARP.__user_arp(u_r, self._cutoff, self._pop_items)
-    #          for u, u_r in self._recommendations.items()]
-    #     )
-
     def eval_user_metric(self):
         """
         Evaluation function
         :return: the overall averaged value of ARP
         """
-        return {u: ARP.__user_arp(u_r, self._cutoff, self._pop_items)
-             for u, u_r in self._recommendations.items()}
-
+        recommendations = TopKRecommendations.from_dict(self._recommendations, self._evaluation_objects.data)
+        recommendations = recommendations.top(self._cutoff)
+        lengths = recommendations.lengths
+        popularity = recommendations.gather(self._pop_items).sum(axis=1, dtype=np.float64)
+        return recommendations.user_values(np.divide(popularity, lengths, out=np.zeros(len(lengths)), where=lengths > 0))
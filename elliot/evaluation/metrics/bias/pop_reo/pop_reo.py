@@ -10,6 +10,7 @@ __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 import numpy as np
 
 from elliot.evaluation.metrics.base_metric import BaseMetric
+from elliot.utils.recommendations import TopKRecommendations
 
 
 class PopREO(BaseMetric):
@@ -54,9 +55,9 @@ class PopREO(BaseMetric):
         super().__init__(recommendations, config, params, eval_objects)
         self._cutoff = self._evaluation_objects.cutoff
         self._relevance = self._evaluation_objects.relevance.binary_relevance
-        self._short_head = set(self._evaluation_objects.pop.get_short_head())
-        self._long_tail = set(self._evaluation_objects.pop.get_long_tail())
-        self._train = self._evaluation_objects.data.train_dict
+        self._short_head = self._evaluation_objects.pop.short_head_mask
+        self._long_tail = self._evaluation_objects.pop.long_tail_mask
+        self._train = self._evaluation_objects.data.sp_i_train
         self._num = []
         self._den = []
 
@@ -68,33 +69,24 @@ class PopREO(BaseMetric):
         """
         return "PopREO"
 
-    def __user_pop_reo(self, user_recommendations, cutoff, long_tail, short_head, u_train, user_relevant_items):
-        """
-        Per User Popularity-based Ranking-based Equal Opportunity (REO)
-        :param user_recommendations: list of user recommendation in the form [(item1,value1),...]
-        :param cutoff: numerical threshold to limit the recommendation list
-        :param user_relevant_items: list of user relevant items in the form [item1,...]
-        :return: the value of the Average Recommendation Popularity metric for the specific user
-        """
-        recommended_items = set([i for i, _ in user_recommendations[:cutoff] if i in user_relevant_items])
-        num_h = len(recommended_items & short_head)
-        num_t = len(recommended_items & long_tail)
-        den_h = len((short_head & user_relevant_items)-u_train)
-        den_t = len((long_tail & user_relevant_items)-u_train)
-        return num_h, num_t, den_h, den_t
-
     def eval(self):
         """
         Evaluation function
         :return: the overall averaged value of PopREO
         """
-        for u, u_r in self._recommendations.items():
-            if len(self._relevance.get_user_rel(u)):
-                num_h, num_t, den_h, den_t = self.__user_pop_reo(u_r, self._cutoff, self._long_tail, self._short_head, set(self._train[u].keys()), set(self._relevance.get_user_rel(u)))
-                self._num.append([num_h, num_t])
-                self._den.append([den_h, den_t])
-        self._num = np.sum(np.array(self._num), axis=0)
-        self._den = np.sum(np.array(self._den), axis=0)
+        recommendations = TopKRecommendations.from_dict(self._recommendations, self._evaluation_objects.data)
+        ranking = self._evaluation_objects.relevance.get_ranking_relevance(recommendations)
+        users = ranking.binary_users
+        hits = ranking.hit_matrix[users, :self._cutoff]
+        recommended = recommendations.select_users(users).top(self._cutoff)
+        # -- relevant test items of the users, but the ones in their training profile
+        relevant = self._evaluation_objects.relevance.relevance_matrix.relevant[recommended.users]
+        seen = relevant.multiply(self._train[recommended.users])
+        seen.eliminate_zeros()
+        num, den = [], []
+        for group in (self._short_head, self._long_tail):
+            num.append((hits & recommended.gather(group, False)).sum())
+            den.append(group[relevant.indices].sum() - group[seen.indices].sum())
+        self._num, self._den = np.array(num), np.array(den)
         pr = self._num / self._den
         return np.std(pr)/np.mean(pr)
-
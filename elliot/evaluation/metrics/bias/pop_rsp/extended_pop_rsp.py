@@ -7,10 +7,9 @@ __version__ = '0.3.1'
 __author__ = 'Vito Walter Anelli, Claudio Pomo, Alejandro Bellogín'
 __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it, alejandro.bellogin@uam.es'
 
-import operator
-
 import numpy as np
 from elliot.evaluation.metrics.base_metric import BaseMetric
+from elliot.utils.recommendations import TopKRecommendations
 
 
 class ExtendedPopRSP(BaseMetric):
@@ -43,9 +42,9 @@ class ExtendedPopRSP(BaseMetric):
         self._pop_ratio = self._additional_data.get("pop_ratio", 0.8)
         self._pop_obj = self._evaluation_objects.pop.get_custom_pop_obj(self._pop_ratio)
 
-        self._short_head = set(self._pop_obj.get_short_head())
-        self._long_tail = set(self._pop_obj.get_long_tail())
-        self._train = self._evaluation_objects.data.train_dict
+        self._short_head = self._pop_obj.short_head_mask
+        self._long_tail = self._pop_obj.long_tail_mask
+        self._train = self._evaluation_objects.data.sp_i_train
         self._num = []
         self._den = []
 
@@ -57,32 +56,19 @@ class ExtendedPopRSP(BaseMetric):
         """
         return "ExtendedPopRSP"
 
-    def __user_pop_rsp(self, user_recommendations, cutoff, long_tail, short_head, u_train):
-        """
-        Per User Popularity-based Ranking-based Statistical Parity (RSP)
-        :param user_recommendations: list of user recommendation in the form [(item1,value1),...]
-        :param cutoff: numerical threshold to limit the recommendation list
-        :param user_relevant_items: list of user relevant items in the form [item1,...]
-        :return: the value of the Average Recommendation Popularity metric for the specific user
-        """
-        recommended_items = set([i for i, _ in user_recommendations[:cutoff]])
-        num_h = len(recommended_items & short_head)
-        num_t = len(recommended_items & long_tail)
-        den_h = len(short_head-u_train)
-        den_t = len(long_tail-u_train)
-        return num_h, num_t, den_h, den_t
-
     def eval(self):
         """
         Evaluation function
-        :return: the overall averaged value of PopRSP
+        :return: the overall averaged value of ExtendedPopRSP
         """
-        for u, u_r in self._recommendations.items():
-            num_h, num_t, den_h, den_t = self.__user_pop_rsp(u_r, self._cutoff, self._long_tail, self._short_head, set(self._train[u].keys()))
-            self._num.append([num_h, num_t])
-            self._den.append([den_h, den_t])
-        self._num = np.sum(np.array(self._num), axis = 0)
-        self._den = np.sum(np.array(self._den), axis = 0)
+        recommendations = TopKRecommendations.from_dict(self._recommendations, self._evaluation_objects.data)
+        recommendations = recommendations.top(self._cutoff)
+        # -- training items of the recommended users, which do not count among the items they could get
+        train_items = self._train[recommendations.users].indices
+        num, den = [], []
+        for group in (self._short_head, self._long_tail):
+            num.append(recommendations.gather(group, False).sum())
+            den.append(group.sum() * len(recommendations.users) - group[train_items].sum())
+        self._num, self._den = np.array(num), np.array(den)
         pr = self._num / self._den
         return np.std(pr)/np.mean(pr)
-
@@ -7,7 +7,11 @@ __version__ = '0.3.1'
 __author__ = 'Vito Walter Anelli, Claudio Pomo'
 __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 
+import numpy as np
+import scipy.sparse as sp
+
 from elliot.evaluation.metrics.base_metric import BaseMetric
+from elliot.utils.recommendations import TopKRecommendations
 
 
 class SRecall(BaseMetric):
@@ -39,8 +43,8 @@ class SRecall(BaseMetric):
         super().__init__(recommendations, config, params, eval_objects, additional_data)
         self._cutoff = self._evaluation_objects.cutoff
         self._relevance = self._evaluation_objects.relevance.binary_relevance
-        self._feature_map = SRecall._load_attribute_file(additional_data["feature_data"])
-        self._total_features = len({topic for item in eval_objects.data.items for topic in self._feature_map.get(item, [])})
+        self._feature_map = self._evaluation_objects.context.item_features(additional_data["feature_data"])
+        self._total_features = self._feature_map.n_features
 
     @staticmethod
     def name():
@@ -50,43 +54,18 @@ class SRecall(BaseMetric):
         """
         return "SRecall"
 
-    @staticmethod
-    def __user_srecall(user_recommendations, cutoff, user_relevant_items, feature_map, total_features):
-        """
-        Per User SRecall
-        :param user_recommendations: list of user recommendation in the form [(item1,value1),...]
-        :param cutoff: numerical threshold to limit the recommendation list
-        :param user_relevant_items: list of user relevant items in the form [item1,...]
-        :return: the value of the Precision metric for the specific user
-        """
-        subtopics = len({topic for i, _ in user_recommendations[:cutoff] if i in user_relevant_items for topic in feature_map.get(i, [])})
-        return subtopics/total_features if total_features != 0 else 0
-
-    # def eval(self):
-    #     """
-    #     Evaluation function
-    #     :return: the overall averaged value of SRecall
-    #     """
-    #     return np.average(
-    #         [SRecall.__user_srecall(u_r, self._cutoff, self._relevant_items[u], self._feature_map,self._total_features)
-    #          for u, u_r in self._recommendations.items() if len(self._relevant_items[u])]
-    #     )
-
     def eval_user_metric(self):
         """
         Evaluation function
         :return: the overall averaged value of SRecall
         """
-        return {u: SRecall.__user_srecall(u_r, self._cutoff, self._relevance.get_user_rel(u), self._feature_map, self._total_features)
-             for u, u_r in self._recommendations.items() if len(self._relevance.get_user_rel(u))}
-
-    @staticmethod
-    def _load_attribute_file(attribute_file, separator='\t'):
-        map = {}
-        with open(attribute_file) as file:
-            for line in file:
-                line = line.split(separator)
-                int_list = [int(i) for i in line[1:]]
-                map[int(line[0])] = list(set(int_list))
-        return map
-
+        recommendations = TopKRecommendations.from_dict(self._recommendations, self._evaluation_objects.data)
+        ranking = self._evaluation_objects.relevance.get_ranking_relevance(recommendations)
+        items = recommendations.item_ids[:, :self._cutoff]
+        rows, positions = np.nonzero(ranking.hit_matrix[:, :self._cutoff])
+        relevant_recommended = sp.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, items[rows, positions])),
+                                             shape=(len(items), self._feature_map.features.shape[0]))
+        # -- the product keeps a non-zero for every distinct subtopic of the relevant recommended items
+        subtopics = (relevant_recommended @ self._feature_map.features).getnnz(axis=1)
+        values = subtopics / self._total_features if self._total_features != 0 else np.zeros(len(items))
+        return ranking.user_metric(values, ranking.binary_users)
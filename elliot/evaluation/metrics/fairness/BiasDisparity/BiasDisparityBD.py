@@ -8,9 +8,6 @@ __author__ = 'Vito Walter Anelli, Claudio Pomo'
 __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 
 import numpy as np
-import pandas as pd
-
-from collections import Counter
 
 from . import BiasDisparityBR, BiasDisparityBS
 
@@ -55,25 +52,29 @@ class BiasDisparityBD(BaseMetric):
         self._item_clustering_path = self._additional_data.get("item_clustering_file", False)
 
         if self._item_clustering_path:
-            self._item_clustering = pd.read_csv(self._item_clustering_path, sep="\t", header=None)
-            self._item_n_clusters = self._item_clustering[1].nunique()
-            self._item_clustering = dict(zip(self._item_clustering[0], self._item_clustering[1]))
+            self._item_clustering = self._evaluation_objects.context.item_clustering(self._item_clustering_path)
+            self._item_n_clusters = self._item_clustering.n_clusters
+            self._item_clusters = self._item_clustering.clusters
             self._item_clustering_name = self._additional_data['item_clustering_name']
         else:
             self._item_n_clusters = 1
-            self._item_clustering = {}
+            self._item_clustering = None
+            # -- without a clustering, all the items are in the same group
+            self._item_clusters = np.zeros(self._evaluation_objects.data.num_items, dtype=np.int32)
             self._item_clustering_name = ""
 
         self._user_clustering_path = self._additional_data.get("user_clustering_file", False)
 
         if self._user_clustering_path:
-            self._user_clustering = pd.read_csv(self._user_clustering_path, sep="\t", header=None)
-            self._user_n_clusters = self._user_clustering[1].nunique()
-            self._user_clustering = dict(zip(self._user_clustering[0], self._user_clustering[1]))
+            self._user_clustering = self._evaluation_objects.context.user_clustering(self._user_clustering_path)
+            self._user_n_clusters = self._user_clustering.n_clusters
+            self._user_clusters = self._user_clustering.clusters
             self._user_clustering_name = self._additional_data['user_clustering_name']
         else:
             self._user_n_clusters = 1
-            self._user_clustering = {}
+            self._user_clustering = None
+            # -- without a clustering, all the users are in the same group
+            self._user_clusters = np.zeros(self._evaluation_objects.data.num_users, dtype=np.int32)
             self._user_clustering_name = ""
 
         self._category_sum = np.zeros((self._user_n_clusters,self._item_n_clusters))
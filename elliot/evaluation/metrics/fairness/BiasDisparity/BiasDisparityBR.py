@@ -8,12 +8,10 @@ __author__ = 'Vito Walter Anelli, Claudio Pomo'
 __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 
 import numpy as np
-import pandas as pd
-
-from collections import Counter
 
 from elliot.evaluation.metrics.base_metric import BaseMetric
 from elliot.evaluation.metrics.metrics_utils import ProxyMetric
+from elliot.utils.recommendations import TopKRecommendations
 
 class BiasDisparityBR(BaseMetric):
     r"""
@@ -52,25 +50,29 @@ class BiasDisparityBR(BaseMetric):
         self._item_clustering_path = self._additional_data.get("item_clustering_file", False)
 
         if self._item_clustering_path:
-            self._item_clustering = pd.read_csv(self._item_clustering_path, sep="\t", header=None)
-            self._item_n_clusters = self._item_clustering[1].nunique()
-            self._item_clustering = dict(zip(self._item_clustering[0], self._item_clustering[1]))
+            self._item_clustering = self._evaluation_objects.context.item_clustering(self._item_clustering_path)
+            self._item_n_clusters = self._item_clustering.n_clusters
+            self._item_clusters = self._item_clustering.clusters
             self._item_clustering_name = self._additional_data['item_clustering_name']
         else:
             self._item_n_clusters = 1
-            self._item_clustering = {}
+            self._item_clustering = None
+            # -- without a clustering, all the items are in the same group
+            self._item_clusters = np.zeros(self._evaluation_objects.data.num_items, dtype=np.int32)
             self._item_clustering_name = ""
 
         self._user_clustering_path = self._additional_data.get("user_clustering_file", False)
 
         if self._user_clustering_path:
-            self._user_clustering = pd.read_csv(self._user_clustering_path, sep="\t", header=None)
-            self._user_n_clusters = self._user_clustering[1].nunique()
-            self._user_clustering = dict(zip(self._user_clustering[0], self._user_clustering[1]))
+            self._user_clustering = self._evaluation_objects.context.user_clustering(self._user_clustering_path)
+            self._user_n_clusters = self._user_clustering.n_clusters
+            self._user_clusters = self._user_clustering.clusters
             self._user_clustering_name = self._additional_data['user_clustering_name']
         else:
             self._user_n_clusters = 1
-            self._user_clustering = {}
+            self._user_clustering = None
+            # -- without a clustering, all the users are in the same group
+            self._user_clusters = np.zeros(self._evaluation_objects.data.num_users, dtype=np.int32)
             self._user_clustering_name = ""
 
         self._category_sum = np.zeros((self._user_n_clusters,self._item_n_clusters))
@@ -85,20 +87,18 @@ class BiasDisparityBR(BaseMetric):
         """
         return f"BiasDisparityBR_users:{self._user_clustering_name}_items:{self._item_clustering_name}"
 
-    def __item_bias_disparity_br(self, user, user_recommendations, cutoff):
+    def __item_bias_disparity_br(self, recommendations, cutoff):
         """
-        Per User Bias Disparity - Bias Recommendations
-        :param user_recommendations: list of user recommendation in the form [(item1,value1),...]
-        :param cutoff: numerical threshold to limit the recommendation list
-        :return: the value of the Bias Disparity - Bias Recommendations metric for the specific user
+        Bias Disparity - Bias Recommendations counts of all the users
+        :param recommendations: columnar top-k recommendations
+        :param cutoff: numerical threshold to limit the recommendation lists
         """
-        user_group = self._user_clustering.get(user, None if self._user_clustering else 0)
-        if user_group is not None:
-            for i, _ in user_recommendations[:cutoff]:
-                item_category = self._item_clustering.get(i, None if self._item_clustering else 0)
-                if item_category is not None:
-                    self._category_sum[user_group,item_category] += 1
-                    self._total_sum[user_group] += 1
+        items = recommendations.item_ids[:, :cutoff]
+        user_groups = np.broadcast_to(self._user_clusters[recommendations.users][:, None], items.shape)
+        item_categories = np.where(items >= 0, self._item_clusters[np.maximum(items, 0)], -1)
+        keep = (user_groups >= 0) & (item_categories >= 0)
+        np.add.at(self._category_sum, (user_groups[keep], item_categories[keep]), 1)
+        self._total_sum += np.bincount(user_groups[keep], minlength=self._user_n_clusters)
 
     def eval(self):
         pass
@@ -109,11 +109,13 @@ class BiasDisparityBR(BaseMetric):
         :return: the overall value of Bias Disparity - Bias Recommendations
         """
 
-        for u, u_r in self._recommendations.items():
-            self.__item_bias_disparity_br(u, u_r, self._cutoff)
+        self.__item_bias_disparity_br(TopKRecommendations.from_dict(self._recommendations, self._evaluation_objects.data),
+                                      self._cutoff)
 
-        clustering_count = Counter(self._item_clustering.values())
-        PC = np.array([clustering_count.get(c, 0)/ len(self._item_clustering) if self._item_clustering else 1 for c in range(self._item_n_clusters)])
+        if self._item_clustering:
+            PC = self._item_clustering.sizes[:self._item_n_clusters] / self._item_clustering.n_entries
+        else:
+            PC = np.ones(self._item_n_clusters)
         self._BR = ((self._category_sum.T/self._total_sum).T)/PC
 
         self._metric_objs_list = []
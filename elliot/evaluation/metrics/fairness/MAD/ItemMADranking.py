@@ -8,7 +8,6 @@ __author__ = 'Vito Walter Anelli, Claudio Pomo'
 __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 
 import numpy as np
-import pandas as pd
 from elliot.evaluation.metrics.base_metric import BaseMetric
 
 
@@ -48,12 +47,13 @@ class ItemMADranking(BaseMetric):
         self._item_clustering_path = self._additional_data.get("clustering_file", False)
         self._item_clustering_name = self._additional_data.get("clustering_name", "")
         if self._item_clustering_path:
-            self._item_clustering = pd.read_csv(self._additional_data["clustering_file"], sep="\t", header=None)
-            self._n_clusters = self._item_clustering[1].nunique()
-            self._item_clustering = dict(zip(self._item_clustering[0], self._item_clustering[1]))
+            clustering = self._evaluation_objects.context.item_clustering(self._item_clustering_path)
+            self._n_clusters = clustering.n_clusters
+            self._item_clustering = clustering.clusters
         else:
             self._n_clusters = 1
-            self._item_clustering = {}
+            self._item_clustering = np.full(self._evaluation_objects.data.num_items, -1, dtype=np.int32)
+        self._public_items = self._evaluation_objects.data.public_items
 
         self._sum = np.zeros(self._n_clusters)
         self._n_items = np.zeros(self._n_clusters)
@@ -92,9 +92,9 @@ class ItemMADranking(BaseMetric):
 
         for item, gain in self._item_gain.items():
             v = gain/self._item_count[item]
-            cluster = self._item_clustering.get(item, None)
+            cluster = self._item_clustering[self._public_items[item]]
 
-            if cluster is not None:
+            if cluster >= 0:
                 self._sum[cluster] += v
                 self._n_items[cluster] += 1
 
@@ -8,7 +8,6 @@ __author__ = 'Vito Walter Anelli, Claudio Pomo'
 __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 
 import numpy as np
-import pandas as pd
 from elliot.evaluation.metrics.base_metric import BaseMetric
 
 
@@ -48,12 +47,13 @@ class UserMADrating(BaseMetric):
         self._user_clustering_path = self._additional_data.get("clustering_file", False)
         self._user_clustering_name = self._additional_data.get("clustering_name", "")
         if self._user_clustering_path:
-            self._user_clustering = pd.read_csv(self._additional_data["clustering_file"], sep="\t", header=None)
-            self._n_clusters = self._user_clustering[1].nunique()
-            self._user_clustering = dict(zip(self._user_clustering[0], self._user_clustering[1]))
+            clustering = self._evaluation_objects.context.user_clustering(self._user_clustering_path)
+            self._n_clusters = clustering.n_clusters
+            self._user_clustering = clustering.clusters
         else:
             self._n_clusters = 1
-            self._user_clustering = {}
+            self._user_clustering = np.full(self._evaluation_objects.data.num_users, -1, dtype=np.int32)
+        self._public_users = self._evaluation_objects.data.public_users
 
         self._sum = np.zeros(self._n_clusters)
         self._n_users = np.zeros(self._n_clusters)
@@ -85,8 +85,8 @@ class UserMADrating(BaseMetric):
         for u, u_r in self._recommendations.items():
             if len(self._relevance.get_user_rel(u)):
                 v = UserMADrating.__user_mad(u_r, self._cutoff, self._relevance.get_user_rel(u))
-                cluster = self._user_clustering.get(u, None)
-                if cluster is not None:
+                cluster = self._user_clustering[self._public_users[u]]
+                if cluster >= 0:
                     self._sum[cluster] += v
                     self._n_users[cluster] += 1
 
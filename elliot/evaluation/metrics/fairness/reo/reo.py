@@ -8,7 +8,6 @@ __author__ = 'Vito Walter Anelli, Claudio Pomo'
 __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 
 import numpy as np
-import pandas as pd
 
 from elliot.evaluation.metrics.base_metric import BaseMetric
 from elliot.evaluation.metrics.metrics_utils import ProxyMetric
@@ -65,9 +64,9 @@ class REO(BaseMetric):
         self._item_clustering_path = self._additional_data.get("clustering_file", False)
 
         if self._item_clustering_path:
-            self._item_clustering = pd.read_csv(self._item_clustering_path, sep="\t", header=None, names=["id","cluster"])
-            self._item_n_clusters = self._item_clustering['cluster'].nunique()
-            self._item_clustering = self._item_clustering.groupby('cluster')['id'].apply(set).to_dict()
+            clustering = self._evaluation_objects.context.item_clustering(self._item_clustering_path)
+            self._item_n_clusters = clustering.n_clusters
+            self._item_clustering = clustering.groups
             self._item_clustering_name = self._additional_data['clustering_name']
         else:
             self._item_n_clusters = 1
@@ -101,17 +101,15 @@ class EFD(BaseMetric):
         Evaluation function
         :return: the overall averaged value of Expected Free Discovery per user
         """
+        context = self._evaluation_objects.context
+        ranking = self._evaluation_objects.relevance.get_ranking_relevance(self._recommendations)
+        if ranking is not None:
+            return ranking.user_metric(ranking.expected_novelty(self._cutoff, context.efd_novelty), ranking.binary_users)
 
-        self._item_count = {}
-        for u_h in self._evaluation_objects.data.train_dict.values():
-            for i in u_h.keys():
-                self._item_count[i] = self._item_count.get(i, 0) + 1
-
-        novelty_profile = self._item_count.values()
-        norm = sum(novelty_profile)
-        self._max_nov = -math.log(min(novelty_profile) / norm) / math.log(2)
-        self._item_novelty_dict = {i: -math.log(v / norm) / math.log(2) for i, v in self._item_count.items()}
+        data = self._evaluation_objects.data
+        self._item_novelty_dict = dict(zip(map(data.private_items.get, range(data.num_items)),
+                                           context.efd_novelty.tolist()))
+        self._max_nov = context.efd_novelty.max() if data.num_items else 0
 
         return {u: self.__user_EFD(u_r, u, self._cutoff)
                 for u, u_r in self._recommendations.items() if len(self._relevance.get_user_rel(u))}
-
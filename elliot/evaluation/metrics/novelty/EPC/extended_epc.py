@@ -101,16 +101,16 @@ class ExtendedEPC(BaseMetric):
         Evaluation function
         :return: the overall averaged value of Expected Popularity Complement per user
         """
+        context = self._evaluation_objects.context
+        ranking = self._evaluation_objects.relevance.get_ranking_relevance(self._recommendations)
+        if ranking is not None:
+            discounted = self._relevance_type == "discounted"
+            users = ranking.discounted_users if discounted else ranking.binary_users
+            return ranking.user_metric(ranking.expected_novelty(self._cutoff, context.epc_novelty, discounted), users)
 
-
-        item_count = {}
-        for u_h in self._evaluation_objects.data.train_dict.values():
-            for i in u_h.keys():
-                item_count[i] = item_count.get(i, 0) + 1
-
-        num_users = len(self._evaluation_objects.data.train_dict)
-        self._item_novelty_dict = {i: 1 - (v / num_users) for i, v in item_count.items()}
+        data = self._evaluation_objects.data
+        self._item_novelty_dict = dict(zip(map(data.private_items.get, range(data.num_items)),
+                                           context.epc_novelty.tolist()))
 
         return {u: self.__user_EPC(u_r, u, self._cutoff)
              for u, u_r in self._recommendations.items() if len(self._relevance.get_user_rel(u))}
-
@@ -8,51 +8,88 @@ __version__ = '0.3.1'
 __author__ = 'Vito Walter Anelli, Claudio Pomo, Alejandro Bellogín'
 __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it, alejandro.bellogin@uam.es'
 
-import operator
-
 import typing as t
 
+import numpy as np
+import scipy.sparse as sp
+
 
 class Popularity(object):
-    def __init__(self, data, pop_ratio=0.8):
+    """
+    Item popularity as arrays over the private item ids.
+
+    counts holds the number of training users of every item, ranking the private items sorted by decreasing
+    popularity (ties in private id order), and short_head / long_tail are boolean masks: the short head is
+    the smallest prefix of the ranking covering pop_ratio of the training transactions.
+    The legacy getters return the same information as dictionaries and lists of public ids.
+    """
+
+    def __init__(self, data, pop_ratio=0.8, counts: np.ndarray = None):
+        """
+        :param data: dataset object
+        :param pop_ratio: share of the transactions covered by the short head
+        :param counts: training users of every item, computed from data when missing
+        """
         self._data = data
+        self._pop_ratio = pop_ratio
+        if counts is None:
+            counts = np.diff(sp.csc_matrix(data.sp_i_train).indptr)
+        self._counts = np.asarray(counts, dtype=np.int32)
+        self._ranking = None
+        self._short_head_mask = None
         self._pop_items = {}
         self._sorted_pop_items = {}
         self._short_head = []
         self._long_tail = []
-        self._pop_ratio = pop_ratio
 
-    def get_pop_items(self):
+    @property
+    def counts(self) -> np.ndarray:
+        return self._counts
+
+    @property
+    def ranking(self) -> np.ndarray:
+        if self._ranking is None:
+            self._ranking = np.argsort(-self._counts.astype(np.int64), kind="stable").astype(np.int32)
+        return self._ranking
+
+    @property
+    def short_head_mask(self) -> np.ndarray:
+        if self._short_head_mask is None:
+            ranked_counts = np.cumsum(self._counts[self.ranking], dtype=np.int64)
+            # -- items are added until the short head covers the limit, the item crossing it included
+            size = min(int(np.searchsorted(ranked_counts, self._data.transactions * self._pop_ratio)) + 1,
+                       len(self._counts))
+            self._short_head_mask = np.zeros(len(self._counts), dtype=bool)
+            self._short_head_mask[self.ranking[:size]] = True
+        return self._short_head_mask
+
+    @property
+    def long_tail_mask(self) -> np.ndarray:
+        return ~self.short_head_mask
+
+    def get_pop_items(self) -> t.Dict:
         if not self._pop_items:
-            self._pop_items = {self._data.private_items[p]: pop for p, pop in
-                               enumerate(self._data.sp_i_train.astype(bool).sum(axis=0).tolist()[0])}
+            self._pop_items = dict(zip(map(self._data.private_items.get, range(len(self._counts))),
+                                       self._counts.tolist()))
         return self._pop_items
 
-    def get_sorted_pop_items(self):
-        if (not self._pop_items) or (not self._sorted_pop_items):
-            self.get_pop_items()
-            self._sorted_pop_items = dict(sorted(self._pop_items.items(), key=operator.itemgetter(1), reverse=True))
+    def get_sorted_pop_items(self) -> t.Dict:
+        if not self._sorted_pop_items:
+            self._sorted_pop_items = dict(zip(map(self._data.private_items.get, self.ranking.tolist()),
+                                              self._counts[self.ranking].tolist()))
         return self._sorted_pop_items
 
-    def get_short_head(self):
+    def get_short_head(self) -> t.List:
         if not self._short_head:
-            self.get_sorted_pop_items()
-            short_head_limit = self._data.transactions * self._pop_ratio
-            self._short_head = []
-            for i, pop in self._sorted_pop_items.items():
-                self._short_head.append(i)
-                short_head_limit -= pop
-                if short_head_limit <= 0:
-                    break
+            ranking = self.ranking[self.short_head_mask[self.ranking]]
+            self._short_head = list(map(self._data.private_items.get, ranking.tolist()))
         return self._short_head
 
-    def get_long_tail(self):
+    def get_long_tail(self) -> t.List:
         if not self._long_tail:
-            self.get_short_head()
-            self._long_tail = [i for i in self._sorted_pop_items.keys() if i not in self._short_head]
+            ranking = self.ranking[self.long_tail_mask[self.ranking]]
+            self._long_tail = list(map(self._data.private_items.get, ranking.tolist()))
         return self._long_tail
 
     def get_custom_pop_obj(self, pop_ratio=.8):
-        return Popularity(self._data, pop_ratio)
-
-
+        return Popularity(self._data, pop_ratio, self._counts)
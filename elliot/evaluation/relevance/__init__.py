@@ -7,4 +7,5 @@ __version__ = '0.3.1'
 __author__ = 'Vito Walter Anelli, Claudio Pomo'
 __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 
-from .relevance import Relevance
\ No newline at end of file
+from .relevance import Relevance
+from .ranking_relevance import RankingRelevance, RelevanceMatrix
\ No newline at end of file
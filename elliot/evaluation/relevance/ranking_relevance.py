@@ -0,0 +1,202 @@
+"""
+Module description:
+
+"""
+
+__version__ = '0.3.1'
+__author__ = 'Vito Walter Anelli, Claudio Pomo'
+__email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
+
+import typing as t
+
+import numpy as np
+import scipy.sparse as sp
+
+
+def logarithmic_discounts(length: int) -> np.ndarray:
+    """
+    Vector of the logarithmic ranking discounts of the first length positions
+    """
+    return np.log(2) / np.log(np.arange(length) + 2)
+
+
+class RelevanceMatrix(object):
+    """
+    Test relevance of a split as users x items sparse matrices of private ids.
+
+    Gains are the test ratings (discounted relevance), relevant items are the ones rated at least
+    rel_threshold (binary relevance). Test items unknown to the training set cannot be recommended,
+    but they still count in the number of relevant items and in the ideal rankings of the users.
+    """
+
+    def __init__(self, test, rel_threshold, data):
+        users, items, gains = [], [], []
+        for u, test_items in test.items():
+            if u in data.public_users:
+                users.extend([data.public_users[u]] * len(test_items))
+                items.extend(test_items.keys())
+                gains.extend(test_items.values())
+        users = np.array(users, dtype=np.int64)
+        items = np.array([data.public_items.get(i, -1) for i in items], dtype=np.int64)
+        gains = np.array(gains, dtype=np.float64)
+        relevant = gains >= rel_threshold
+        known = items >= 0
+        shape = (data.num_users, data.num_items)
+
+        self._gains = sp.csr_matrix((gains[known], (users[known], items[known])), shape=shape)
+        self._relevant = sp.csr_matrix((np.ones(np.count_nonzero(known & relevant), dtype=bool),
+                                        (users[known & relevant], items[known & relevant])), shape=shape)
+        self._n_rated = np.bincount(users, minlength=data.num_users)
+        self._n_relevant = np.bincount(users[relevant], minlength=data.num_users)
+
+        order = np.lexsort((-gains, users))
+        self._ideal_users = users[order]
+        self._ideal_gains = gains[order]
+        self._ideal_ranks = np.arange(len(order)) - np.searchsorted(self._ideal_users, self._ideal_users)
+
+    @property
+    def relevant(self) -> sp.csr_matrix:
+        """users x items boolean matrix of the relevant test items known to the training set"""
+        return self._relevant
+
+    @property
+    def n_rated(self) -> np.ndarray:
+        return self._n_rated
+
+    @property
+    def n_relevant(self) -> np.ndarray:
+        return self._n_relevant
+
+    def get_gains(self, users, items) -> np.ndarray:
+        """Element-wise gains of the (users[n], items[n]) pairs"""
+        return np.asarray(self._gains[users, items], dtype=np.float64).ravel() if len(users) else np.zeros(0)
+
+    def is_relevant(self, users, items) -> np.ndarray:
+        """Element-wise binary relevance of the (users[n], items[n]) pairs"""
+        return np.asarray(self._relevant[users, items], dtype=bool).ravel() if len(users) else np.zeros(0, bool)
+
+    def ideal_dcg(self, cutoff: int) -> np.ndarray:
+        """Per user Discounted Cumulative Gain of the ideal ranking of length cutoff"""
+        keep = self._ideal_ranks < cutoff
+        weights = self._ideal_gains[keep] * logarithmic_discounts(cutoff)[self._ideal_ranks[keep]]
+        return np.bincount(self._ideal_users[keep], weights=weights, minlength=len(self._n_rated))
+
+
+class RankingRelevance(object):
+    """
+    Relevance of the recommended items, computed once for a TopKRecommendations container.
+
+    It holds the users x k hit and gain matrices with their cumulative sums: the accuracy metrics of
+    any cutoff are then read as columns of these matrices. All the returned arrays are aligned with
+    the users of the recommendations.
+    """
+
+    def __init__(self, recommendations, relevance_matrix: RelevanceMatrix):
+        self._recommendations = recommendations
+        users = recommendations.users.astype(np.int64)
+        items = recommendations.item_ids
+        valid = items >= 0
+        rows = np.broadcast_to(users[:, None], items.shape)[valid]
+
+        hits = np.zeros(items.shape, dtype=bool)
+        hits[valid] = relevance_matrix.is_relevant(rows, items[valid])
+        gains = np.zeros(items.shape, dtype=np.float64)
+        gains[valid] = relevance_matrix.get_gains(rows, items[valid])
+
+        self._hits = hits
+        self._gains = gains
+        self._width = items.shape[1]
+        self._cum_hits = np.cumsum(hits, axis=1)
+        self._first_hit = hits.argmax(axis=1)
+        positions = np.arange(1, self._width + 1)
+        self._precision_prefix = np.cumsum(self._cum_hits / positions, axis=1)
+        self._hits_prefix = np.cumsum(self._cum_hits, axis=1)
+        self._dcg = np.cumsum(gains * logarithmic_discounts(self._width), axis=1)
+
+        self._relevance_matrix = relevance_matrix
+        self._n_rated = relevance_matrix.n_rated[users]
+        self._n_relevant = relevance_matrix.n_relevant[users]
+
+    @property
+    def recommendations(self):
+        return self._recommendations
+
+    @property
+    def hit_matrix(self) -> np.ndarray:
+        """users x k binary relevance of the recommended items"""
+        return self._hits
+
+    @property
+    def binary_users(self) -> np.ndarray:
+        """Mask of the users with at least a relevant test item"""
+        return self._n_relevant > 0
+
+    @property
+    def discounted_users(self) -> np.ndarray:
+        """Mask of the users with at least a test item"""
+        return self._n_rated > 0
+
+    def _at(self, cumulative: np.ndarray, cutoff: int) -> np.ndarray:
+        """Column cutoff of a cumulative matrix: lists shorter than cutoff keep their last value"""
+        if not self._width:
+            return np.zeros(len(cumulative))
+        return cumulative[:, min(cutoff, self._width) - 1]
+
+    def hits(self, cutoff: int) -> np.ndarray:
+        return self._at(self._cum_hits, cutoff)
+
+    def precision(self, cutoff: int) -> np.ndarray:
+        return self.hits(cutoff) / cutoff
+
+    def recall(self, cutoff: int) -> np.ndarray:
+        return self.hits(cutoff) / np.maximum(self._n_relevant, 1)
+
+    def hit_rate(self, cutoff: int) -> np.ndarray:
+        return (self.hits(cutoff) > 0).astype(np.float64)
+
+    def reciprocal_rank(self, cutoff: int) -> np.ndarray:
+        return np.where(self.hits(cutoff) > 0, 1 / (self._first_hit + 1), 0)
+
+    def average_precision(self, cutoff: int) -> np.ndarray:
+        """Mean over n = 1..cutoff of the precision at n"""
+        tail = np.sum(1 / np.arange(self._width + 1, cutoff + 1))
+        return (self._at(self._precision_prefix, cutoff) + self.hits(cutoff) * tail) / cutoff
+
+    def average_recall(self, cutoff: int) -> np.ndarray:
+        """Mean over n = 1..cutoff of the recall at n"""
+        tail = max(cutoff - self._width, 0)
+        return (self._at(self._hits_prefix, cutoff) + self.hits(cutoff) * tail) / cutoff / np.maximum(self._n_relevant, 1)
+
+    def f_score(self, cutoff: int, squared_beta: float = 1) -> np.ndarray:
+        p = self.precision(cutoff)
+        r = self.recall(cutoff)
+        den = (squared_beta * p) + r
+        return np.divide((1 + squared_beta) * p * r, den, out=np.zeros(len(den)), where=den != 0)
+
+    def ndcg(self, cutoff: int) -> np.ndarray:
+        dcg = self._at(self._dcg, cutoff)
+        idcg = self._relevance_matrix.ideal_dcg(cutoff)[self._recommendations.users]
+        return np.divide(dcg, idcg, out=np.zeros(len(dcg)), where=dcg > 0)
+
+    def expected_novelty(self, cutoff: int, item_novelty: np.ndarray, discounted: bool = False) -> np.ndarray:
+        """
+        Novelty of the relevant recommended items, weighted by their relevance and logarithmic discount and
+        normalized by the discounts of the recommended positions (EPC, EFD)
+        :param item_novelty: novelty of every private item
+        :param discounted: weigh the items by their test gains instead of their binary relevance
+        """
+        items = self._recommendations.item_ids[:, :cutoff]
+        discounts = logarithmic_discounts(items.shape[1]) * (items >= 0)
+        relevance = (self._gains if discounted else self._hits)[:, :cutoff]
+        novelty = (relevance * discounts * item_novelty[np.maximum(items, 0)]).sum(axis=1)
+        norm = discounts.sum(axis=1)
+        return np.divide(novelty, norm, out=np.zeros(len(novelty)), where=norm > 0)
+
+    def user_metric(self, values: np.ndarray, users: np.ndarray) -> t.Dict:
+        """
+        Per user values as the {user: value} dictionary of the statistical tests
+        :param values: metric values aligned with the recommended users
+        :param users: mask of the users the metric is defined on
+        """
+        public_users = map(self._recommendations.private_users.get, self._recommendations.users[users].tolist())
+        return dict(zip(public_users, values[users].tolist()))
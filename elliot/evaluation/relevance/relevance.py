@@ -11,17 +11,43 @@ import typing as t
 import math
 from abc import ABC, abstractmethod
 
+from elliot.utils.recommendations import TopKRecommendations
+from .ranking_relevance import RankingRelevance, RelevanceMatrix
+
 
 class Relevance(object):
-    def __init__(self, test, rel_threshold):
+    def __init__(self, test, rel_threshold, data=None):
         self._test = test
         self._rel_threshold = rel_threshold
+        self._data = data
         self._binary_relevance = None
         self._discounted_relevance = None
+        self._relevance_matrix = None
+        self._ranking_relevance = None
 
     def get_test(self):
         return self._test
 
+    ############## Vectorized relevance ##############
+
+    @property
+    def relevance_matrix(self):
+        if self._relevance_matrix is None:
+            self._relevance_matrix = RelevanceMatrix(self._test, self._rel_threshold, self._data)
+        return self._relevance_matrix
+
+    def get_ranking_relevance(self, recommendations):
+        """
+        Hit matrices of the recommendations, shared by all the metrics and cutoffs evaluated on them
+        :param recommendations: recommendations under evaluation
+        :return: RankingRelevance, or None when recommendations are a legacy dictionary
+        """
+        if self._data is None or not isinstance(recommendations, TopKRecommendations):
+            return None
+        if self._ranking_relevance is None or self._ranking_relevance.recommendations is not recommendations:
+            self._ranking_relevance = RankingRelevance(recommendations, self.relevance_matrix)
+        return self._ranking_relevance
+
     ############## Discounted relevance ##############
 
     @property
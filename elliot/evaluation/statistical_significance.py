@@ -11,27 +11,63 @@ import typing as t
 import numpy as np
 
 
+class UserValues(object):
+    """
+    Per user values of a metric, as float64 values aligned with the sorted private ids of the users.
+    """
+
+    def __init__(self, users, values):
+        """
+        :param users: private user ids
+        :param values: values of the users
+        """
+        users = np.asarray(users, dtype=np.int32)
+        order = np.argsort(users, kind="stable")
+        self._users = users[order]
+        self._values = np.asarray(values, dtype=np.float64)[order]
+
+    @classmethod
+    def from_dict(cls, user_values: t.Dict, public_users: t.Dict):
+        """
+        :param user_values: {public user: value}, as returned by eval_user_metric
+        :param public_users: {public user: private user}
+        """
+        users = np.fromiter(map(public_users.get, user_values.keys()), dtype=np.int64, count=len(user_values))
+        return cls(users, np.fromiter(user_values.values(), dtype=np.float64, count=len(user_values)))
+
+    @property
+    def users(self) -> np.ndarray:
+        return self._users
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values
+
+    def values_of(self, users: np.ndarray) -> np.ndarray:
+        """Values of a sorted subset of the users"""
+        return self._values[np.searchsorted(self._users, users)]
+
+    def __len__(self):
+        return len(self._users)
+
+
 class PairedTTest:
     @staticmethod
-    def common_users(arr_0: t.Dict[int, float], arr_1:  t.Dict[int, float]):
-        return list(arr_0.keys() & arr_1.keys())
+    def common_users(arr_0: UserValues, arr_1: UserValues) -> np.ndarray:
+        return np.intersect1d(arr_0.users, arr_1.users, assume_unique=True)
 
     @staticmethod
-    def compare(arr_0: t.Dict[int, float], arr_1:  t.Dict[int, float], users: t.List[int]):
-        list_0 = list(map(arr_0.get, users))
-        list_1 = list(map(arr_1.get, users))
-        return stats.ttest_rel(list_0, list_1)[1]
+    def compare(arr_0: UserValues, arr_1: UserValues, users: np.ndarray):
+        return stats.ttest_rel(arr_0.values_of(users), arr_1.values_of(users))[1]
 
 
 class WilcoxonTest:
     @staticmethod
-    def common_users(arr_0: t.Dict[int, float], arr_1:  t.Dict[int, float]):
-        return list(arr_0.keys() & arr_1.keys())
+    def common_users(arr_0: UserValues, arr_1: UserValues) -> np.ndarray:
+        return np.intersect1d(arr_0.users, arr_1.users, assume_unique=True)
 
     @staticmethod
-    def compare(arr_0: t.Dict[int, float], arr_1:  t.Dict[int, float], users: t.List[int]):
-        list_0 = list(map(arr_0.get, users))
-        list_1 = list(map(arr_1.get, users))
-        return stats.wilcoxon(list_0, list_1)[1] if any(np.array(list_0) - np.array(list_1)) else np.nan
-
-
+    def compare(arr_0: UserValues, arr_1: UserValues, users: np.ndarray):
+        list_0 = arr_0.values_of(users)
+        list_1 = arr_1.values_of(users)
+        return stats.wilcoxon(list_0, list_1)[1] if np.any(list_0 != list_1) else np.nan
@@ -8,6 +8,7 @@ __author__ = 'Vito Walter Anelli, Claudio Pomo'
 __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 
 from elliot.hyperoptimization.model_coordinator import ModelCoordinator
+from elliot.hyperoptimization.trial_executor import ParallelTrialExecutor
 from hyperopt import tpe, atpe, mix, rand, anneal
 import numpy as np
 
@@ -46,6 +47,8 @@ def suggest(new_ids, domain, trials, seed, nbMaxSucessiveFailures=1000):
                 (key, None)) for key, value in vals.items()]))
             if h not in hashset:
                 newSample = True
+                # -- batches of new_ids must not repeat a configuration either
+                hashset.add(h)
             else:
                 # Duplicated sample, ignore
                 nbSucessiveFailures += 1
@@ -92,28 +92,41 @@ class ModelCoordinator(object):
         for k, v in self.params.__dict__.items():
             self.logger.info(f"{k} set to {v}")
 
-        losses = []
-        results = []
-        for trainval_index, data_obj in enumerate(self.data_objs):
-            self.logger.info(f"Exploration: Test Fold exploration number {self.test_fold_index+1}")
-            self.logger.info(f"Exploration: Train-Validation Fold exploration number {trainval_index+1}")
-            model = self.model_class(data=data_obj, config=self.base, params=self.params)
-            model.train()
-            losses.append(model.get_loss())
-            results.append(model.get_results())
+        return self.aggregate_folds([self.single_fold(trainval_index) for trainval_index in range(len(self.data_objs))])
 
-        loss = np.average(losses)
-        results = self._average_results(results)
+    def single_fold(self, trainval_index: int):
+        """
+        Train and evaluate the model on a single Train-Validation fold
+        :param trainval_index: index of the Train-Validation fold
+        :return: a Dictionary with loss, results, params, and name of the trained model
+        """
+        self.logger.info(f"Exploration: Test Fold exploration number {self.test_fold_index+1}")
+        self.logger.info(f"Exploration: Train-Validation Fold exploration number {trainval_index+1}")
+        model = self.model_class(data=self.data_objs[trainval_index], config=self.base, params=self.params)
+        model.train()
+        return {'loss': model.get_loss(), 'results': model.get_results(), 'params': model.get_params(),
+                'name': model.name}
+
+    def aggregate_folds(self, folds):
+        """
+        Average the outcomes of single_fold over the Train-Validation folds
+        :param folds: list of single_fold outcomes, in fold order
+        :return: it returns a Dictionary with loss, and status being required by HyperOpt,
+        and params, and results being required by the framework
+        """
+        loss = np.average([fold['loss'] for fold in folds])
+        results = self._average_results([fold['results'] for fold in folds])
+        last = folds[-1]
 
         return {
             'loss': loss,
             'status': STATUS_OK,
-            'params': model.get_params(),
+            'params': last['params'],
             'val_results': {k: result_dict["val_results"] for k, result_dict in results.items()},
-            'val_statistical_results': {k: result_dict["val_statistical_results"] for k, result_dict in model.get_results().items()},
+            'val_statistical_results': {k: result_dict["val_statistical_results"] for k, result_dict in last['results'].items()},
             'test_results': {k: result_dict["test_results"] for k, result_dict in results.items()},
-            'test_statistical_results': {k: result_dict["test_statistical_results"] for k, result_dict in model.get_results().items()},
-            'name': model.name
+            'test_statistical_results': {k: result_dict["test_statistical_results"] for k, result_dict in last['results'].items()},
+            'name': last['name']
         }
 
     @staticmethod
@@ -0,0 +1,95 @@
+"""
+Module description:
+
+"""
+
+__version__ = '0.3.1'
+__author__ = 'Vito Walter Anelli, Claudio Pomo'
+__email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
+
+from concurrent.futures import ProcessPoolExecutor
+
+from hyperopt import base, pyll
+from hyperopt.utils import coarse_utcnow
+
+# ModelCoordinator of the worker process, with the DataSets of its fold, set once by the pool initializer
+_coordinator = None
+
+
+def _init_worker(coordinator):
+    global _coordinator
+    _coordinator = coordinator
+
+
+def _evaluate(tid, config):
+    _coordinator.model_config_index = tid
+    return _coordinator.objective(config)
+
+
+def _next_seed(rstate):
+    """Seed of the next suggestion, drawn from rstate as hyperopt.fmin does"""
+    return rstate.randint(2 ** 31 - 1) if hasattr(rstate, "randint") else rstate.integers(2 ** 31 - 1)
+
+
+class ParallelTrialExecutor(object):
+    """
+    Process-pool replacement of hyperopt.fmin for the ModelCoordinator objective.
+
+    Batches of workers configurations are suggested one trial at a time, each suggestion seeing the
+    pending trials of the batch as hyperopt does for asynchronous searches, and evaluated concurrently.
+    Each worker process receives the coordinator, hence the DataSets of the fold, once and reuses it for
+    all of its trials. Suggestions only depend on rstate, drawn once per trial as in hyperopt.fmin, and on
+    the results of the previous batches, and results are stored by trial id, so Trials and the best trial
+    do not depend on the completion order.
+    """
+
+    def __init__(self, coordinator, workers: int):
+        """
+        :param coordinator: ModelCoordinator of the fold
+        :param workers: number of worker processes, i.e. size of the batches of suggested trials
+        """
+        self._coordinator = coordinator
+        self._workers = workers
+
+    def fmin(self, space, algo, max_evals: int, trials: base.Trials, rstate):
+        """
+        Same contract of hyperopt.fmin
+        :param space: hyperparameter search space
+        :param algo: suggestion algorithm, e.g. tpe.suggest
+        :param max_evals: overall number of trials
+        :param trials: Trials object filled with the evaluated trials
+        :param rstate: random state shared with the serial search
+        :return: trials
+        """
+        domain = base.Domain(self._coordinator.objective, space)
+        with ProcessPoolExecutor(max_workers=self._workers, initializer=_init_worker,
+                                 initargs=(self._coordinator,)) as pool:
+            while len(trials) < max_evals:
+                # -- one call per free slot: past its startup trials tpe.suggest only returns the first new id
+                for _ in range(min(self._workers, max_evals - len(trials))):
+                    new_ids = trials.new_trial_ids(1)
+                    trials.refresh()
+                    new_trials = algo(new_ids, domain, trials, _next_seed(rstate))
+                    if not new_trials:
+                        break
+                    trials.insert_trial_docs(new_trials)
+                    trials.refresh()
+
+                batch = [trial for trial in trials._dynamic_trials if trial["state"] == base.JOB_STATE_NEW]
+                if not batch:
+                    break
+                futures = []
+                for trial in batch:
+                    trial["state"] = base.JOB_STATE_RUNNING
+                    trial["book_time"] = trial["refresh_time"] = coarse_utcnow()
+                    config = pyll.rec_eval(domain.expr, memo=domain.memo_from_config(base.spec_from_misc(trial["misc"])))
+                    futures.append(pool.submit(_evaluate, trial["tid"], config))
+
+                for trial, future in zip(batch, futures):
+                    result = dict(future.result())
+                    result["loss"] = float(result["loss"])
+                    trial["state"] = base.JOB_STATE_DONE
+                    trial["result"] = result
+                    trial["refresh_time"] = coarse_utcnow()
+                trials.refresh()
+        return trials
@@ -59,6 +59,7 @@ _data_paths = 'data_paths'
 _meta = 'meta'
 _random_seed = 'random_seed'
 _align_side_with_train = "align_side_with_train"
+_scheduler = 'scheduler'
 
 
 class NameSpaceModel:
@@ -128,7 +129,7 @@ class NameSpaceModel:
         for p in [_data_config, _weights, _recs, _dataset, _top_k, _performance, _logger_config,
                   _log_folder, _dataloader, _splitting, _prefiltering, _evaluation, _external_models_path,
                   _print_triplets, _config_test, _negative_sampling, _binarize, _random_seed, _align_side_with_train,
-                  _version]:
+                  _version, _scheduler]:
             if p == _data_config:
                 side_information = self.config[_experiment][p].get("side_information", None)
 
@@ -236,6 +237,16 @@ class NameSpaceModel:
                 setattr(self.base_namespace, p, self.config[_experiment].get(p, False))
             elif p == _align_side_with_train:
                 setattr(self.base_namespace, p, self.config[_experiment].get(p, True))
+            elif p == _scheduler:
+                if self.config[_experiment].get(p, False):
+                    scheduler = self.config[_experiment][p]
+                    shared_folder = scheduler.get("shared_folder", None)
+                    if shared_folder:
+                        shared_folder = os.path.abspath(self._safe_set_path(self._base_folder_path_config, shared_folder,
+                                                                            self.config[_experiment][_dataset]))
+                    setattr(self.base_namespace, p, SimpleNamespace(workers=int(scheduler.get("workers", 1)),
+                                                                    memory_budget=int(scheduler.get("memory_budget", 0)),
+                                                                    shared_folder=shared_folder))
             else:
                 if self.config[_experiment].get(p):
                     setattr(self.base_namespace, p, self.config[_experiment][p])
@@ -25,20 +25,23 @@ class NegativeSampler:
                private_items: t.Dict, i_train: sp.csr_matrix,
                val: t.Dict = None, test: t.Dict = None) -> t.Tuple[sp.csr_matrix, sp.csr_matrix]:
 
+        # -- one generator for both splits: the draws only depend on the random_seed of the experiment
+        rng = np.random.default_rng(getattr(ns, "random_seed", 42))
+
         val_negative_items = NegativeSampler.process_sampling(ns, public_users, public_items, private_users,
                                                               private_items, i_train,
-                                                              test, validation=True) if val != None else None
+                                                              test, validation=True, rng=rng) if val != None else None
 
         test_negative_items = NegativeSampler.process_sampling(ns, public_users, public_items, private_users,
                                                               private_items, i_train,
-                                                               test) if test != None else None
+                                                               test, rng=rng) if test != None else None
 
         return (val_negative_items, test_negative_items) if val_negative_items else (test_negative_items, test_negative_items)
 
     @staticmethod
     def process_sampling(ns: SimpleNamespace, public_users: t.Dict, public_items: t.Dict, private_users: t.Dict,
                          private_items: t.Dict, i_train: sp.csr_matrix,
-                         test: t.Dict, validation=False) -> sp.csr_matrix:
+                         test: t.Dict, validation=False, rng: np.random.Generator = None) -> sp.csr_matrix:
         i_test = [(public_users[user], public_items[i])
                   for user, items in test.items() if user in public_users.keys()
                   for i in items.keys() if i in public_items.keys()]
@@ -47,7 +50,7 @@ class NegativeSampler:
         i_test = sp.csr_matrix((np.ones_like(rows), (rows, cols)), dtype='float32',
                                shape=(len(public_users.keys()), len(public_items.keys())))
 
-        candidate_negatives = ((i_test + i_train).astype('bool') != True)
+        positives = sp.csr_matrix((i_test + i_train).astype('bool'))
         ns = ns.negative_sampling
 
         strategy = getattr(ns, "strategy", None)
@@ -57,21 +60,8 @@ class NegativeSampler:
             file_path = getattr(ns, "file_path", None)
             if num_items is not None:
                 if str(num_items).isdigit():
-                    negative_items = NegativeSampler.sample_by_random_uniform(candidate_negatives, num_items)
-
-                    nnz = negative_items.nonzero()
-                    old_ind = 0
-                    basic_negative = []
-                    for u, v in enumerate(negative_items.indptr[1:]):
-                        basic_negative.append([(private_users[u],), list(map(private_items.get, nnz[1][old_ind:v]))])
-                        old_ind = v
-
-                    with open(file_path, "w") as file:
-                        for ele in basic_negative:
-                            line = str(ele[0]) + '\t' + '\t'.join(map(str, ele[1]))+'\n'
-                            file.write(line)
-
-                    pass
+                    negative_items = NegativeSampler.sample_by_random_uniform(positives, int(num_items), rng)
+                    NegativeSampler.write_to_file(negative_items, private_users, private_items, file_path)
                 else:
                     raise Exception("Number of negative items value not recognized")
             else:
@@ -90,17 +80,70 @@ class NegativeSampler:
         return negative_items
 
     @staticmethod
-    def sample_by_random_uniform(data: sp.csr_matrix, num_items=99) -> sp.csr_matrix:
-        rows = []
-        cols = []
-        for row in range(data.shape[0]):
-            candidate_negatives = list(zip(*data.getrow(row).nonzero()))
-            sampled_negatives = np.array(candidate_negatives)[random.sample(range(len(candidate_negatives)), num_items)]
-            rows.extend(list(np.ones(len(sampled_negatives), dtype=int) * row))
-            cols.extend(sampled_negatives[:, 1])
-        negative_samples = sp.csr_matrix((np.ones_like(rows), (rows, cols)), dtype='bool',
-                                         shape=(data.shape[0], data.shape[1]))
-        return negative_samples
+    def sample_by_random_uniform(positives: sp.csr_matrix, num_items=99,
+                                 rng: np.random.Generator = None) -> sp.csr_matrix:
+        """
+        Draw num_items distinct negatives per user, uniformly among the items the user did not interact with
+        :param positives: boolean users x items matrix of the interactions
+        :param num_items: negatives per user, all the candidates of the users having fewer than that
+        :param rng: random generator of the draws, seeded with 42 by default
+        :return: boolean users x items matrix of the negatives
+        """
+        rng = np.random.default_rng(42) if rng is None else rng
+        positives = sp.csr_matrix(positives, dtype=bool)
+        positives.sum_duplicates()
+        positives.sort_indices()
+        n_users, n_items = positives.shape
+        n_candidates = n_items - np.diff(positives.indptr)
+        needed = np.minimum(n_candidates, num_items)
+
+        # -- users left with few candidates draw from their complement row, rejection would stall on them
+        dense_users = np.flatnonzero(needed > n_candidates // 2)
+        dense_keys = []
+        for u in dense_users:
+            candidates = np.setdiff1d(np.arange(n_items), positives.indices[positives.indptr[u]:positives.indptr[u + 1]])
+            dense_keys.append(u * n_items + rng.permutation(candidates)[:needed[u]])
+        missing = needed.copy()
+        missing[dense_users] = 0
+
+        # -- sorted keys (user * n_items + item) of the positives and of the negatives drawn so far
+        taken = np.repeat(np.arange(n_users, dtype=np.int64), np.diff(positives.indptr)) * n_items + positives.indices
+        drawn = []
+        while missing.any():
+            users = np.repeat(np.arange(n_users, dtype=np.int64), missing)
+            draws = users * n_items + rng.integers(n_items, size=len(users))
+            # -- only the new draws are deduplicated, in order of draw: distinct draws are a uniform sample
+            _, first = np.unique(draws, return_index=True)
+            draws = draws[np.sort(first)]
+            if len(taken):
+                found = np.minimum(np.searchsorted(taken, draws), len(taken) - 1)
+                draws = draws[taken[found] != draws]
+            # -- the first missing draws of every user are kept, the extra ones dropped
+            draws = draws[np.argsort(draws // n_items, kind='stable')]
+            counts = np.bincount(draws // n_items, minlength=n_users)
+            rank = np.arange(len(draws)) - np.repeat(np.cumsum(counts) - counts, counts)
+            draws = np.sort(draws[rank < missing[draws // n_items]])
+            drawn.append(draws)
+            taken = np.insert(taken, np.searchsorted(taken, draws), draws)
+            missing -= np.bincount(draws // n_items, minlength=n_users)
+
+        keys = np.concatenate([np.zeros(0, dtype=np.int64)] + drawn + dense_keys)
+        return sp.csr_matrix((np.ones(len(keys), dtype=bool), (keys // n_items, keys % n_items)), dtype='bool',
+                             shape=(n_users, n_items))
+
+    @staticmethod
+    def write_to_file(negative_items: sp.csr_matrix, private_users: t.Dict, private_items: t.Dict, file_path: str):
+        """
+        Store the negatives as one (public user,) <tab> public items line per user, in a single write
+        """
+        negative_items = sp.csr_matrix(negative_items)
+        negative_items.sort_indices()
+        items = np.array([str(private_items[i]) for i in range(negative_items.shape[1])], dtype=object)
+        items = items[negative_items.indices]
+        lines = ['\t'.join([str((private_users[u],))] + items[start:stop].tolist()) + '\n'
+                 for u, (start, stop) in enumerate(zip(negative_items.indptr[:-1], negative_items.indptr[1:]))]
+        with open(file_path, "w") as file:
+            file.write(''.join(lines))
 
     @staticmethod
     def read_from_files(public_users: t.Dict, public_items: t.Dict, filepath: str) -> sp.csr_matrix:
@@ -16,6 +16,7 @@ from elliot.recommender import BaseRecommenderModel
 from elliot.recommender.adversarial.AMF.AMF_model import AMF_model
 from elliot.recommender.base_recommender_model import init_charger
 from elliot.recommender.recommender_utils_mixin import RecMixin
+from elliot.utils.recommendations import merge_recommendations
 
 
 class AMF(RecMixin, BaseRecommenderModel):
@@ -105,7 +106,7 @@ class AMF(RecMixin, BaseRecommenderModel):
 
         self._ratings = self._data.train_dict
 
-        self._sampler = cs.Sampler(self._data.i_train_dict)
+        self._sampler = cs.Sampler(self._data.sp_i_train_ratings, prefetch_batches=self._prefetch_batches)
 
         self._results_perturbation = {}
 
@@ -155,7 +156,7 @@ class AMF(RecMixin, BaseRecommenderModel):
                 self._model.build_perturbation(full_batch)
                 adversarial_single_recs = self.get_recommendations(self.evaluator.get_needed_recommendations(),
                                                                    adversarial=True)
-            clean_result_dict = self._results[-1]
+            clean_result_dict = self.get_full_results(it)
             adversarial_single_result_dict = self.evaluator.eval(adversarial_single_recs)
             adversarial_iterative_result_dict = self.evaluator.eval(adversarial_iterative_recs)
 
@@ -164,21 +165,21 @@ class AMF(RecMixin, BaseRecommenderModel):
                                               "adversarial_msap": adversarial_iterative_result_dict}
 
     def get_recommendations(self, k: int = 100, adversarial: bool = False):
-        predictions_top_k_test = {}
-        predictions_top_k_val = {}
+        predictions_top_k_test = []
+        predictions_top_k_val = []
         for index, offset in enumerate(range(0, self._num_users, self._batch_size)):
             offset_stop = min(offset + self._batch_size, self._num_users)
             predictions = self._model.predict(offset, offset_stop, adversarial)
             recs_val, recs_test = self.process_protocol(k, predictions, offset, offset_stop)
-            predictions_top_k_val.update(recs_val)
-            predictions_top_k_test.update(recs_test)
-        return predictions_top_k_val, predictions_top_k_test
+            predictions_top_k_val.append(recs_val)
+            predictions_top_k_test.append(recs_test)
+        return merge_recommendations(predictions_top_k_val), merge_recommendations(predictions_top_k_test)
 
     def get_results(self):
         if getattr(self._params.meta, "eval_perturbations", False):
             self.store_perturbation_results()
 
-        return self._results[self.get_best_arg()]
+        return super().get_results()
 
     def store_perturbation_results(self):
         metrics = [m.name() for m in self.evaluator._metrics]
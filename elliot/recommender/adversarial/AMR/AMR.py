@@ -18,6 +18,7 @@ from elliot.recommender import BaseRecommenderModel
 from elliot.recommender.adversarial.AMR.AMR_model import AMR_model
 from elliot.recommender.base_recommender_model import init_charger
 from elliot.recommender.recommender_utils_mixin import RecMixin
+from elliot.utils.recommendations import merge_recommendations
 
 
 class AMR(RecMixin, BaseRecommenderModel):
@@ -200,7 +201,7 @@ class AMR(RecMixin, BaseRecommenderModel):
                 delta_features[pos] = delta_temp.numpy()
 
             adversarial_single_recs = self.get_recommendations(self.evaluator.get_needed_recommendations(), delta_features)
-            clean_result_dict = self._results[-1]
+            clean_result_dict = self.get_full_results(it)
             adversarial_single_result_dict = self.evaluator.eval(adversarial_single_recs)
             adversarial_iterative_result_dict = self.evaluator.eval(adversarial_iterative_recs)
 
@@ -209,8 +210,8 @@ class AMR(RecMixin, BaseRecommenderModel):
                                               "adversarial_msap": adversarial_iterative_result_dict}
 
     def get_recommendations(self, k, delta_features=None):
-        predictions_top_k_test = {}
-        predictions_top_k_val = {}
+        predictions_top_k_test = []
+        predictions_top_k_val = []
         for index, offset in enumerate(range(0, self._num_users, self._batch_eval)):
             offset_stop = min(offset + self._batch_eval, self._num_users)
             predictions = np.empty((offset_stop - offset, self._num_items))
@@ -221,15 +222,15 @@ class AMR(RecMixin, BaseRecommenderModel):
                                                    tf.Variable(feat), delta_features)
                 predictions[:(offset_stop - offset), item_rel] = p
             recs_val, recs_test = self.process_protocol(k, predictions, offset, offset_stop)
-            predictions_top_k_val.update(recs_val)
-            predictions_top_k_test.update(recs_test)
-        return predictions_top_k_val, predictions_top_k_test
+            predictions_top_k_val.append(recs_val)
+            predictions_top_k_test.append(recs_test)
+        return merge_recommendations(predictions_top_k_val), merge_recommendations(predictions_top_k_test)
 
     def get_results(self):
         if getattr(self._params.meta, "eval_perturbations", False):
             self.store_perturbation_results()
 
-        return self._results[self.get_best_arg()]
+        return super().get_results()
 
     def store_perturbation_results(self):
         metrics = [m.name() for m in self.evaluator._metrics]
@@ -48,18 +48,10 @@ class SlopeOne(RecMixin, BaseRecommenderModel):
         self._model = SlopeOneModel(self._data)
 
     def get_recommendations(self, k: int = 10):
-        predictions_top_k_val = {}
-        predictions_top_k_test = {}
-
-        recs_val, recs_test = self.process_protocol(k)
-
-        predictions_top_k_val.update(recs_val)
-        predictions_top_k_test.update(recs_test)
-
-        return predictions_top_k_val, predictions_top_k_test
+        return self.process_protocol(k)
 
     def get_single_recommendation(self, mask, k, *args):
-        return {u: self._model.get_user_recs(u, mask, k) for u in self._data.train_dict.keys()}
+        return self.get_batched_recommendation(mask, k, self._model.predict_batch)
 
     @property
     def name(self):
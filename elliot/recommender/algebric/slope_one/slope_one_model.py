@@ -7,6 +7,7 @@ Proceedings of the 2005 SIAM International Conference on Data Mining. Society fo
 import pickle
 
 import numpy as np
+import scipy.sparse as sp
 
 
 class SlopeOneModel:
@@ -15,53 +16,45 @@ class SlopeOneModel:
         self._num_items = self._data.num_items
         self._num_users = self._data.num_users
         self._i_train = self._data.i_train_dict
+        self._co_rated = None
+        self._dev_t = None
 
     def initialize(self):
-        freq = np.empty((self._num_items, self._num_items))
-        dev = np.empty((self._num_items, self._num_items))
+        ratings = sp.csr_matrix(self._data.sp_i_train_ratings, dtype=np.float64)
+        rated = ratings.copy()
+        rated.data = np.ones_like(rated.data)
 
         # Computation of freq and dev arrays.
-        for u, u_ratings in self._i_train.items():
-            for i, r_ui in u_ratings.items():
-                for j, r_uj in u_ratings.items():
-                    freq[i, j] += 1
-                    dev[i, j] += r_ui - r_uj
-
-        for i in range(self._num_items):
-            dev[i, i] = 0
-            for j in range(i + 1, self._num_items):
-                dev[i, j] = dev[i, j]/freq[i, j] if freq[i, j] != 0 else 0
-                dev[j, i] = -dev[i, j]
-
-        self.freq = freq
-        self.dev = dev
+        # freq[i, j]: users who rated both i and j; dev[i, j]: their average r_ui - r_uj
+        self.freq = (rated.T @ rated).tocsr()
+        sums = (ratings.T @ rated).tocsr()
+        inverse_freq = self.freq.copy()
+        inverse_freq.data = 1 / inverse_freq.data
+        self.dev = (sums - sums.T).multiply(inverse_freq).tocsr()
+        self._co_rated = None
 
         # mean ratings of all users: mu_u
-        self.user_mean = [np.mean([r for (_, r) in self._i_train[u].items()]) for u in range(self._num_users)]
+        counts = np.diff(ratings.indptr)
+        self.user_mean = np.divide(np.asarray(ratings.sum(axis=1)).ravel(), counts,
+                                   out=np.full(ratings.shape[0], np.nan), where=counts > 0)
+
+    def predict_batch(self, offset, offset_stop):
+        """
+        Predictions of a block of users: mu_u plus the average deviation from the items rated by u which
+        were co-rated with the target item
+        """
+        if self._co_rated is None:
+            self._co_rated = self.freq.copy()
+            self._co_rated.data = np.ones_like(self._co_rated.data)
+            self._dev_t = self.dev.T.tocsr()
+        rated = self._data.sp_i_train[offset:offset_stop]
+        deviations = (rated @ self._dev_t).toarray()
+        counts = (rated @ self._co_rated).toarray()
+        deviations = np.divide(deviations, counts, out=np.zeros_like(deviations), where=counts > 0)
+        return self.user_mean[offset:offset_stop, None] + deviations
 
     def predict(self, user, item):
-        Ri = [j for (j, _) in self._i_train[user].items() if self.freq[item, j] > 0]
-        pred = self.user_mean[user]
-        if Ri:
-            pred += sum(self.dev[item, j] for j in Ri) / len(Ri)
-        return pred
-
-    def get_user_recs(self, u, mask, k=100):
-        uidx = self._data.public_users[u]
-        user_mask = mask[uidx]
-        # user_items = self._data.train_dict[u].keys()
-        # indexed_user_items = [self._data.public_items[i] for i in user_items]
-        predictions = {self._data.private_items[iidx]: self.predict(uidx, iidx) for iidx in range(self._num_items) if user_mask[iidx]}
-
-        indices, values = zip(*predictions.items())
-        indices = np.array(indices)
-        values = np.array(values)
-        local_k = min(k, len(values))
-        partially_ordered_preds_indices = np.argpartition(values, -local_k)[-local_k:]
-        real_values = values[partially_ordered_preds_indices]
-        real_indices = indices[partially_ordered_preds_indices]
-        local_top_k = real_values.argsort()[::-1]
-        return [(real_indices[item], real_values[item]) for item in local_top_k]
+        return self.predict_batch(user, user + 1)[0, item]
 
     def get_model_state(self):
         saving_dict = {}
@@ -71,9 +64,10 @@ class SlopeOneModel:
         return saving_dict
 
     def set_model_state(self, saving_dict):
-        self.freq = saving_dict['freq']
-        self.dev = saving_dict['dev']
-        self.user_mean = saving_dict['user_mean']
+        self.freq = sp.csr_matrix(saving_dict['freq'])
+        self.dev = sp.csr_matrix(saving_dict['dev'])
+        self.user_mean = np.asarray(saving_dict['user_mean'])
+        self._co_rated = None
 
     def load_weights(self, path):
         with open(path, "rb") as f:
@@ -10,6 +10,8 @@ __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 import time
 
 import numpy as np
+from scipy import sparse
+from scipy.linalg import LinAlgError, cho_factor, cho_solve
 from sklearn.utils.extmath import safe_sparse_dot
 
 from elliot.recommender.base_recommender_model import BaseRecommenderModel
@@ -18,6 +20,40 @@ from elliot.recommender.recommender_utils_mixin import RecMixin
 
 
 class EASER(RecMixin, BaseRecommenderModel):
+    r"""
+    Embarrassingly Shallow Autoencoders for Sparse Data
+
+    For further details, please refer to the `paper <https://arxiv.org/pdf/1905.03375>`_
+
+    Args:
+        l2_norm: Regularization coefficient
+        neighborhood: Number of weights kept for each item (top-k by magnitude) with sparse_weights, -1 to keep all of them
+        sparse_weights: Apply the neighborhood to the weight matrix B, default False (the neighborhood is ignored)
+        precision: Floating point precision of the item-item matrices ('float64', 'float32')
+        solver: Inversion of the Gram matrix ('inverse', 'cholesky')
+        threshold: Weights with magnitude below it are dropped, 0 to keep all of them
+
+    With sparse_weights or a threshold, the weight matrix B is stored as a sparse matrix.
+    Users are scored block by block, so no users x items matrix is materialized.
+    The cholesky solver falls back to the inverse when the regularized Gram matrix is not positive definite,
+    e.g. with explicit ratings, since its diagonal holds the item popularity.
+    precision, solver and threshold are not part of the model name.
+
+    To include the recommendation model, add it to the config file adopting the following pattern:
+
+    .. code:: yaml
+
+      models:
+        EASER:
+          meta:
+            save_recs: True
+          l2_norm: 1e3
+          neighborhood: -1
+          sparse_weights: False
+          precision: float32
+          solver: cholesky
+          threshold: 0
+    """
 
     @init_charger
     def __init__(self, data, config, params, *args, **kwargs):
@@ -30,66 +66,110 @@ class EASER(RecMixin, BaseRecommenderModel):
         self.autoset_params()
         if self._neighborhood == -1:
             self._neighborhood = self._data.num_items
+        # -- options of the computation, not part of the model name
+        self._sparse_weights = getattr(self._params, "sparse_weights", False)
+        self._solver = getattr(self._params, "solver", "inverse")
+        self._threshold = float(getattr(self._params, "threshold", 0))
+        if self._solver not in ["inverse", "cholesky"]:
+            raise ValueError(f"EASER solver {self._solver} not recognized. Allowed values are: inverse, cholesky")
+        self._dtype = np.dtype(getattr(self._params, "precision", "float64"))
 
     @property
     def name(self):
         return f"EASER_{self.get_params_shortcut()}"
 
     def get_recommendations(self, k: int = 10):
-        predictions_top_k_val = {}
-        predictions_top_k_test = {}
-
-        recs_val, recs_test = self.process_protocol(k)
-
-        predictions_top_k_val.update(recs_val)
-        predictions_top_k_test.update(recs_test)
-
-        return predictions_top_k_val, predictions_top_k_test
+        return self.process_protocol(k)
 
     def get_single_recommendation(self, mask, k):
-        return {u: self.get_user_predictions(u, mask, k) for u in self._data.train_dict.keys()}
-
-    def get_user_predictions(self, user_id, mask, top_k=10):
-        user_id = self._data.public_users.get(user_id)
-        b = self._preds[user_id]
-        a = mask[user_id]
-        b[~a] = -np.inf
-        indices, values = zip(*[(self._data.private_items.get(u_list[0]), u_list[1])
-                              for u_list in enumerate(b.data)])
-
-        indices = np.array(indices)
-        values = np.array(values)
-        local_k = min(top_k, len(values))
-        partially_ordered_preds_indices = np.argpartition(values, -local_k)[-local_k:]
-        real_values = values[partially_ordered_preds_indices]
-        real_indices = indices[partially_ordered_preds_indices]
-        local_top_k = real_values.argsort()[::-1]
-        return [(real_indices[item], real_values[item]) for item in local_top_k]
+        return self.get_batched_recommendation(mask, k, self.predict_batch)
+
+    def predict_batch(self, offset, offset_stop):
+        return self._train[offset:offset_stop].dot(self._similarity_matrix)
 
     def train(self):
         if self._restore:
             return self.restore_weights()
 
-
         start = time.time()
 
-        self._train = self._data.sp_i_train_ratings
-
-        self._similarity_matrix = safe_sparse_dot(self._train.T, self._train, dense_output=True)
+        self._train = self._data.sp_i_train_ratings.astype(self._dtype, copy=False)
 
-        diagonal_indices = np.diag_indices(self._similarity_matrix.shape[0])
-        item_popularity = np.ediff1d(self._train.tocsc().indptr)
-        self._similarity_matrix[diagonal_indices] = item_popularity + self._l2_norm
-
-        P = np.linalg.inv(self._similarity_matrix)
-
-        self._similarity_matrix = P / (-np.diag(P))
-
-        self._similarity_matrix[diagonal_indices] = 0.0
+        neighborhood = self._neighborhood if self._sparse_weights else self._data.num_items
+        self._similarity_matrix = self.compute_weights(self._train, self._l2_norm, self._solver, neighborhood,
+                                                       self._threshold, self.logger)
 
         end = time.time()
         self.logger.info(f"The similarity computation has taken: {end - start}")
 
-        self._preds = self._train.dot(self._similarity_matrix)
-
         self.evaluate()
+
+    @staticmethod
+    def compute_weights(X, l2_norm: float, solver: str = "inverse", neighborhood: int = None, threshold: float = 0,
+                        logger=None):
+        """
+        Item-item weight matrix B of EASE^R
+        :param X: users x items training matrix, its dtype is the precision of the computation
+        :param l2_norm: regularization added to the diagonal of the Gram matrix
+        :param solver: 'inverse' or 'cholesky'
+        :param neighborhood: weights kept for each item, None to keep all of them
+        :param threshold: weights with magnitude below it are dropped
+        :return: dense B, or sparse B with a neighborhood or a threshold
+        """
+        G = safe_sparse_dot(X.T, X, dense_output=True)
+
+        diagonal_indices = np.diag_indices(G.shape[0])
+        item_popularity = np.ediff1d(sparse.csc_matrix(X).indptr)
+        G[diagonal_indices] = item_popularity + l2_norm
+
+        factor = None
+        if solver == "cholesky":
+            try:
+                factor = cho_factor(G, check_finite=False)
+            except LinAlgError:
+                # -- with explicit ratings the popularity diagonal does not make the matrix positive definite
+                if logger:
+                    logger.warning("The Gram matrix is not positive definite: EASER falls back to the inverse")
+        if factor is not None:
+            del G
+            P = cho_solve(factor, np.eye(factor[0].shape[0], dtype=factor[0].dtype), overwrite_b=True,
+                          check_finite=False)
+            del factor
+        else:
+            P = np.linalg.inv(G)
+            del G
+
+        P /= -np.diag(P)
+        P[diagonal_indices] = 0.0
+
+        n_items = P.shape[0]
+        neighborhood = n_items if neighborhood is None else neighborhood
+        if threshold > 0 or neighborhood < n_items:
+            return EASER.sparsify(P, neighborhood, threshold)
+        return P
+
+    @staticmethod
+    def sparsify(B: np.ndarray, neighborhood: int, threshold: float) -> sparse.csr_matrix:
+        """
+        Keep the neighborhood weights with the largest magnitude of every column of B, dropping those below threshold
+        """
+        n_rows, n_cols = B.shape
+        k = max(0, min(neighborhood, n_rows))
+        block_size = max(1, (2 ** 24) // max(n_rows, 1))
+        rows, cols, data = [], [], []
+        for start in range(0, n_cols, block_size):
+            block = B[:, start:start + block_size]
+            magnitude = np.abs(block)
+            if k < n_rows:
+                top = np.argpartition(-magnitude, k - 1, axis=0)[:k] if k else np.zeros((0, block.shape[1]), int)
+                keep = np.zeros(block.shape, dtype=bool)
+                np.put_along_axis(keep, top, True, axis=0)
+            else:
+                keep = np.ones(block.shape, dtype=bool)
+            keep &= (magnitude >= threshold) & (block != 0)
+            block_rows, block_cols = np.nonzero(keep)
+            rows.append(block_rows)
+            cols.append(block_cols + start)
+            data.append(block[block_rows, block_cols])
+        return sparse.csr_matrix((np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+                                 shape=B.shape, dtype=B.dtype)
@@ -67,6 +67,17 @@ class BaseRecommenderModel(ABC):
         self._early_stopping = EarlyStopping(SimpleNamespace(**getattr(self._params, "early_stopping", {})),
                                              self._validation_metric, self._validation_k, _cutoff_k,
                                              data.config.evaluation.simple_metrics)
+        # -- metrics scored by the fast in-training evaluations: the validation one and the early stopping one
+        self._monitored_metrics = {self._validation_k: [self._validation_metric]}
+        if self._early_stopping.active and self._early_stopping.metric:
+            self._monitored_metrics.setdefault(self._early_stopping.metric_k, [])
+            if self._early_stopping.metric not in self._monitored_metrics[self._early_stopping.metric_k]:
+                self._monitored_metrics[self._early_stopping.metric_k].append(self._early_stopping.metric)
+        self._fast_validation = getattr(self._params.meta, "fast_validation", False)
+        self._validation_sample = getattr(self._params.meta, "validation_sample", None)
+        self._validation_users = None
+        # -- training batches drawn ahead in a background thread by the vectorized samplers
+        self._prefetch_batches = int(getattr(self._params.meta, "prefetch_batches", 0))
         self._iteration = 0
         if self._epochs < self._validation_rate:
             raise Exception(f"The first validation epoch ({self._validation_rate}) "
@@ -78,6 +89,7 @@ class BaseRecommenderModel(ABC):
 
         self._losses = []
         self._results = []
+        self._full_results = {}
         self._params_list = []
 
     def get_base_params_shortcut(self):
@@ -91,18 +91,10 @@ class VSM(RecMixin, BaseRecommenderModel):
         self._model = Similarity(self._data, self._sp_i_user_features, self._sp_i_item_features, self._similarity)
 
     def get_single_recommendation(self, mask, k, *args):
-        return {u: self._model.get_user_recs(u, mask, k) for u in self._ratings.keys()}
+        return self.get_batched_recommendation(mask, k, self._model.predict_batch)
 
     def get_recommendations(self, k: int = 10):
-        predictions_top_k_val = {}
-        predictions_top_k_test = {}
-
-        recs_val, recs_test = self.process_protocol(k)
-
-        predictions_top_k_val.update(recs_val)
-        predictions_top_k_test.update(recs_test)
-
-        return predictions_top_k_val, predictions_top_k_test
+        return self.process_protocol(k)
 
     @property
     def name(self):
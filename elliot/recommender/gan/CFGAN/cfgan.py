@@ -15,6 +15,7 @@ from elliot.recommender import BaseRecommenderModel
 from elliot.recommender.base_recommender_model import init_charger
 from elliot.recommender.gan.CFGAN.cfgan_model import CFGAN_model
 from elliot.recommender.recommender_utils_mixin import RecMixin
+from elliot.utils.recommendations import merge_recommendations
 from elliot.utils.write import store_recommendation
 
 
@@ -92,7 +93,8 @@ class CFGAN(RecMixin, BaseRecommenderModel):
 
         self._ratings = self._data.train_dict
 
-        self._sampler = pwcfgans.Sampler(self._data.i_train_dict, self._data.sp_i_train, self._s_zr, self._s_pm)
+        self._sampler = pwcfgans.Sampler(self._data.sp_i_train_ratings, self._data.sp_i_train, self._s_zr, self._s_pm,
+                                         prefetch_batches=self._prefetch_batches)
 
         self._model = CFGAN_model(self._data,
                                   self._batch_size,
@@ -134,12 +136,12 @@ class CFGAN(RecMixin, BaseRecommenderModel):
             self.evaluate(it, dis_loss.numpy()/(it + 1))
 
     def get_recommendations(self, k: int = 100):
-        predictions_top_k_test = {}
-        predictions_top_k_val = {}
+        predictions_top_k_test = []
+        predictions_top_k_val = []
         for index, offset in enumerate(range(0, self._num_users, self._batch_size)):
             offset_stop = min(offset + self._batch_size, self._num_users)
             predictions = self._model.predict(offset, offset_stop)
             recs_val, recs_test = self.process_protocol(k, predictions, offset, offset_stop)
-            predictions_top_k_val.update(recs_val)
-            predictions_top_k_test.update(recs_test)
-        return predictions_top_k_val, predictions_top_k_test
\ No newline at end of file
+            predictions_top_k_val.append(recs_val)
+            predictions_top_k_test.append(recs_test)
+        return merge_recommendations(predictions_top_k_val), merge_recommendations(predictions_top_k_test)
\ No newline at end of file
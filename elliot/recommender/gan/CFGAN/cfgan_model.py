@@ -38,7 +38,7 @@ class Generator(keras.Model):
 
         self.initializer = tf.initializers.GlorotUniform()
 
-        self.sampler = pws.Sampler(self.data.i_train_dict)
+        self.sampler = pws.Sampler(self.data.sp_i_train_ratings)
 
         # Discriminator Model Parameters
         self.B = tf.Variable(tf.zeros(shape=[self._num_items]), name='B_gen', dtype=tf.float32)
@@ -95,7 +95,7 @@ class Discriminator(keras.Model):
 
         self.initializer = tf.initializers.GlorotUniform()
 
-        self.sampler = pws.Sampler(self.data.i_train_dict)
+        self.sampler = pws.Sampler(self.data.sp_i_train_ratings)
 
         # Discriminator Model Parameters
         self.B = tf.Variable(tf.zeros(shape=[1]), name='B_dis', dtype=tf.float32)
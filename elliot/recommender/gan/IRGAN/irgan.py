@@ -15,6 +15,7 @@ from elliot.recommender import BaseRecommenderModel
 from elliot.recommender.base_recommender_model import init_charger
 from elliot.recommender.gan.IRGAN.irgan_model import IRGAN_model
 from elliot.recommender.recommender_utils_mixin import RecMixin
+from elliot.utils.recommendations import merge_recommendations
 from elliot.utils.write import store_recommendation
 
 
@@ -88,7 +89,7 @@ class IRGAN(RecMixin, BaseRecommenderModel):
 
         self._ratings = self._data.train_dict
 
-        self._sampler = pws.Sampler(self._data.i_train_dict)
+        self._sampler = pws.Sampler(self._data.sp_i_train_ratings, prefetch_batches=self._prefetch_batches)
 
         self._model = IRGAN_model(self._predict_model,
                                   self._data,
@@ -130,12 +131,12 @@ class IRGAN(RecMixin, BaseRecommenderModel):
             self.evaluate(it, dis_loss.numpy()/(it + 1))
 
     def get_recommendations(self, k: int = 100):
-        predictions_top_k_test = {}
-        predictions_top_k_val = {}
+        predictions_top_k_test = []
+        predictions_top_k_val = []
         for index, offset in enumerate(range(0, self._num_users, self._batch_size)):
             offset_stop = min(offset + self._batch_size, self._num_users)
             predictions = self._model.predict(offset, offset_stop)
             recs_val, recs_test = self.process_protocol(k, predictions, offset, offset_stop)
-            predictions_top_k_val.update(recs_val)
-            predictions_top_k_test.update(recs_test)
-        return predictions_top_k_val, predictions_top_k_test
+            predictions_top_k_val.append(recs_val)
+            predictions_top_k_test.append(recs_test)
+        return merge_recommendations(predictions_top_k_val), merge_recommendations(predictions_top_k_test)
@@ -40,7 +40,7 @@ class Generator(keras.Model):
 
         self.initializer = tf.random_uniform_initializer(minval=-0.05, maxval=0.05, seed=1234)
 
-        self.sampler = pws.Sampler(self.data.i_train_dict)
+        self.sampler = pws.Sampler(self.data.sp_i_train_ratings)
 
         # Generator
         self.Bi = tf.Variable(tf.zeros(self._num_items), name='Bi_gen', dtype=tf.float32)
@@ -125,7 +125,7 @@ class Discriminator(keras.Model):
 
         self.initializer = tf.random_uniform_initializer(minval=-0.05, maxval=0.05, seed=1234)
 
-        self.sampler = pws.Sampler(self.data.i_train_dict)
+        self.sampler = pws.Sampler(self.data.sp_i_train_ratings)
 
         # Discriminator Model Parameters
         self.Bi = tf.Variable(tf.zeros(self._num_items), name='Bi_dis', dtype=tf.float32)
@@ -5,6 +5,7 @@ import pandas as pd
 from elliot.recommender.base_recommender_model import BaseRecommenderModel
 from elliot.recommender.recommender_utils_mixin import RecMixin
 from elliot.recommender.base_recommender_model import init_charger
+from elliot.utils.recommendations import TopKRecommendations
 
 
 class ProxyRecommender(RecMixin, BaseRecommenderModel):
@@ -38,41 +39,30 @@ class ProxyRecommender(RecMixin, BaseRecommenderModel):
         self.evaluate()
 
     def get_recommendations(self, top_k):
-        predictions_top_k_val = {}
-        predictions_top_k_test = {}
-
-        recs_val, recs_test = self.process_protocol(top_k)
-
-        predictions_top_k_val.update(recs_val)
-        predictions_top_k_test.update(recs_test)
-
-        return predictions_top_k_val, predictions_top_k_test
+        return self.process_protocol(top_k)
 
     def get_single_recommendation(self, mask, k):
-
-        nonzero = mask.nonzero()
-        candidate_items = {}
-        [candidate_items.setdefault(self._data.private_users[user], set()).add(self._data.private_items[item]) for user, item in zip(*nonzero)]
-        recs = {}
-        for u, user_recs in self._recommendations.items():
-            user_cleaned_recs = []
-            user_candidate_items = candidate_items[u]
-            for p, (item, prediction) in enumerate(user_recs):
-                if p >= k:
-                    break
-                if item in user_candidate_items:
-                    user_cleaned_recs.append((item, prediction))
-            recs[u] = user_cleaned_recs
-        return recs
+        recs = self._recommendations[self._recommendations["rank"].values < k]
+        recs = recs[recs["itemId"].values >= 0]
+        recs = recs[mask.are_candidates(recs["userId"].values, recs["itemId"].values)]
+        rows, users = pd.factorize(recs["userId"])
+        cols = recs.groupby(rows).cumcount().values
+        items = np.full((len(users), k), -1, dtype=np.int32)
+        scores = np.full((len(users), k), -np.inf, dtype=np.float32)
+        items[rows, cols] = recs["itemId"].values
+        scores[rows, cols] = recs["prediction"].values
+        return TopKRecommendations(np.asarray(users), items, scores, self._data.private_users, self._data.private_items)
 
     def read_recommendations(self, path):
-        recs = {}
+        """
+        Read a recommendation file into a frame of private user and item ids, ranked by decreasing prediction.
+        Items unknown to the dataset get id -1 but keep their rank, users unknown to the dataset are dropped
+        """
         column_names = ["userId", "itemId", "prediction", "timestamp"]
         data = pd.read_csv(path, sep="\t", header=None, names=column_names)
-        user_groups = data.groupby(['userId'])
-        for name, group in user_groups:
-            recs[name] = sorted(data.loc[group.index][['itemId', 'prediction']].apply(tuple, axis=1).to_list(), key=lambda x: x[1], reverse=True)
-        return recs
-
-
-
+        data["userId"] = data["userId"].map(self._data.public_users)
+        data["itemId"] = data["itemId"].map(self._data.public_items).fillna(-1)
+        data = data.dropna(subset=["userId"]).astype({"userId": np.int32, "itemId": np.int32})
+        data = data.sort_values(["userId", "prediction"], ascending=[True, False], kind="mergesort")
+        data["rank"] = data.groupby("userId").cumcount()
+        return data[["userId", "itemId", "prediction", "rank"]].reset_index(drop=True)
@@ -0,0 +1 @@
+from .p3alpha import P3alpha
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Module description:
+
+"""
+
+__version__ = '0.3.1'
+__author__ = 'Vito Walter Anelli, Claudio Pomo'
+__email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
+
+import time
+
+from sklearn.preprocessing import normalize
+
+from elliot.recommender.base_recommender_model import BaseRecommenderModel
+from elliot.recommender.base_recommender_model import init_charger
+from elliot.recommender.graph_based.random_walk_similarity import RandomWalkSimilarity
+from elliot.recommender.recommender_utils_mixin import RecMixin
+
+
+class P3alpha(RecMixin, BaseRecommenderModel):
+    r"""
+    Random Walks in Recommender Systems: Exact Computation and Simulations
+
+    For further details, please refer to the `paper <https://dl.acm.org/doi/10.1145/2567948.2579244>`_
+
+    Args:
+        neighborhood: Number of item neighbors
+        alpha: Exponent of the transition probabilities
+        normalize_similarity: Whether to l1-normalize the rows of the similarity matrix
+
+    To include the recommendation model, add it to the config file adopting the following pattern:
+
+    .. code:: yaml
+
+      models:
+        P3alpha:
+          meta:
+            save_recs: True
+          neighborhood: 10
+          alpha: 1.
+          normalize_similarity: False
+    """
+
+    @init_charger
+    def __init__(self, data, config, params, *args, **kwargs):
+
+        self._params_list = [
+            ("_neighborhood", "neighborhood", "neighborhood", 10, int, None),
+            ("_alpha", "alpha", "alpha", 1., float, None),
+            ("_normalize_similarity", "normalize_similarity", "normalize_similarity", False, bool, None)
+        ]
+
+        self.autoset_params()
+        if self._neighborhood == -1:
+            self._neighborhood = self._data.num_items
+
+    @property
+    def name(self):
+        return f"P3alpha_{self.get_params_shortcut()}"
+
+    def get_recommendations(self, k: int = 10):
+        return self.process_protocol(k)
+
+    def get_single_recommendation(self, mask, k, *args):
+        return self.get_batched_recommendation(mask, k, self.predict_batch)
+
+    def predict_batch(self, offset, offset_stop):
+        return self._train[offset:offset_stop].dot(self._similarity_matrix)
+
+    def train(self):
+        if self._restore:
+            return self.restore_weights()
+
+        start = time.time()
+
+        self._train = self._data.sp_i_train_ratings
+
+        self._similarity_matrix = RandomWalkSimilarity(self._train, self._neighborhood, self._alpha).compute()
+
+        if self._normalize_similarity:
+            self._similarity_matrix = normalize(self._similarity_matrix, norm='l1', axis=1)
+
+        end = time.time()
+        self.logger.info(f"The similarity computation has taken: {end - start}")
+
+        self.evaluate()
@@ -1,3 +1,4 @@
 from .ngcf import NGCF
 from .lightgcn import LightGCN
-from .RP3beta import RP3beta
\ No newline at end of file
+from .RP3beta import RP3beta
+from .P3alpha import P3alpha
\ No newline at end of file
@@ -19,6 +19,7 @@ from elliot.recommender import BaseRecommenderModel
 from elliot.recommender.base_recommender_model import init_charger
 from elliot.recommender.graph_based.ngcf.NGCF_model import NGCFModel
 from elliot.recommender.recommender_utils_mixin import RecMixin
+from elliot.utils.recommendations import merge_recommendations
 from elliot.utils.write import store_recommendation
 
 
@@ -62,7 +63,7 @@ class NGCF(RecMixin, BaseRecommenderModel):
     def __init__(self, data, config, params, *args, **kwargs):
 
         self._ratings = self._data.train_dict
-        self._sampler = cs.Sampler(self._data.i_train_dict)
+        self._sampler = cs.Sampler(self._data.sp_i_train_ratings, prefetch_batches=self._prefetch_batches)
         if self._batch_size < 1:
             self._batch_size = self._num_users
 
@@ -150,13 +151,13 @@ class NGCF(RecMixin, BaseRecommenderModel):
             self.evaluate(it, loss.numpy()/(it + 1))
 
     def get_recommendations(self, k: int = 100):
-        predictions_top_k_test = {}
-        predictions_top_k_val = {}
+        predictions_top_k_test = []
+        predictions_top_k_val = []
         for index, offset in enumerate(range(0, self._num_users, self._batch_size)):
             offset_stop = min(offset + self._batch_size, self._num_users)
             predictions = self._model.predict(offset, offset_stop)
             recs_val, recs_test = self.process_protocol(k, predictions, offset, offset_stop)
-            predictions_top_k_val.update(recs_val)
-            predictions_top_k_test.update(recs_test)
-        return predictions_top_k_val, predictions_top_k_test
+            predictions_top_k_val.append(recs_val)
+            predictions_top_k_test.append(recs_test)
+        return merge_recommendations(predictions_top_k_val), merge_recommendations(predictions_top_k_test)
 
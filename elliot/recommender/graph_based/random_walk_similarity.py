@@ -0,0 +1,118 @@
+"""
+Module description:
+
+"""
+
+__version__ = '0.3.1'
+__author__ = 'Vito Walter Anelli, Claudio Pomo'
+__email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import scipy.sparse as sparse
+from sklearn.preprocessing import normalize
+
+from elliot.recommender.top_k_ranker import get_block_size
+
+
+class RandomWalkSimilarity(object):
+    """
+    Item-item transition probabilities of the random walk item -> user -> item, computed block by block.
+
+    Row i of the similarity matrix is Piu[i] Pui, where Pui and Piu are the row-normalized user-item and
+    item-user adjacency matrices raised to alpha, and each target item j is penalized by its popularity
+    to the power of beta (RP3beta); with beta = 0 it is the plain P3alpha walk.
+    Blocks of rows are computed in a thread pool and reduced to their top-k entries with argpartition
+    right away, then the blocks are concatenated into a single CSR matrix. Ties with the k-th value are
+    broken as in the original per-row loop: among equal values the item with the higher index comes first.
+    """
+
+    def __init__(self, train: sparse.csr_matrix, neighborhood: int, alpha: float = 1., beta: float = 0.,
+                 workers: int = None, block_size: int = None):
+        """
+        :param train: users x items interactions
+        :param neighborhood: entries kept for each item
+        :param alpha: exponent of the transition probabilities
+        :param beta: exponent of the popularity penalization of the target items
+        :param workers: number of threads, default the number of CPUs
+        :param block_size: items walked at once by each thread
+        """
+        self._neighborhood = neighborhood
+        self._workers = workers or os.cpu_count() or 1
+
+        self._Pui = normalize(train, norm='l1', axis=1)
+
+        X_bool = train.transpose(copy=True).tocsr()
+        X_bool.data = np.ones(X_bool.data.size, np.float32)
+        X_bool_sum = np.array(X_bool.sum(axis=1)).ravel()
+        self._Piu = normalize(X_bool, norm='l1', axis=1)
+
+        if alpha != 1.:
+            self._Pui = self._Pui.power(alpha)
+            self._Piu = self._Piu.power(alpha)
+
+        self._degree = np.zeros(train.shape[1])
+        non_zero_mask = X_bool_sum != 0.0
+        self._degree[non_zero_mask] = np.power(X_bool_sum[non_zero_mask], -beta)
+
+        n = train.shape[1]
+        self._block_size = block_size or get_block_size(n, n * self._workers)
+
+    def _process_block(self, start: int):
+        stop = min(start + self._block_size, self._Piu.shape[0])
+        block = (self._Piu[start:stop] * self._Pui).toarray()
+        block *= self._degree
+        block[np.arange(stop - start), np.arange(start, stop)] = 0
+
+        k = self._neighborhood
+        if k < block.shape[1]:
+            keep = np.zeros(block.shape, dtype=bool)
+            if k > 0:
+                kth = block[np.arange(stop - start), np.argpartition(-block, k - 1, axis=1)[:, k - 1]][:, None]
+                keep = block > kth
+                # -- ties with the k-th value keep the highest indices, as the stable row.argsort()[::-1][:k]
+                tied = block == kth
+                needed = k - keep.sum(axis=1)
+                excess = np.flatnonzero(tied.sum(axis=1) > needed)
+                from_right = np.cumsum(tied[excess, ::-1], axis=1)[:, ::-1]
+                tied[excess] &= from_right <= needed[excess, None]
+                keep |= tied
+            rows, cols = np.nonzero(keep)
+        else:
+            rows, cols = np.indices(block.shape).reshape(2, -1)
+        values = block[rows, cols]
+        non_zero = values != 0.0
+        return rows[non_zero] + start, cols[non_zero], values[non_zero]
+
+    def compute(self) -> sparse.csr_matrix:
+        """
+        :return: items x items matrix, row i holds the top-k transition probabilities from item i
+        """
+        n = self._Piu.shape[0]
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            blocks = list(executor.map(self._process_block, range(0, n, self._block_size)))
+        if blocks:
+            rows, cols, values = (np.concatenate(arrays) for arrays in zip(*blocks))
+        else:
+            rows, cols, values = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+        return sparse.csr_matrix((values, (rows, cols)), shape=(n, n), dtype=np.float32)
+
+
+def top_k_columns(matrix, k: int) -> sparse.csr_matrix:
+    """
+    Keep the k highest non-zero entries of every column of a sparse matrix
+    """
+    matrix = sparse.csc_matrix(matrix, copy=True)
+    matrix.eliminate_zeros()
+    # -- ties keep the entries with the highest row indices, as the stable per-column argsort did
+    matrix.sort_indices()
+    lengths = np.diff(matrix.indptr)
+    cols = np.repeat(np.arange(matrix.shape[1]), lengths)
+    # -- entries sorted by column, then by increasing value: the top-k of a column are its last k entries
+    order = np.lexsort((matrix.data, cols))
+    keep = (matrix.indptr[1:][cols] - 1 - np.arange(len(cols))) < k
+    order = order[keep]
+    return sparse.csc_matrix((matrix.data[order], (matrix.indices[order], cols[keep])),
+                             shape=matrix.shape, dtype=np.float32).tocsr()
@@ -0,0 +1,128 @@
+"""
+Module description:
+
+"""
+
+__version__ = '0.3.1'
+__author__ = 'Vito Walter Anelli, Claudio Pomo'
+__email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy import sparse
+from sklearn.metrics.pairwise import cosine_similarity, euclidean_distances, haversine_distances, chi2_kernel, manhattan_distances
+from sklearn.metrics import pairwise_distances
+
+from elliot.recommender.top_k_ranker import get_block_size
+
+supported_similarities = ["cosine", "dot", ]
+supported_dissimilarities = ["euclidean", "manhattan", "haversine",  "chi2", 'cityblock', 'l1', 'l2', 'braycurtis', 'canberra', 'chebyshev', 'correlation', 'dice', 'hamming', 'jaccard', 'kulsinski', 'mahalanobis', 'minkowski', 'rogerstanimoto', 'russellrao', 'seuclidean', 'sokalmichener', 'sokalsneath', 'sqeuclidean', 'yule']
+_dense_dissimilarities = ['braycurtis', 'canberra', 'chebyshev', 'correlation', 'dice', 'hamming', 'jaccard', 'kulsinski', 'mahalanobis', 'minkowski', 'rogerstanimoto', 'russellrao', 'seuclidean', 'sokalmichener', 'sokalsneath', 'sqeuclidean', 'yule']
+
+
+class BlockedSimilarity(object):
+    """
+    Top-k neighbourhood of the rows of a matrix, computed block by block.
+
+    The similarity of a block of rows against all the rows is computed in a thread pool and reduced to
+    its top-k entries right away, so only workers blocks of block_size x n similarities are alive at
+    once, instead of the dense n x n matrix. The neighbours of a row are selected as the legacy column
+    loop did: the num_neighbors highest non-zero similarities, ties broken by the same argsort.
+    """
+
+    def __init__(self, X, similarity: str, num_neighbors: int, workers: int = None, block_size: int = None):
+        """
+        :param X: n x features sparse matrix, the rows are the objects to compare (e.g. items for ItemKNN)
+        :param similarity: name of the similarity or dissimilarity
+        :param num_neighbors: neighbours kept for each row
+        :param workers: number of threads, default the number of CPUs
+        :param block_size: rows compared at once by each thread
+        """
+        if similarity not in supported_similarities and similarity not in supported_dissimilarities:
+            raise ValueError("Compute Similarity: value for parameter 'similarity' not recognized."
+                             f"\nAllowed values are: {supported_similarities}, {supported_dissimilarities}."
+                             f"\nPassed value was {similarity}\nTry with implementation: aiolli")
+        self._X = sparse.csr_matrix(X)
+        self._similarity = similarity
+        self._num_neighbors = num_neighbors
+        self._workers = workers or os.cpu_count() or 1
+        n = self._X.shape[0]
+        self._block_size = block_size or get_block_size(n, n * self._workers)
+
+        self._metric_params = {}
+        self._dense = None
+        if similarity in _dense_dissimilarities:
+            self._dense = self._X.toarray()
+            if similarity == "seuclidean":
+                self._metric_params = {"V": np.var(self._dense, axis=0, ddof=1)}
+            elif similarity == "mahalanobis":
+                self._metric_params = {"VI": np.linalg.inv(np.cov(self._dense.T)).T}
+
+    def pairwise(self, start: int, stop: int) -> np.ndarray:
+        """
+        Similarities of the rows start:stop against all the rows, as a (stop - start) x n dense block
+        """
+        X, Y = self._X, self._X[start:stop]
+        if self._similarity == "cosine":
+            block = cosine_similarity(X, Y)
+        elif self._similarity == "dot":
+            block = (X @ Y.T).toarray()
+        elif self._similarity == "euclidean":
+            block = (1 / (1 + euclidean_distances(X, Y)))
+        elif self._similarity == "manhattan":
+            block = (1 / (1 + manhattan_distances(X, Y)))
+        elif self._similarity == "haversine":
+            block = (1 / (1 + haversine_distances(X, Y)))
+        elif self._similarity == "chi2":
+            block = (1 / (1 + chi2_kernel(X, Y)))
+        elif self._similarity in ['cityblock', 'l1', 'l2']:
+            block = (1 / (1 + pairwise_distances(X, Y, metric=self._similarity)))
+        else:
+            block = (1 / (1 + pairwise_distances(self._dense, self._dense[start:stop], metric=self._similarity,
+                                                 **self._metric_params)))
+        # -- columns of the similarity matrix, i.e. the neighbourhoods of rows start:stop
+        return np.ascontiguousarray(np.asarray(block).T)
+
+    def top_k(self, block: np.ndarray):
+        """
+        Positions (row, column) and values of the top-k non-zero entries of every row of a block
+        """
+        k = self._num_neighbors
+        n = block.shape[1]
+        scores = np.where(block != 0, block, -np.inf)
+        keep = scores > -np.inf
+        if 0 < k < n:
+            threshold = np.partition(scores, n - k, axis=1)[:, n - k:n - k + 1]
+            above = scores > threshold
+            ties = scores == threshold
+            missing = k - above.sum(axis=1)
+            resolved = np.isneginf(threshold[:, 0]) | (ties.sum(axis=1) == missing)
+            resolved &= ~np.isnan(block).any(axis=1)
+            keep[resolved] &= (above | ties)[resolved]
+            # -- rows with ambiguous ties at the threshold (or NaNs) fall back to the legacy argsort
+            for row in np.flatnonzero(~resolved):
+                non_zero = np.flatnonzero(block[row] != 0)
+                keep[row] = False
+                keep[row, non_zero[np.argsort(block[row, non_zero])[-k:]]] = True
+        rows, cols = np.nonzero(keep)
+        return rows, cols, block[rows, cols]
+
+    def _process_block(self, start: int):
+        stop = min(start + self._block_size, self._X.shape[0])
+        rows, cols, data = self.top_k(self.pairwise(start, stop))
+        return rows + start, cols, data
+
+    def compute(self) -> sparse.csr_matrix:
+        """
+        :return: n x n similarity matrix W_sparse, column j holds the neighbourhood of row j
+        """
+        n = self._X.shape[0]
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            blocks = list(executor.map(self._process_block, range(0, n, self._block_size)))
+        if blocks:
+            columns, rows, data = (np.concatenate(arrays) for arrays in zip(*blocks))
+        else:
+            columns, rows, data = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+        return sparse.csc_matrix((data, (rows, columns)), shape=(n, n), dtype=np.float32).tocsr()
@@ -131,24 +131,8 @@ class AiolliSimilarity(object):
         # self.pred_mat = train.dot(w_sparse).tolil()
         self.pred_mat = train.dot(self.w_sparse).toarray()
 
-    def get_user_recs(self, u, mask, k):
-        user_id = self._data.public_users.get(u)
-        user_recs = self.pred_mat[user_id]
-        # user_items = self._ratings[u].keys()
-        user_recs_mask = mask[user_id]
-        user_recs[~user_recs_mask] = -np.inf
-        indices, values = zip(*[(self._data.private_items.get(u_list[0]), u_list[1])
-                              for u_list in enumerate(user_recs)])
-
-        # indices, values = zip(*predictions.items())
-        indices = np.array(indices)
-        values = np.array(values)
-        local_k = min(k, len(values))
-        partially_ordered_preds_indices = np.argpartition(values, -local_k)[-local_k:]
-        real_values = values[partially_ordered_preds_indices]
-        real_indices = indices[partially_ordered_preds_indices]
-        local_top_k = real_values.argsort()[::-1]
-        return [(real_indices[item], real_values[item]) for item in local_top_k]
+    def predict_batch(self, offset, offset_stop):
+        return self.pred_mat[offset:offset_stop]
 
     # def get_user_recs(self, user, k=100):
     #     user_items = self._data.train_dict[user].keys()
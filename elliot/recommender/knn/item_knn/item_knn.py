@@ -80,25 +80,10 @@ class ItemKNN(RecMixin, BaseRecommenderModel):
             self._model = Similarity(data=self._data, num_neighbors=self._num_neighbors, similarity=self._similarity, implicit=False)
 
     def get_single_recommendation(self, mask, k, *args):
-        print(k)
-        #print(mask)
-        a = {u: self._model.get_user_recs(u, mask, k) for u in self._ratings.keys()}
-        #5/0
-        for u in self._ratings.keys():
-            b = self._model.get_user_recs(u, mask, k)
-            #print(b)
-        return a
+        return self.get_batched_recommendation(mask, k, self._model.predict_batch)
 
     def get_recommendations(self, k: int = 10):
-        predictions_top_k_val = {}
-        predictions_top_k_test = {}
-
-        recs_val, recs_test = self.process_protocol(k)
-
-        predictions_top_k_val.update(recs_val)
-        predictions_top_k_test.update(recs_test)
-
-        return predictions_top_k_val, predictions_top_k_test
+        return self.process_protocol(k)
 
     @property
     def name(self):
@@ -104,24 +104,16 @@ class KaHFM(RecMixin, BaseRecommenderModel):
                                  self._positive_item_regularization,
                                  self._negative_item_regularization)
         self._embed_k = self._model.get_factors()
-        self._sampler = cs.Sampler(self._data.i_train_dict)
+        self._sampler = cs.Sampler(self._data.sp_i_train_ratings, prefetch_batches=self._prefetch_batches)
         self._batch_size = 10000
 
     def get_recommendations(self, k: int = 10):
         self._model.prepare_predictions()
 
-        predictions_top_k_val = {}
-        predictions_top_k_test = {}
-
-        recs_val, recs_test = self.process_protocol(k)
-
-        predictions_top_k_val.update(recs_val)
-        predictions_top_k_test.update(recs_test)
-
-        return predictions_top_k_val, predictions_top_k_test
+        return self.process_protocol(k)
 
     def get_single_recommendation(self, mask, k, *args):
-        return {u: self._model.get_user_predictions(u, mask, k) for u in self._ratings.keys()}
+        return self.get_batched_recommendation(mask, k, self._model.predict_batch)
 
     # def get_recommendations(self, k: int = 100):
     #     return {u: self._model.get_user_recs(u, k) for u in self._ratings.keys()}
@@ -16,6 +16,7 @@ from elliot.recommender.base_recommender_model import init_charger
 from elliot.recommender.knowledge_aware.kaHFM_batch.kahfm_batch_model import KaHFM_model
 from elliot.recommender.knowledge_aware.kaHFM_batch.tfidf_utils import TFIDF
 from elliot.recommender.recommender_utils_mixin import RecMixin
+from elliot.utils.recommendations import merge_recommendations
 from elliot.utils.write import store_recommendation
 
 
@@ -83,7 +84,7 @@ class KaHFMBatch(RecMixin, BaseRecommenderModel):
 
         self._side = getattr(self._data.side_information, self._loader, None)
 
-        self._sampler = cs.Sampler(self._data.i_train_dict)
+        self._sampler = cs.Sampler(self._data.sp_i_train_ratings, prefetch_batches=self._prefetch_batches)
 
         self._tfidf_obj = TFIDF(self._side.feature_map)
         self._tfidf = self._tfidf_obj.tfidf()
@@ -141,12 +142,12 @@ class KaHFMBatch(RecMixin, BaseRecommenderModel):
             self.evaluate(it, loss.numpy()/(it + 1))
 
     def get_recommendations(self, k: int = 100):
-        predictions_top_k_test = {}
-        predictions_top_k_val = {}
+        predictions_top_k_test = []
+        predictions_top_k_val = []
         for index, offset in enumerate(range(0, self._num_users, self._batch_size)):
             offset_stop = min(offset + self._batch_size, self._num_users)
             predictions = self._model.predict_batch(offset, offset_stop)
             recs_val, recs_test = self.process_protocol(k, predictions, offset, offset_stop)
-            predictions_top_k_val.update(recs_val)
-            predictions_top_k_test.update(recs_test)
-        return predictions_top_k_val, predictions_top_k_test
+            predictions_top_k_val.append(recs_val)
+            predictions_top_k_test.append(recs_test)
+        return merge_recommendations(predictions_top_k_val), merge_recommendations(predictions_top_k_test)
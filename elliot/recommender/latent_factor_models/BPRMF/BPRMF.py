@@ -5,6 +5,7 @@ Module description:
 from tqdm import tqdm
 
 from elliot.recommender.latent_factor_models.BPRMF.BPRMF_model import MFModel
+from elliot.recommender.latent_factor_models.minibatch_sgd import run_hogwild
 
 __version__ = '0.3.1'
 __author__ = 'Vito Walter Anelli, Claudio Pomo'
@@ -33,7 +34,9 @@ class BPRMF(RecMixin, BaseRecommenderModel):
         update_users:
         update_items:
         update_bias:
+        workers: Number of Hogwild threads applying minibatches concurrently
 
+    With batch_size greater than 1, the triples of a batch are applied at once by a vectorized minibatch update.
 
     To include the recommendation model, add it to the config file adopting the following pattern:
 
@@ -54,6 +57,8 @@ class BPRMF(RecMixin, BaseRecommenderModel):
           update_users: True
           update_items: True
           update_bias: True
+          batch_size: 1
+          workers: 1
     """
 
     @init_charger
@@ -76,8 +81,11 @@ class BPRMF(RecMixin, BaseRecommenderModel):
             ("_update_bias", "update_bias", "up_b", True, None, None),
         ]
         self.autoset_params()
+        # -- the number of threads does not define the model: it stays out of its name
+        self._workers = int(getattr(self._params, "workers", 1))
 
-        self._batch_size = 1
+        if self._batch_size < 1:
+            self._batch_size = 1
         self._ratings = self._data.train_dict
 
         self._model = MFModel(self._factors,
@@ -88,21 +96,13 @@ class BPRMF(RecMixin, BaseRecommenderModel):
                               self._positive_item_regularization,
                               self._negative_item_regularization,
                               self._seed)
-        self._sampler = cs.Sampler(self._data.i_train_dict)
+        self._sampler = cs.Sampler(self._data.sp_i_train_ratings, prefetch_batches=self._prefetch_batches)
 
     def get_recommendations(self, k: int = 10):
-        predictions_top_k_val = {}
-        predictions_top_k_test = {}
-
-        recs_val, recs_test = self.process_protocol(k)
-
-        predictions_top_k_val.update(recs_val)
-        predictions_top_k_test.update(recs_test)
-
-        return predictions_top_k_val, predictions_top_k_test
+        return self.process_protocol(k)
 
     def get_single_recommendation(self, mask, k, *args):
-        return {u: self._model.get_user_predictions(u, mask, k) for u in self._ratings.keys()}
+        return self.get_batched_recommendation(mask, k, self._model.predict_batch)
 
     @property
     def name(self):
@@ -118,13 +118,12 @@ class BPRMF(RecMixin, BaseRecommenderModel):
 
         for it in self.iterate(self._epochs):
             print(f"\n********** Iteration: {it + 1}")
-            loss = 0
-            steps = 0
             with tqdm(total=int(self._data.transactions // self._batch_size), disable=not self._verbose) as t:
-                for batch in self._sampler.step(self._data.transactions, self._batch_size):
-                    steps += 1
+                def step(batch):
                     self._model.train_step(batch)
                     t.update()
 
+                run_hogwild(step, self._sampler.step(self._data.transactions, self._batch_size), self._workers)
+
             self.evaluate(it)
 
@@ -10,6 +10,8 @@ __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 import pickle
 import numpy as np
 
+from elliot.recommender.latent_factor_models.minibatch_sgd import scatter_add
+
 
 class MFModel(object):
     def __init__(self, F,
@@ -67,27 +69,44 @@ class MFModel(object):
         return self._global_bias + self._item_bias[item] \
                + self._user_factors[user] @ self._item_factors[item]
 
-    def get_user_predictions(self, user_id, mask, top_k=10):
-        user_id = self._public_users.get(user_id)
-        b = self._item_bias + self._user_factors[user_id] @ self._item_factors.T
-        a = mask[user_id]
-        b[~a] = -np.inf
-        indices, values = zip(*[(self._private_items.get(u_list[0]), u_list[1])
-                              for u_list in enumerate(b.data)])
-
-        indices = np.array(indices)
-        values = np.array(values)
-        local_k = min(top_k, len(values))
-        partially_ordered_preds_indices = np.argpartition(values, -local_k)[-local_k:]
-        real_values = values[partially_ordered_preds_indices]
-        real_indices = indices[partially_ordered_preds_indices]
-        local_top_k = real_values.argsort()[::-1]
-        return [(real_indices[item], real_values[item]) for item in local_top_k]
+    def predict_batch(self, offset, offset_stop):
+        return self._item_bias + self._user_factors[offset:offset_stop] @ self._item_factors.T
 
     def train_step(self, batch, **kwargs):
+        if len(batch[0]) > 1:
+            return self.update_factors_batch(*(np.ravel(b) for b in batch))
         for u, i, j in zip(*batch):
             self.update_factors(u[0], i[0], j[0])
 
+    def update_factors_batch(self, users: np.ndarray, pos: np.ndarray, neg: np.ndarray):
+        """
+        Minibatch version of update_factors: the gradients of all the (u, i, j) triples are computed from
+        the current parameters and scattered with np.add.at, so repeated users and items accumulate
+        their updates
+        """
+        user_factors = self._user_factors[users]
+        item_factors_i = self._item_factors[pos]
+        item_factors_j = self._item_factors[neg]
+        item_bias_i = self._item_bias[pos]
+        item_bias_j = self._item_bias[neg]
+        lr = self._learning_rate
+
+        x_uij = item_bias_i - item_bias_j + np.einsum("ij,ij->i", user_factors, item_factors_i - item_factors_j)
+        z = 1/(1 + np.exp(x_uij))
+
+        scatter_add(self._item_bias, pos, lr * (z - self._bias_regularization*item_bias_i))
+        scatter_add(self._item_bias, neg, lr * (-z - self._bias_regularization*item_bias_j))
+
+        d_u = (item_factors_i - item_factors_j)*z[:, None] - self._user_regularization*user_factors
+        # -- as in update_factors, item gradients are computed with the updated user factors
+        user_factors = user_factors + lr * d_u
+        scatter_add(self._user_factors, users, lr * d_u)
+
+        d_i = user_factors*z[:, None] - self._positive_item_regularization*item_factors_i
+        scatter_add(self._item_factors, pos, lr * d_i)
+        d_j = -user_factors*z[:, None] - self._negative_item_regularization*item_factors_j
+        scatter_add(self._item_factors, neg, lr * d_j)
+
     def update_factors(self, ui: int, ii: int, ji: int):
         user_factors = self._user_factors[ui]
         item_factors_i = self._item_factors[ii]
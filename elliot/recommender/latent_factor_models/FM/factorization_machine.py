@@ -18,6 +18,7 @@ from elliot.dataset.samplers import pointwise_pos_neg_ratings_sampler as pws
 from elliot.recommender.base_recommender_model import BaseRecommenderModel
 from elliot.recommender.latent_factor_models.FM.factorization_machine_model import FactorizationMachineModel
 from elliot.recommender.recommender_utils_mixin import RecMixin
+from elliot.utils.recommendations import merge_recommendations
 from elliot.utils.write import store_recommendation
 from elliot.recommender.base_recommender_model import init_charger
 
@@ -146,8 +147,8 @@ class FM(RecMixin, BaseRecommenderModel):
         return np.hstack((np.tile(user_oh, (self._num_items, 1)), self._item_array))
 
     def get_recommendations(self, k: int = 100):
-        predictions_top_k_test = {}
-        predictions_top_k_val = {}
+        predictions_top_k_test = []
+        predictions_top_k_val = []
         local_batch = (self._batch_size)
         for index, offset in enumerate(range(0, self._num_users, local_batch)):
             offset_stop = min(offset + local_batch, self._num_users)
@@ -159,9 +160,9 @@ class FM(RecMixin, BaseRecommenderModel):
                     (np.repeat(np.array(list(range(offset, offset_stop)))[:, None], repeats=self._num_items, axis=1),
                      np.array([self._i_items_set for _ in range(offset, offset_stop)])))
             recs_val, recs_test = self.process_protocol(k, predictions, offset, offset_stop)
-            predictions_top_k_val.update(recs_val)
-            predictions_top_k_test.update(recs_test)
-        return predictions_top_k_val, predictions_top_k_test
+            predictions_top_k_val.append(recs_val)
+            predictions_top_k_test.append(recs_test)
+        return merge_recommendations(predictions_top_k_val), merge_recommendations(predictions_top_k_test)
 
     # def get_recommendations(self, k: int = 100):
     #     local_batch = (self._batch_size)
@@ -36,6 +36,8 @@ class MF2020(RecMixin, BaseRecommenderModel):
         update_users:
         update_items:
         update_bias:
+        minibatch: Number of samples applied at once by a vectorized minibatch update (1 is plain SGD)
+        workers: Number of Hogwild threads applying minibatches concurrently
 
     To include the recommendation model, add it to the config file adopting the following pattern:
 
@@ -49,6 +51,8 @@ class MF2020(RecMixin, BaseRecommenderModel):
           factors: 10
           lr: 0.001
           reg: 0.0025
+          minibatch: 1
+          workers: 1
     """
 
     @init_charger
@@ -61,6 +65,10 @@ class MF2020(RecMixin, BaseRecommenderModel):
             ("_m", "m", "m", 0, int, None),
         ]
         self.autoset_params()
+        # -- the number of threads does not define the model: it stays out of its name
+        self._workers = int(getattr(self._params, "workers", 1))
+        # -- the minibatch size stays out of the name too, so the outputs of the plain SGD keep their legacy names
+        self._minibatch = int(getattr(self._params, "minibatch", 1))
 
         self._ratings = self._data.train_dict
         self._sampler = ps.Sampler(self._data.i_train_dict, self._m, self._data.sp_i_train, self._seed)
@@ -72,23 +80,17 @@ class MF2020(RecMixin, BaseRecommenderModel):
                               self._data,
                               self._learning_rate,
                               self._regularization,
-                              self._seed)
+                              self._seed,
+                              minibatch=self._minibatch,
+                              workers=self._workers)
 
     def get_recommendations(self, k: int = 10):
         self._model.prepare_predictions()
 
-        predictions_top_k_val = {}
-        predictions_top_k_test = {}
-
-        recs_val, recs_test = self.process_protocol(k)
-
-        predictions_top_k_val.update(recs_val)
-        predictions_top_k_test.update(recs_test)
-
-        return predictions_top_k_val, predictions_top_k_test
+        return self.process_protocol(k)
 
     def get_single_recommendation(self, mask, k, *args):
-        return {u: self._model.get_user_predictions(u, mask, k) for u in self._data.train_dict.keys()}
+        return self.get_batched_recommendation(mask, k, self._model.predict_batch)
 
     def predict(self, u: int, i: int):
         """
@@ -11,6 +11,8 @@ import pickle
 
 import numpy as np
 
+from elliot.recommender.latent_factor_models.minibatch_sgd import run_hogwild, scatter_add
+
 
 class MFModel(object):
     def __init__(self, F,
@@ -18,7 +20,9 @@ class MFModel(object):
                  lr,
                  reg,
                  random_seed,
-                 *args):
+                 *args,
+                 minibatch=1,
+                 workers=1):
         np.random.seed(random_seed)
         self._factors = F
         self._users = data.users
@@ -29,6 +33,8 @@ class MFModel(object):
         self._public_items = data.public_items
         self._lr = lr
         self._reg = reg
+        self._minibatch = minibatch
+        self._workers = workers
         self.initialize(*args)
 
     def initialize(self, loc: float = 0, scale: float = 0.1):
@@ -57,27 +63,14 @@ class MFModel(object):
         return self._global_bias + self._user_bias[user] + self._item_bias[item] \
                + self._user_factors[user] @ self._item_factors[item]
 
-    def get_user_predictions(self, user_id, mask, top_k=10):
-        user_id = self._public_users.get(user_id)
-        # b = self._train[user_id].dot(W_sparse)
-        # b = self._global_bias + self._user_bias[user_id] + self._item_bias \
-        #        + self._user_factors[user_id] @ self._item_factors.T
-        b = self._preds[user_id]
-        a = mask[user_id]
-        b[~a] = -np.inf
-        indices, values = zip(*[(self._private_items.get(u_list[0]), u_list[1])
-                              for u_list in enumerate(b.data)])
-
-        indices = np.array(indices)
-        values = np.array(values)
-        local_k = min(top_k, len(values))
-        partially_ordered_preds_indices = np.argpartition(values, -local_k)[-local_k:]
-        real_values = values[partially_ordered_preds_indices]
-        real_indices = indices[partially_ordered_preds_indices]
-        local_top_k = real_values.argsort()[::-1]
-        return [(real_indices[item], real_values[item]) for item in local_top_k]
+    def predict_batch(self, offset, offset_stop):
+        return self._preds[offset:offset_stop]
 
     def train_step(self, batch, **kwargs):
+        if self._minibatch > 1:
+            batch = np.asarray(batch)
+            minibatches = (batch[start:start + self._minibatch] for start in range(0, len(batch), self._minibatch))
+            return sum(run_hogwild(self.update_factors_batch, minibatches, self._workers))
         sum_of_loss = 0
         lr = self._lr
         reg = self._reg
@@ -148,6 +141,37 @@ class MFModel(object):
 
         return this_loss
 
+    def update_factors_batch(self, batch: np.ndarray):
+        """
+        Minibatch version of update_factors over the (user, item, rating) rows of batch: the gradients are
+        computed from the current parameters and scattered with np.add.at
+        :return: sum of the losses of the minibatch
+        """
+        user, item, rating = batch[:, 0].astype(int), batch[:, 1].astype(int), batch[:, 2]
+        uf_ = self._user_factors[user]
+        if_ = self._item_factors[item]
+        ub_ = self._user_bias[user]
+        ib_ = self._item_bias[item]
+        gb_ = self._global_bias
+        lr = self._lr
+        reg = self._reg
+
+        prediction = gb_ + ub_ + ib_ + np.einsum("ij,ij->i", uf_, if_)
+        sigmoid = 1.0 / (1.0 + np.exp(-prediction))
+        this_loss = np.logaddexp(0, prediction) - rating * prediction
+
+        grad = rating - sigmoid
+
+        d_u = lr * (grad[:, None] * if_ - reg * uf_)
+        scatter_add(self._user_factors, user, d_u)
+        # -- as in update_factors, item factors are updated with the updated user factors
+        scatter_add(self._item_factors, item, lr * (grad[:, None] * (uf_ + d_u) - reg * if_))
+        scatter_add(self._user_bias, user, lr * (grad - reg * ub_))
+        scatter_add(self._item_bias, item, lr * (grad - reg * ib_))
+        self._global_bias += lr * np.sum(grad - reg * gb_)
+
+        return np.sum(this_loss)
+
     def get_model_state(self):
         saving_dict = {}
         saving_dict['_global_bias'] = self._global_bias
@@ -78,19 +78,10 @@ class NonNegMF(RecMixin, BaseRecommenderModel):
                + f"_{self.get_params_shortcut()}"
 
     def get_recommendations(self, k: int = 10):
-        predictions_top_k_val = {}
-        predictions_top_k_test = {}
-
-        recs_val, recs_test = self.process_protocol(k)
-
-        predictions_top_k_val.update(recs_val)
-        predictions_top_k_test.update(recs_test)
-
-        return predictions_top_k_val, predictions_top_k_test
+        return self.process_protocol(k)
 
     def get_single_recommendation(self, mask, k, *args):
-        return {u: self._model.get_user_recs(u, mask, k) for u in self._data.train_dict.keys()}
-
+        return self.get_batched_recommendation(mask, k, self._model.predict_batch)
 
     def train(self):
         print(f"Transactions: {self._data.transactions}")
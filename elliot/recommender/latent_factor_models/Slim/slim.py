@@ -35,6 +35,11 @@ class Slim(RecMixin, BaseRecommenderModel):
     Args:
         l1_ratio:
         alpha:
+        neighborhood: Number of coefficients kept for each item
+        workers: Number of processes fitting the item columns
+
+    With workers > 1, the item columns are partitioned across worker processes, which read the train matrix
+    from shared memory-mapped files.
 
     To include the recommendation model, add it to the config file adopting the following pattern:
 
@@ -46,6 +51,8 @@ class Slim(RecMixin, BaseRecommenderModel):
             save_recs: True
           l1_ratio: 0.001
           alpha: 0.001
+          neighborhood: 10
+          workers: 4
     """
 
     @init_charger
@@ -58,13 +65,15 @@ class Slim(RecMixin, BaseRecommenderModel):
         ]
 
         self.autoset_params()
+        # -- the number of processes does not define the model: it stays out of its name
+        self._workers = int(getattr(self._params, "workers", 1))
 
         self._ratings = self._data.train_dict
         self._sp_i_train = self._data.sp_i_train
         self._i_items_set = list(range(self._num_items))
 
         self._model = SlimModel(self._data, self._num_users, self._num_items, self._l1_ratio, self._alpha,
-                                self._epochs, self._neighborhood, self._seed)
+                                self._epochs, self._neighborhood, self._seed, self._workers, self.logger)
 
     @property
     def name(self):
@@ -73,31 +82,15 @@ class Slim(RecMixin, BaseRecommenderModel):
                + f"_{self.get_params_shortcut()}"
 
     def get_recommendations(self, k: int = 10):
-        predictions_top_k_val = {}
-        predictions_top_k_test = {}
-
-        recs_val, recs_test = self.process_protocol(k)
-
-        predictions_top_k_val.update(recs_val)
-        predictions_top_k_test.update(recs_test)
-
-        return predictions_top_k_val, predictions_top_k_test
+        return self.process_protocol(k)
 
     def get_single_recommendation(self, mask, k, *args):
-        return {u: self._model.get_user_recs(u, mask, k) for u in self._data.train_dict.keys()}
+        return self.get_batched_recommendation(mask, k, self._model.predict_batch)
 
     def get_recommendations(self, k: int = 10):
         self._model.prepare_predictions()
 
-        predictions_top_k_val = {}
-        predictions_top_k_test = {}
-
-        recs_val, recs_test = self.process_protocol(k)
-
-        predictions_top_k_val.update(recs_val)
-        predictions_top_k_test.update(recs_test)
-
-        return predictions_top_k_val, predictions_top_k_test
+        return self.process_protocol(k)
 
 
     def predict(self, u: int, i: int):
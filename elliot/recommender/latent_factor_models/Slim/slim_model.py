@@ -7,107 +7,148 @@ __version__ = '0.3.1'
 __author__ = 'Felice Antonio Merra, Vito Walter Anelli, Claudio Pomo'
 __email__ = 'felice.merra@poliba.it, vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 
+import os
 import pickle
+import tempfile
 import time
 import numpy as np
-import sys
 import scipy.sparse as sp
 from sklearn.linear_model import ElasticNet
 
+from elliot.utils.scheduler import JobScheduler
 
-class SlimModel(object):
-    def __init__(self,
-                 data, num_users, num_items, l1_ratio, alpha, epochs, neighborhood, random_seed):
+_arrays = ["data", "indices", "indptr"]
 
-        self._data = data
-        self._num_users = num_users
-        self._num_items = num_items
-        self._l1_ratio = l1_ratio
-        self._alpha = alpha
-        self._epochs = epochs
-        self._neighborhood = neighborhood
 
-        self.md = ElasticNet(alpha=self._alpha,
-                             l1_ratio=self._l1_ratio,
-                             positive=True,
-                             fit_intercept=False,
-                             copy_X=False,
-                             precompute=True,
-                             selection='random',
-                             max_iter=100,
-                             random_state=random_seed,
-                             tol=1e-4)
+def _attach(shared):
+    if "folder" in shared:
+        # -- copy-on-write maps: the train matrix is read from the files shared by all the workers
+        arrays = {name: np.load(os.sep.join([shared["folder"], f"{name}.npy"]), mmap_mode="c") for name in _arrays}
+    else:
+        arrays = shared
+    # -- the data array is private to the worker, since the target column is zeroed in it
+    return sp.csc_matrix((np.array(arrays["data"]), arrays["indices"], arrays["indptr"]), shape=shared["shape"])
 
-        self._w_sparse = None
-        self.pred_mat = None
 
-    def train(self, verbose):
-        train = self._data.sp_i_train_ratings
+def _fit_columns(shared, columns):
+    """
+    Fit the ElasticNet models of a chunk of item columns
+    :param shared: train matrix arrays (or the folder of their files), shape and model parameters
+    :param columns: item columns to fit
+    :return: rows, columns and values of the top-neighborhood coefficients of the columns
+    """
+    train = _attach(shared)
+    md = ElasticNet(**shared["elastic_net"])
+    neighborhood = shared["neighborhood"]
+    rows, cols, values = [], [], []
 
-        dataBlock = 10000000
+    for currentItem in columns:
+        y = train[:, currentItem].toarray()
 
-        rows = np.empty(dataBlock, dtype=np.int32)
-        cols = np.empty(dataBlock, dtype=np.int32)
-        values = np.empty(dataBlock, dtype=np.float32)
+        # set the j-th column of X to zero
+        start_pos = train.indptr[currentItem]
+        end_pos = train.indptr[currentItem + 1]
 
-        numCells = 0
+        current_item_data_backup = train.data[start_pos: end_pos].copy()
+        train.data[start_pos: end_pos] = 0.0
 
-        start_time = time.time()
-        start_time_printBatch = start_time
+        # fit one ElasticNet model per column
+        md.fit(train, y)
 
-        for currentItem in range(self._num_items):
-            y = train[:, currentItem].toarray()
+        nonzero_model_coef_index = md.sparse_coef_.indices
+        nonzero_model_coef_value = md.sparse_coef_.data
 
-            # set the j-th column of X to zero
-            start_pos = train.indptr[currentItem]
-            end_pos = train.indptr[currentItem + 1]
+        local_topK = min(len(nonzero_model_coef_value) - 1, neighborhood)
 
-            current_item_data_backup = train.data[start_pos: end_pos].copy()
-            train.data[start_pos: end_pos] = 0.0
+        if local_topK > 0:
+            relevant_items_partition = (-nonzero_model_coef_value).argpartition(local_topK)[0:local_topK]
+            relevant_items_partition_sorting = np.argsort(-nonzero_model_coef_value[relevant_items_partition])
+            ranking = relevant_items_partition[relevant_items_partition_sorting]
 
-            # fit one ElasticNet model per column
-            self.md.fit(train, y)
+            rows.append(nonzero_model_coef_index[ranking])
+            cols.append(np.full(len(ranking), currentItem, dtype=np.int32))
+            values.append(nonzero_model_coef_value[ranking])
 
-            nonzero_model_coef_index = self.md.sparse_coef_.indices
-            nonzero_model_coef_value = self.md.sparse_coef_.data
+        train.data[start_pos:end_pos] = current_item_data_backup
 
-            local_topK = min(len(nonzero_model_coef_value) - 1, self._neighborhood)
+    if not rows:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+    return np.concatenate(rows).astype(np.int32), np.concatenate(cols), np.concatenate(values).astype(np.float32)
 
-            relevant_items_partition = (-nonzero_model_coef_value).argpartition(local_topK)[0:local_topK]
-            relevant_items_partition_sorting = np.argsort(-nonzero_model_coef_value[relevant_items_partition])
-            ranking = relevant_items_partition[relevant_items_partition_sorting]
 
-            for index in range(len(ranking)):
-                if numCells == len(rows):
-                    rows = np.concatenate((rows, np.zeros(dataBlock, dtype=np.int32)))
-                    cols = np.concatenate((cols, np.zeros(dataBlock, dtype=np.int32)))
-                    values = np.concatenate((values, np.zeros(dataBlock, dtype=np.float32)))
+class SlimModel(object):
+    def __init__(self,
+                 data, num_users, num_items, l1_ratio, alpha, epochs, neighborhood, random_seed, workers=1,
+                 logger=None):
 
-                rows[numCells] = nonzero_model_coef_index[ranking[index]]
-                cols[numCells] = currentItem
-                values[numCells] = nonzero_model_coef_value[ranking[index]]
+        self._data = data
+        self._num_users = num_users
+        self._num_items = num_items
+        self._l1_ratio = l1_ratio
+        self._alpha = alpha
+        self._epochs = epochs
+        self._neighborhood = neighborhood
+        self._workers = max(1, workers)
+        self._logger = logger
+
+        self._elastic_net = dict(alpha=self._alpha,
+                                 l1_ratio=self._l1_ratio,
+                                 positive=True,
+                                 fit_intercept=False,
+                                 copy_X=False,
+                                 precompute=True,
+                                 selection='random',
+                                 max_iter=100,
+                                 random_state=random_seed,
+                                 tol=1e-4)
+
+        self._w_sparse = None
+        self.pred_mat = None
 
-                numCells += 1
+    def train(self, verbose):
+        train = sp.csc_matrix(self._data.sp_i_train_ratings)
+        shared = {"shape": train.shape, "elastic_net": self._elastic_net, "neighborhood": self._neighborhood}
 
-            train.data[start_pos:end_pos] = current_item_data_backup
+        # -- chunks of at most 1000 columns, a few per worker to balance their load and report progress
+        chunk_size = int(max(1, min(1000, np.ceil(self._num_items / (self._workers * 4)))))
+        chunks = [range(start, min(start + chunk_size, self._num_items))
+                  for start in range(0, self._num_items, chunk_size)]
+        results = [None] * len(chunks)
 
-            if verbose and (time.time() - start_time_printBatch > 300 or (
-                    currentItem + 1) % 1000 == 0 or currentItem == self._num_items - 1):
-                print('{}: Processed {} ( {:.2f}% ) in {:.2f} minutes. Items per second: {:.0f}'.format(
+        start_time = time.time()
+        processed = 0
+
+        def collect(index, result):
+            nonlocal processed
+            results[index] = result
+            processed += len(chunks[index])
+            if verbose and self._logger is not None:
+                self._logger.info('{}: Processed {} ( {:.2f}% ) in {:.2f} minutes. Items per second: {:.0f}'.format(
                     'SLIMElasticNetRecommender',
-                    currentItem + 1,
-                    100.0 * float(currentItem + 1) / self._num_items,
+                    processed,
+                    100.0 * float(processed) / self._num_items,
                     (time.time() - start_time) / 60,
-                    float(currentItem) / (time.time() - start_time)))
-
-                sys.stdout.flush()
-                sys.stderr.flush()
-
-                start_time_printBatch = time.time()
+                    float(processed) / (time.time() - start_time)))
+
+        if self._workers > 1 and len(chunks) > 1:
+            with tempfile.TemporaryDirectory() as folder:
+                for name in _arrays:
+                    np.save(os.sep.join([folder, f"{name}.npy"]), getattr(train, name))
+                shared["folder"] = folder
+                JobScheduler(self._workers).map(_fit_columns, chunks, shared, callback=collect)
+        else:
+            shared.update({name: getattr(train, name) for name in _arrays})
+            for index, columns in enumerate(chunks):
+                collect(index, _fit_columns(shared, columns))
+
+        if results:
+            rows, cols, values = (np.concatenate(arrays) for arrays in zip(*results))
+        else:
+            rows, cols, values = np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
 
         # generate the sparse weight matrix
-        self._w_sparse = sp.csr_matrix((values[:numCells], (rows[:numCells], cols[:numCells])),
-                                      shape=(self._num_items, self._num_items), dtype=np.float32)
+        self._w_sparse = sp.csr_matrix((values, (rows, cols)),
+                                       shape=(self._num_items, self._num_items), dtype=np.float32)
 
     def prepare_predictions(self):
         self.pred_mat = self._data.sp_i_train_ratings.dot(self._w_sparse).toarray()
@@ -115,23 +156,8 @@ class SlimModel(object):
     def predict(self, u, i):
         return self.pred_mat[u, i]
 
-    def get_user_recs(self, user, mask, k=100):
-        # user_items = self._data.train_dict[user].keys()
-        # predictions = {i: self.predict(user, i) for i in self._data.items if i not in user_items}
-
-        ui = self._data.public_users[user]
-        user_mask = mask[ui]
-        predictions = {self._data.private_items[i]: self.predict(ui, i) for i in range(self._data.num_items) if user_mask[i]}
-
-        indices, values = zip(*predictions.items())
-        indices = np.array(indices)
-        values = np.array(values)
-        local_k = min(k, len(values))
-        partially_ordered_preds_indices = np.argpartition(values, -local_k)[-local_k:]
-        real_values = values[partially_ordered_preds_indices]
-        real_indices = indices[partially_ordered_preds_indices]
-        local_top_k = real_values.argsort()[::-1]
-        return [(real_indices[item], real_values[item]) for item in local_top_k]
+    def predict_batch(self, offset, offset_stop):
+        return self.pred_mat[offset:offset_stop]
 
     def get_model_state(self):
         saving_dict = {}
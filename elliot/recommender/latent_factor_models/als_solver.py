@@ -0,0 +1,117 @@
+"""
+Module description:
+
+"""
+
+__version__ = '0.3.1'
+__author__ = 'Vito Walter Anelli, Claudio Pomo'
+__email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy import sparse as sp
+
+# number of (row, non-zero, factor) cells gathered at once by a block
+BLOCK_CELLS = 2 ** 22
+MAX_BLOCK_ROWS = 4096
+
+
+class ALSSolver(object):
+    """
+    Alternating Least Squares half-step shared by iALS and WRMF.
+
+    For every row u of the confidence matrix C, it solves the implicit feedback normal equations
+        (F^T F + F^T (C_u - I) F + reg I) x_u = F^T C_u p_u
+    where F holds the fixed factors and p_u is 1 on the non-zeros of the row. Only the non-zeros of the
+    rows are touched: rows are grouped in blocks of similar length, their non-zeros are gathered in padded
+    tensors, and the blocks are solved concurrently in a thread pool.
+
+    Two solvers are available:
+    - exact: the batched solution of the f x f systems, i.e. the legacy per-row inverse
+    - cg: cg_steps conjugate gradient iterations warm-started from the current factors, which only
+      need matrix-vector products with the non-zeros of the rows
+    """
+
+    def __init__(self, reg: float, solver: str = "exact", cg_steps: int = 3, workers: int = None):
+        if solver not in ["exact", "cg"]:
+            raise ValueError(f"ALS solver {solver} not recognized. Allowed values are: exact, cg")
+        self._reg = reg
+        self._solver = solver
+        self._cg_steps = cg_steps
+        self._workers = workers or os.cpu_count() or 1
+
+    def solve(self, C: sp.csr_matrix, fixed: np.ndarray, factors: np.ndarray, rows: np.ndarray = None,
+              gram: np.ndarray = None):
+        """
+        Update in place the factors of the rows of C
+        :param C: rows x columns confidence matrix, non-zeros are the observed interactions
+        :param fixed: columns x f factors held fixed
+        :param factors: rows x f factors to update
+        :param rows: rows to update, default all of them
+        :param gram: fixed^T fixed, computed if missing
+        """
+        if rows is None:
+            rows = np.arange(C.shape[0])
+        gram = fixed.T.dot(fixed) if gram is None else np.asarray(gram)
+        gram = gram + self._reg * np.eye(fixed.shape[1])
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            list(executor.map(lambda block: self._solve_block(C, fixed, factors, gram, block),
+                              self.row_blocks(C.indptr, rows, fixed.shape[1])))
+
+    @staticmethod
+    def row_blocks(indptr: np.ndarray, rows: np.ndarray, n_factors: int):
+        """
+        Split the rows in blocks of similar length, so that padding them to their longest row is cheap
+        """
+        lengths = indptr[rows + 1] - indptr[rows]
+        order = np.argsort(lengths, kind="stable")
+        rows, lengths = rows[order], lengths[order]
+        start = 0
+        while start < len(rows):
+            # -- rows are sorted by length: the last row of a block is the longest one
+            size = int(min(MAX_BLOCK_ROWS, len(rows) - start,
+                           max(1, BLOCK_CELLS // max(1, int(lengths[start]) * n_factors))))
+            while size > 1 and size * int(lengths[start + size - 1]) * n_factors > BLOCK_CELLS:
+                size //= 2
+            yield rows[start:start + size]
+            start += size
+
+    def _solve_block(self, C, fixed, factors, gram, rows):
+        starts = C.indptr[rows]
+        lengths = C.indptr[rows + 1] - starts
+        width = int(lengths.max()) if len(rows) else 0
+        valid = np.arange(width) < lengths[:, None]
+        positions = np.where(valid, starts[:, None] + np.arange(width), 0)
+
+        confidences = np.where(valid, C.data[positions], 0)
+        gathered = fixed[C.indices[positions]] * valid[..., None]
+        weights = np.where(valid, confidences - 1, 0)[..., None]
+        b = np.matmul(gathered.transpose(0, 2, 1), confidences[..., None])[..., 0]
+
+        if self._solver == "exact":
+            A = gram + np.matmul(gathered.transpose(0, 2, 1), gathered * weights)
+            factors[rows] = np.linalg.solve(A, b[..., None])[..., 0]
+        else:
+            def product(v):
+                return v.dot(gram) + np.matmul(gathered.transpose(0, 2, 1),
+                                               np.matmul(gathered, v[..., None]) * weights)[..., 0]
+
+            x = factors[rows]
+            r = b - product(x)
+            p = r.copy()
+            rs_old = np.einsum("ij,ij->i", r, r)
+            for _ in range(self._cg_steps):
+                Ap = product(p)
+                den = np.einsum("ij,ij->i", p, Ap)
+                alpha = np.divide(rs_old, den, out=np.zeros_like(rs_old), where=den > 0)
+                x += alpha[:, None] * p
+                r -= alpha[:, None] * Ap
+                rs_new = np.einsum("ij,ij->i", r, r)
+                if not np.any(rs_new > 1e-20):
+                    break
+                beta = np.divide(rs_new, rs_old, out=np.zeros_like(rs_new), where=rs_old > 0)
+                p = r + beta[:, None] * p
+                rs_old = rs_new
+            factors[rows] = x
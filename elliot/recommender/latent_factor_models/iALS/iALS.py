@@ -28,6 +28,8 @@ class iALS(RecMixin, BaseRecommenderModel):
         lr: Learning rate
         alpha:
         reg: Regularization coefficient
+        solver: ALS solver, 'exact' or 'cg' (conjugate gradient)
+        cg_steps: Conjugate gradient steps per row with the cg solver
 
     To include the recommendation model, add it to the config file adopting the following pattern:
 
@@ -41,6 +43,8 @@ class iALS(RecMixin, BaseRecommenderModel):
           factors: 50
           alpha: 1
           reg: 0.1
+          solver: exact
+          cg_steps: 3
     """
 
     @init_charger
@@ -54,6 +58,9 @@ class iALS(RecMixin, BaseRecommenderModel):
             ("_scaling", "scaling", "scaling", "linear", None, None)
         ]
         self.autoset_params()
+        # -- solver options change how the factors are computed, not the model: they stay out of its name
+        self._solver = getattr(self._params, "solver", "exact")
+        self._cg_steps = int(getattr(self._params, "cg_steps", 3))
 
         self._ratings = self._data.train_dict
         self._sp_i_train = self._data.sp_i_train
@@ -64,23 +71,17 @@ class iALS(RecMixin, BaseRecommenderModel):
                                 self._alpha,
                                 self._epsilon,
                                 self._reg,
-                                self._scaling)
+                                self._scaling,
+                                self._solver,
+                                self._cg_steps)
 
     def get_recommendations(self, k: int = 10):
         self._model.prepare_predictions()
 
-        predictions_top_k_val = {}
-        predictions_top_k_test = {}
-
-        recs_val, recs_test = self.process_protocol(k)
-
-        predictions_top_k_val.update(recs_val)
-        predictions_top_k_test.update(recs_test)
-
-        return predictions_top_k_val, predictions_top_k_test
+        return self.process_protocol(k)
 
     def get_single_recommendation(self, mask, k, *args):
-        return {u: self._model.get_user_recs(u, mask, k) for u in self._data.train_dict.keys()}
+        return self.get_batched_recommendation(mask, k, self._model.predict_batch)
 
     @property
     def name(self):
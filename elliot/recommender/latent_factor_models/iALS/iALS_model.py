@@ -10,7 +10,8 @@ __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 import pickle
 
 import numpy as np
-from scipy import sparse as sp
+
+from elliot.recommender.latent_factor_models.als_solver import ALSSolver
 
 
 class iALSModel(object):
@@ -18,7 +19,7 @@ class iALSModel(object):
     Simple Matrix Factorization class
     """
 
-    def __init__(self, factors, data, random, alpha, epsilon, reg, scaling):
+    def __init__(self, factors, data, random, alpha, epsilon, reg, scaling, solver="exact", cg_steps=3, workers=None):
 
         self._data = data
         self.random = random
@@ -28,7 +29,7 @@ class iALSModel(object):
             self.C.data = 1.0 + alpha * self.C.data
         elif scaling == "log":
             self.C.data = 1.0 + alpha * np.log(1.0 + self.C.data / epsilon)
-        self.C_csc = self.C.tocsc()
+        self.C_T = self.C.T.tocsr()
         self.train_dict = self._data.train_dict
         self.user_num, self.item_num = self._data.num_users, self._data.num_items
 
@@ -38,56 +39,19 @@ class iALSModel(object):
         warm_item_mask = np.ediff1d(self._data.sp_i_train.tocsc().indptr) > 0
         self.warm_items = np.arange(0, self.item_num, dtype=np.int32)[warm_item_mask]
 
-        self.X_eye = sp.eye(self.user_num)
-        self.Y_eye = sp.eye(self.item_num)
-        self.lambda_eye = reg * sp.eye(factors)
+        self.solver = ALSSolver(reg, solver, cg_steps, workers)
 
         self.user_vec, self.item_vec, self.pred_mat = None, None, None
 
     def train_step(self):
-        yTy = self.Y.T.dot(self.Y)
-
-        C = self.C
-        for u in range(self.user_num):
-            start = C.indptr[u]
-            end = C.indptr[u+1]
-
-            Cu = C.data[start:end]
-            Pu = self.Y[C.indices[start:end], :]
-
-            B = yTy + Pu.T.dot(((Cu - 1) * Pu.T).T) + self.lambda_eye
-
-            self.X[u] = np.dot(np.linalg.inv(B), Pu.T.dot(Cu))
-
-        xTx = self.X.T.dot(self.X)
-        C = self.C_csc
-        for i in self.warm_items:
-            start = C.indptr[i]
-            end = C.indptr[i + 1]
-
-            Cu = C.data[start:end]
-            Pi = self.X[C.indices[start:end], :]
-
-            B = xTx + Pi.T.dot(((Cu - 1) * Pi.T).T) + self.lambda_eye
-
-            self.Y[i] = np.dot(np.linalg.inv(B), Pi.T.dot(Cu))
+        self.solver.solve(self.C, self.Y, self.X)
+        self.solver.solve(self.C_T, self.X, self.Y, rows=self.warm_items)
 
     def predict(self, user, item):
         return self.pred_mat[self._data.public_users[user], self._data.public_items[item]]
 
-    def get_user_recs(self, user, mask, k=100):
-        user_mask = mask[self._data.public_users[user]]
-        predictions = {i: self.predict(user, i) for i in self._data.items if user_mask[self._data.public_items[i]]}
-
-        indices, values = zip(*predictions.items())
-        indices = np.array(indices)
-        values = np.array(values)
-        local_k = min(k, len(values))
-        partially_ordered_preds_indices = np.argpartition(values, -local_k)[-local_k:]
-        real_values = values[partially_ordered_preds_indices]
-        real_indices = indices[partially_ordered_preds_indices]
-        local_top_k = real_values.argsort()[::-1]
-        return [(real_indices[item], real_values[item]) for item in local_top_k]
+    def predict_batch(self, offset, offset_stop):
+        return self.pred_mat[offset:offset_stop]
 
     def get_model_state(self):
         saving_dict = {}
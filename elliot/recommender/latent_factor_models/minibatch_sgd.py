@@ -0,0 +1,53 @@
+"""
+Module description:
+
+"""
+
+__version__ = '0.3.1'
+__author__ = 'Vito Walter Anelli, Claudio Pomo'
+__email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
+
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+# ufunc.at got a fast path in NumPy 1.25
+_fast_ufunc_at = tuple(int(v) for v in np.__version__.split(".")[:2]) >= (1, 25)
+
+
+def scatter_add(target: np.ndarray, indices: np.ndarray, values: np.ndarray):
+    """
+    Same result of np.add.at(target, indices, values): rows of values with a repeated index accumulate.
+    Before NumPy 1.25, values are summed per index with a sort and np.add.reduceat, which is much faster
+    """
+    if _fast_ufunc_at:
+        np.add.at(target, indices, values)
+        return
+    order = np.argsort(indices, kind="stable")
+    unique, starts = np.unique(indices[order], return_index=True)
+    target[unique] += np.add.reduceat(values[order], starts, axis=0)
+
+
+def run_hogwild(step, batches, workers: int = 1):
+    """
+    Hogwild-style training: concurrent threads apply step to different batches and update the shared
+    parameters without locks. NumPy releases the GIL in the bulk of the vectorized kernels.
+    With a single worker, batches are processed serially in order.
+    :param step: function updating the model parameters with a batch
+    :param batches: iterable of batches, consumed a window of 2 x workers batches at a time
+    :param workers: number of threads
+    :return: list of the results of step, in batch order
+    """
+    if workers <= 1:
+        return [step(batch) for batch in batches]
+    results = []
+    batches = iter(batches)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            window = list(itertools.islice(batches, 2 * workers))
+            if not window:
+                break
+            results.extend(executor.map(step, window))
+    return results
@@ -18,6 +18,7 @@ from elliot.recommender.base_recommender_model import init_charger
 from elliot.recommender.neural.ConvMF.convolutional_matrix_factorization_model import \
     ConvMatrixFactorizationModel
 from elliot.recommender.recommender_utils_mixin import RecMixin
+from elliot.utils.recommendations import merge_recommendations
 
 
 class ConvMF(RecMixin, BaseRecommenderModel):
@@ -66,7 +67,7 @@ class ConvMF(RecMixin, BaseRecommenderModel):
             **kwargs:
         """
 
-        self._sampler = pws.Sampler(self._data.i_train_dict)
+        self._sampler = pws.Sampler(self._data.sp_i_train_ratings, prefetch_batches=self._prefetch_batches)
 
         self._params_list = [
             ("_lr", "lr", "lr", 0.001, None, None),
@@ -119,8 +120,8 @@ class ConvMF(RecMixin, BaseRecommenderModel):
             self.evaluate(it, loss.numpy()/(it + 1))
 
     def get_recommendations(self, k: int = 100):
-        predictions_top_k_test = {}
-        predictions_top_k_val = {}
+        predictions_top_k_test = []
+        predictions_top_k_val = []
         for index, offset in enumerate(range(0, self._num_users, self._batch_size)):
             offset_stop = min(offset + self._batch_size, self._num_users)
             predictions = self._model.get_recs(
@@ -131,7 +132,7 @@ class ConvMF(RecMixin, BaseRecommenderModel):
             )
             recs_val, recs_test = self.process_protocol(k, predictions, offset, offset_stop)
 
-            predictions_top_k_val.update(recs_val)
-            predictions_top_k_test.update(recs_test)
-        return predictions_top_k_val, predictions_top_k_test
+            predictions_top_k_val.append(recs_val)
+            predictions_top_k_test.append(recs_test)
+        return merge_recommendations(predictions_top_k_val), merge_recommendations(predictions_top_k_test)
 
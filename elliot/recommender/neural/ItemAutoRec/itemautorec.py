@@ -15,6 +15,7 @@ from elliot.recommender.base_recommender_model import BaseRecommenderModel
 from elliot.recommender.base_recommender_model import init_charger
 from elliot.recommender.neural.ItemAutoRec.itemautorec_model import ItemAutoRecModel
 from elliot.recommender.recommender_utils_mixin import RecMixin
+from elliot.utils.recommendations import merge_recommendations
 
 
 class ItemAutoRec(RecMixin, BaseRecommenderModel):
@@ -97,15 +98,15 @@ class ItemAutoRec(RecMixin, BaseRecommenderModel):
             self.evaluate(it, loss.numpy()/(it + 1))
 
     def get_recommendations(self, k: int = 100):
-        predictions_top_k_test = {}
-        predictions_top_k_val = {}
+        predictions_top_k_test = []
+        predictions_top_k_val = []
         for batch in self._sampler.step(self._num_items, self._num_items):
             predictions = self._model.get_recs(batch)
         predictions = np.transpose(np.array(predictions))  # We have to build the transpose since we query the model by items.
         recs_val, recs_test = self.process_protocol(k, predictions, 0, self._data.num_users)
-        predictions_top_k_val.update(recs_val)
-        predictions_top_k_test.update(recs_test)
-        return predictions_top_k_val, predictions_top_k_test
+        predictions_top_k_val.append(recs_val)
+        predictions_top_k_test.append(recs_test)
+        return merge_recommendations(predictions_top_k_val), merge_recommendations(predictions_top_k_test)
 
     # def get_recommendations(self, k: int = 100):
     #     predictions_top_k = {}
@@ -3,6 +3,8 @@ import os
 import numpy as np
 from tqdm import tqdm
 
+from elliot.recommender.top_k_ranker import get_block_size, get_top_k
+from elliot.utils.recommendations import TopKRecommendations, merge_recommendations
 from elliot.utils.write import store_recommendation
 
 
@@ -26,11 +28,17 @@ class RecMixin(object):
 
     def evaluate(self, it=None, loss=0):
         if (it is None) or (not (it + 1) % self._validation_rate):
-            print(type(self.evaluator))
-            print("k: " + str(self.evaluator.get_needed_recommendations()))
-            #print(self.evaluator.get_needed_recommendations())
-            recs = self.get_recommendations(self.evaluator.get_needed_recommendations())
-            result_dict = self.evaluator.eval(recs)
+            # -- in-training evaluations of the fast mode only score the monitored metrics on the validation set
+            fast = self._fast_validation and (it is not None)
+            if fast:
+                recs = self.get_recommendations(self.evaluator.get_monitored_recommendations(self._monitored_metrics))
+                result_dict = self.evaluator.eval_monitored(recs, self._monitored_metrics,
+                                                            self.get_validation_users())
+            else:
+                print(type(self.evaluator))
+                print("k: " + str(self.evaluator.get_needed_recommendations()))
+                recs = self.get_recommendations(self.evaluator.get_needed_recommendations())
+                result_dict = self.evaluator.eval(recs)
 
             self._losses.append(loss)
 
@@ -41,7 +49,13 @@ class RecMixin(object):
             else:
                 self.logger.info(f'Finished')
 
-            if self._save_recs:
+            best = (len(self._results) - 1) == self.get_best_arg()
+            if fast and best:
+                # -- the full metric suite is only run on the best checkpoints
+                recs = self.get_recommendations(self.evaluator.get_needed_recommendations())
+                self._full_results[len(self._results) - 1] = self.evaluator.eval(recs)
+
+            if self._save_recs and (best or not fast):
                 self.logger.info(f"Writing recommendations at: {self._config.path_output_rec_result}")
                 if it is not None:
                     store_recommendation(recs[1], os.path.abspath(
@@ -50,7 +64,7 @@ class RecMixin(object):
                     store_recommendation(recs[1], os.path.abspath(
                         os.sep.join([self._config.path_output_rec_result, f"{self.name}.tsv"])))
 
-            if (len(self._results) - 1) == self.get_best_arg():
+            if best:
                 if it is not None:
                     self._params.best_iteration = it + 1
                 self.logger.info("******************************************")
@@ -61,19 +75,39 @@ class RecMixin(object):
                     else:
                         self.logger.warning("Saving weights FAILED. No model to save.")
 
+    def get_full_results(self, it=None):
+        """
+        Results of the full metric suite for the last evaluation
+        :param it: iteration of the last evaluation, None after the training
+        :return: the last results, evaluated again on all the metrics if it was a fast in-training evaluation
+        """
+        last = len(self._results) - 1
+        if not (self._fast_validation and (it is not None)):
+            return self._results[last]
+        if last not in self._full_results:
+            recs = self.get_recommendations(self.evaluator.get_needed_recommendations())
+            self._full_results[last] = self.evaluator.eval(recs)
+        return self._full_results[last]
 
+    def get_validation_users(self):
+        """
+        Fixed sample of the users scored by the fast in-training evaluations, None to score all of them
+        """
+        if self._validation_sample and self._validation_users is None:
+            self._validation_users = self.evaluator.sample_monitored_users(self._validation_sample, self._seed)
+        return self._validation_users
 
     def get_recommendations(self, k: int = 100):
-        predictions_top_k_test = {}
-        predictions_top_k_val = {}
+        predictions_top_k_test = []
+        predictions_top_k_val = []
         for index, offset in enumerate(range(0, self._num_users, self._batch_size)):
             offset_stop = min(offset + self._batch_size, self._num_users)
             predictions = self._model.predict(self._data.sp_i_train[offset:offset_stop].toarray())
             recs_val, recs_test = self.process_protocol(k, predictions, offset, offset_stop)
-            predictions_top_k_val.update(recs_val)
-            predictions_top_k_test.update(recs_test)
+            predictions_top_k_val.append(recs_val)
+            predictions_top_k_test.append(recs_test)
 
-        return predictions_top_k_val, predictions_top_k_test
+        return merge_recommendations(predictions_top_k_val), merge_recommendations(predictions_top_k_test)
 
     def process_protocol(self, k, *args):
 
@@ -86,9 +120,23 @@ class RecMixin(object):
 
     def get_single_recommendation(self, mask, k, predictions, offset, offset_stop):
         v, i = self._model.get_top_k(predictions, mask[offset: offset_stop], k=k)
-        items_ratings_pair = [list(zip(map(self._data.private_items.get, u_list[0]), u_list[1]))
-                              for u_list in list(zip(i.numpy(), v.numpy()))]
-        return dict(zip(map(self._data.private_users.get, range(offset, offset_stop)), items_ratings_pair))
+        return TopKRecommendations.from_top_k(self._data, offset, i.numpy(), v.numpy())
+
+    def get_batched_recommendation(self, mask, k, predict_batch):
+        """
+        Rank all the users block by block with the shared vectorized top-k
+        :param mask: candidate mask, sliced on the users of each block
+        :param k: length of the recommendation lists
+        :param predict_batch: function (offset, offset_stop) -> block of scores of those users
+        :return: TopKRecommendations of all the users, with the non-candidate items left out
+        """
+        blocks = []
+        block_size = get_block_size(self._num_users, self._num_items)
+        for offset in range(0, self._num_users, block_size):
+            offset_stop = min(offset + block_size, self._num_users)
+            items, scores = get_top_k(predict_batch(offset, offset_stop), mask[offset: offset_stop], k)
+            blocks.append(TopKRecommendations.from_top_k(self._data, offset, items, scores))
+        return merge_recommendations(blocks)
 
     def restore_weights(self):
         try:
@@ -115,13 +163,14 @@ class RecMixin(object):
         if self._optimize_internal_loss:
             return min(self._losses)
         else:
-            return -max([r[self._validation_k]["val_results"][self._validation_metric] for r in self._results])
+            return -self.get_results()[self._validation_k]["val_results"][self._validation_metric]
 
     def get_params(self):
         return self._params.__dict__
 
     def get_results(self):
-        return self._results[self.get_best_arg()]
+        best = self.get_best_arg()
+        return self._full_results.get(best, self._results[best])
 
     def get_best_arg(self):
         if self._optimize_internal_loss:
@@ -0,0 +1,41 @@
+"""
+Module description:
+
+"""
+
+__version__ = '0.3.1'
+__author__ = 'Vito Walter Anelli, Claudio Pomo'
+__email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
+
+import numpy as np
+import scipy.sparse as sp
+
+# number of (user, item) cells scored at once, i.e. ~128MB of float64 scores per block
+BLOCK_CELLS = 2 ** 24
+
+
+def get_block_size(num_users: int, num_items: int, block_cells: int = BLOCK_CELLS) -> int:
+    """
+    Number of users ranked together so that a dense scores block holds about block_cells values
+    """
+    return int(max(1, min(num_users, block_cells // max(num_items, 1))))
+
+
+def get_top_k(scores, mask: np.ndarray, k: int):
+    """
+    Vectorized top-k over a block of users
+    :param scores: users x items block of scores, dense or sparse
+    :param mask: users x items boolean block of candidate items
+    :param k: length of the recommendation lists
+    :return: (items, scores) users x k arrays sorted by decreasing score. Non-candidate items score -inf
+    """
+    if sp.issparse(scores):
+        scores = scores.toarray()
+    scores = np.where(mask, np.asarray(scores), -np.inf)
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64), np.empty((scores.shape[0], 0), dtype=scores.dtype)
+    partitioned = np.argpartition(scores, -k, axis=1)[:, -k:]
+    partitioned_scores = np.take_along_axis(scores, partitioned, axis=1)
+    ranking = np.argsort(-partitioned_scores, axis=1, kind='stable')
+    return np.take_along_axis(partitioned, ranking, axis=1), np.take_along_axis(partitioned_scores, ranking, axis=1)
@@ -29,15 +29,7 @@ class MostPop(RecMixin, BaseRecommenderModel):
         self.evaluate()
 
     def get_recommendations(self, top_k: int = 100):
-        predictions_top_k_val = {}
-        predictions_top_k_test = {}
-
-        recs_val, recs_test = self.process_protocol(top_k)
-
-        predictions_top_k_val.update(recs_val)
-        predictions_top_k_test.update(recs_test)
-
-        return predictions_top_k_val, predictions_top_k_test
+        return self.process_protocol(top_k)
 
     def get_single_recommendation(self, mask, k, *args):
         n_items = self._num_items
@@ -16,6 +16,7 @@ from elliot.recommender.base_recommender_model import init_charger
 from elliot.recommender.recommender_utils_mixin import RecMixin
 from elliot.recommender.visual_recommenders.ACF.ACF_model import ACFModel
 from elliot.recommender.visual_recommenders.ACF import pairwise_pipeline_sampler_acf as ppsa
+from elliot.utils.recommendations import merge_recommendations
 
 
 class ACF(RecMixin, BaseRecommenderModel):
@@ -116,12 +117,12 @@ class ACF(RecMixin, BaseRecommenderModel):
                     loss = 0
 
     def get_recommendations(self, k: int = 100):
-        predictions_top_k_test = {}
-        predictions_top_k_val = {}
+        predictions_top_k_test = []
+        predictions_top_k_val = []
         for user_id, batch in enumerate(self._next_eval_batch):
             user, user_pos, feat_pos = batch
             predictions = self._model.predict(user, user_pos, feat_pos)
             recs_val, recs_test = self.process_protocol(k, predictions, user_id, user_id + 1)
-            predictions_top_k_val.update(recs_val)
-            predictions_top_k_test.update(recs_test)
-        return predictions_top_k_val, predictions_top_k_test
+            predictions_top_k_val.append(recs_val)
+            predictions_top_k_test.append(recs_test)
+        return merge_recommendations(predictions_top_k_val), merge_recommendations(predictions_top_k_test)
@@ -16,6 +16,7 @@ from elliot.recommender import BaseRecommenderModel
 from elliot.recommender.base_recommender_model import init_charger
 from elliot.recommender.recommender_utils_mixin import RecMixin
 from elliot.recommender.visual_recommenders.DVBPR.DVBPR_model import DVBPRModel
+from elliot.utils.recommendations import merge_recommendations
 
 
 class DVBPR(RecMixin, BaseRecommenderModel):
@@ -116,8 +117,8 @@ class DVBPR(RecMixin, BaseRecommenderModel):
                     loss = 0
 
     def get_recommendations(self, k: int = 100):
-        predictions_top_k_test = {}
-        predictions_top_k_val = {}
+        predictions_top_k_test = []
+        predictions_top_k_val = []
 
         # first, calculate all image features according to current model weights
         features = np.zeros(shape=(len(self._item_indices), self._factors))
@@ -139,6 +140,6 @@ class DVBPR(RecMixin, BaseRecommenderModel):
                                                                dtype=tf.float32))
                 predictions[:(offset_stop - offset), item_index * self._batch_eval:item_offset_stop] = p
             recs_val, recs_test = self.process_protocol(k, predictions, offset, offset_stop)
-            predictions_top_k_val.update(recs_val)
-            predictions_top_k_test.update(recs_test)
-        return predictions_top_k_val, predictions_top_k_test
+            predictions_top_k_val.append(recs_val)
+            predictions_top_k_test.append(recs_test)
+        return merge_recommendations(predictions_top_k_val), merge_recommendations(predictions_top_k_test)
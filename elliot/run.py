@@ -7,6 +7,7 @@ __version__ = '0.3.1'
 __author__ = 'Vito Walter Anelli, Claudio Pomo'
 __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 
+import copy
 import importlib
 import sys
 import os
@@ -19,6 +20,7 @@ import elliot.hyperoptimization as ho
 from elliot.namespace.namespace_model_builder import NameSpaceBuilder
 from elliot.result_handler.result_handler import ResultHandler, HyperParameterStudy, StatTest
 from elliot.utils import logging as logging_project
+from elliot.utils.scheduler import JobScheduler
 
 _rstate = np.random.RandomState(42)
 here = path.abspath(path.dirname(__file__))
@@ -60,33 +62,40 @@ def run_experiment(config_path: str = ''):
     dataloader_class = getattr(importlib.import_module("elliot.dataset"), base.base_namespace.data_config.dataloader)
     dataloader = dataloader_class(config=base.base_namespace)
     data_test_list = dataloader.generate_dataobjects()
-    for key, model_base in builder.models():
+    models = list(builder.models())
+    scheduler = getattr(base.base_namespace, "scheduler", None)
+    if getattr(scheduler, "shared_folder", None):
+        _share_datasets(data_test_list, scheduler.shared_folder, logger)
+    outcomes = _schedule_jobs(scheduler, base.base_namespace, models, data_test_list, logger) if scheduler else None
+    for model_index, (key, model_base) in enumerate(models):
         test_results = []
         test_trials = []
         for test_fold_index, data_test in enumerate(data_test_list):
             logging_project.prepare_logger(key, base.base_namespace.path_log_folder)
-            if key.startswith("external."):
-                spec = importlib.util.spec_from_file_location("external",
-                                                              path.relpath(base.base_namespace.external_models_path))
-                external = importlib.util.module_from_spec(spec)
-                sys.modules[spec.name] = external
-                spec.loader.exec_module(external)
-                model_class = getattr(importlib.import_module("external"), key.split(".", 1)[1])
-            else:
-                model_class = getattr(importlib.import_module("elliot.recommender"), key)
+            model_class = _get_model_class(key, base.base_namespace)
 
             model_placeholder = ho.ModelCoordinator(data_test, base.base_namespace, model_base, model_class,
                                                     test_fold_index)
             if isinstance(model_base, tuple):
                 logger.info(f"Tuning begun for {model_class.__name__}\\n")
                 trials = Trials()
-                fmin(model_placeholder.objective,
-                     space=model_base[1],
-                     algo=model_base[3],
-                     trials=trials,
-                     verbose=False,
-                     rstate=_rstate,
-                     max_evals=model_base[2])
+                hyper_workers = getattr(model_base[0].meta, "hyper_workers", 1)
+                if outcomes is not None:
+                    trials = outcomes[(model_index, test_fold_index, None)]
+                elif hyper_workers > 1:
+                    ho.ParallelTrialExecutor(model_placeholder, hyper_workers).fmin(space=model_base[1],
+                                                                                  algo=model_base[3],
+                                                                                  trials=trials,
+                                                                                  rstate=_rstate,
+                                                                                  max_evals=model_base[2])
+                else:
+                    fmin(model_placeholder.objective,
+                         space=model_base[1],
+                         algo=model_base[3],
+                         trials=trials,
+                         verbose=False,
+                         rstate=_rstate,
+                         max_evals=model_base[2])
 
                 # argmin relativo alla combinazione migliore di iperparametri
                 min_val = np.argmin([i["result"]["loss"] for i in trials._trials])
@@ -102,7 +111,11 @@ def run_experiment(config_path: str = ''):
                 logger.info(f"Tuning ended for {model_class.__name__}")
             else:
                 logger.info(f"Training begun for {model_class.__name__}\\n")
-                single = model_placeholder.single()
+                if outcomes is not None:
+                    single = model_placeholder.aggregate_folds([outcomes[(model_index, test_fold_index, trainval_index)]
+                                                                for trainval_index in range(len(data_test))])
+                else:
+                    single = model_placeholder.single()
 
                 ############################################
                 best_model_loss = single["loss"]
@@ -149,6 +162,77 @@ def run_experiment(config_path: str = ''):
     logger.info("End experiment")
 
 
+def _get_model_class(key, base):
+    if key.startswith("external."):
+        spec = importlib.util.spec_from_file_location("external", path.relpath(base.external_models_path))
+        external = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = external
+        spec.loader.exec_module(external)
+        return getattr(importlib.import_module("external"), key.split(".", 1)[1])
+    else:
+        return getattr(importlib.import_module("elliot.recommender"), key)
+
+
+def _share_datasets(data_test_list, folder, logger):
+    """
+    Export the DataSets to memory-mapped files, so that worker processes attach to them instead of
+    receiving a copy of their arrays
+    """
+    for test_fold_index, data_test in enumerate(data_test_list):
+        for trainval_index, data in enumerate(data_test):
+            if hasattr(data, "share"):
+                data.share(os.sep.join([folder, f"dataset_{test_fold_index}_{trainval_index}"]))
+    logger.info(f"Datasets shared in {folder}")
+
+
+def _schedule_jobs(scheduler, base, models, data_test_list, logger):
+    """
+    Run the independent jobs of the experiment in a local process pool: a hyperparameter search per
+    (model, test fold), a training per (model, test fold, train-validation fold) otherwise.
+    Each search receives the state _rstate would have in the serial run, so that results do not change.
+    :return: outcomes of the jobs, keyed by (model index, test fold index, train-validation fold index)
+    """
+    jobs = []
+    rstate = copy.deepcopy(_rstate)
+    for model_index, (key, model_base) in enumerate(models):
+        for test_fold_index, data_test in enumerate(data_test_list):
+            if isinstance(model_base, tuple):
+                jobs.append(((model_index, test_fold_index, None), copy.deepcopy(rstate)))
+                # -- fmin draws a seed from rstate for every trial
+                rstate.randint(2 ** 31 - 1, size=model_base[2])
+            else:
+                jobs.extend(((model_index, test_fold_index, trainval_index), None)
+                            for trainval_index in range(len(data_test)))
+    _rstate.set_state(rstate.get_state())
+
+    job_scheduler = JobScheduler(getattr(scheduler, "workers", 1), getattr(scheduler, "memory_budget", 0))
+    logger.info(f"Scheduling {len(jobs)} jobs on {job_scheduler.workers} workers")
+    outcomes = job_scheduler.map(_run_job, jobs, shared=(base, models, data_test_list))
+    return {job_key: outcome for (job_key, _), outcome in zip(jobs, outcomes)}
+
+
+def _run_job(shared, job):
+    base, models, data_test_list = shared
+    (model_index, test_fold_index, trainval_index), rstate = job
+    key, model_base = models[model_index]
+    logging_project.prepare_logger(key, base.path_log_folder)
+    model_class = _get_model_class(key, base)
+    model_placeholder = ho.ModelCoordinator(data_test_list[test_fold_index], base, model_base, model_class,
+                                            test_fold_index)
+    if isinstance(model_base, tuple):
+        # -- searches run serially inside a job: hyper_workers would nest process pools
+        trials = Trials()
+        fmin(model_placeholder.objective,
+             space=model_base[1],
+             algo=model_base[3],
+             trials=trials,
+             verbose=False,
+             rstate=rstate,
+             max_evals=model_base[2])
+        return trials
+    return model_placeholder.single_fold(trainval_index)
+
+
 def _reset_verbose_option(model):
     if isinstance(model, tuple):
         model[0].meta.verbose = False
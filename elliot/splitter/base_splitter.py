@@ -7,6 +7,8 @@ import os
 
 from types import SimpleNamespace
 
+from elliot.utils.read import formats
+from elliot.utils.write import write_interactions
 from elliot.utils.folder import create_folder_by_index
 
 """        
@@ -30,6 +32,7 @@ data_config:
 splitting:
     save_on_disk: True
     save_path: "path"
+    save_format: tsv|parquet|feather|npz
     test_splitting:
         strategy: fixed_timestamp|temporal_hold_out|random_subsampling|random_cross_validation
         timestamp: best|1609786061
@@ -67,6 +70,10 @@ class Splitter:
         self.splitting_ns = splitting_ns
         self.save_on_disk = False
         self.save_folder = None
+        self.save_format = getattr(splitting_ns, "save_format", "tsv")
+        if self.save_format not in formats:
+            raise Exception(f"Splitting save format {self.save_format} not recognized. "
+                            f"Allowed values are: {', '.join(formats)}")
 
     def process_splitting(self):
         np.random.seed(self.random_seed)
@@ -110,16 +117,17 @@ class Splitter:
         return tuple_list
 
     def store_splitting(self, tuple_list):
+        extension = formats[self.save_format]
         for i, (train_val, test) in enumerate(tuple_list):
             actual_test_folder = create_folder_by_index(self.save_folder, str(i))
-            test.to_csv(os.path.abspath(os.sep.join([actual_test_folder, "test.tsv"])), sep='\t', index=False, header=False)
+            write_interactions(test, os.path.abspath(os.sep.join([actual_test_folder, "test" + extension])))
             if isinstance(train_val, list):
                 for j, (train, val) in enumerate(train_val):
                     actual_val_folder = create_folder_by_index(actual_test_folder, str(j))
-                    val.to_csv(os.path.abspath(os.sep.join([actual_val_folder, "val.tsv"])), sep='\t', index=False, header=False)
-                    train.to_csv(os.path.abspath(os.sep.join([actual_val_folder, "train.tsv"])), sep='\t', index=False, header=False)
+                    write_interactions(val, os.path.abspath(os.sep.join([actual_val_folder, "val" + extension])))
+                    write_interactions(train, os.path.abspath(os.sep.join([actual_val_folder, "train" + extension])))
             else:
-                train_val.to_csv(os.path.abspath(os.sep.join([actual_test_folder, "train.tsv"])), sep='\t', index=False, header=False)
+                write_interactions(train_val, os.path.abspath(os.sep.join([actual_test_folder, "train" + extension])))
 
     # def read_folder(self, folder_path):
     #     for root, dirs, files in os.walk(folder_path):
@@ -208,48 +216,61 @@ class Splitter:
         looper = infinite_looper(folds)
         return [next(looper) for _ in range(length)]
 
+    @staticmethod
+    def user_groups(data: pd.DataFrame) -> t.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Rows of every user in the order groupby(['userId']) visits them: users sorted, rows in data order
+        :return: row positions grouped by user, start and length of the block of every user
+        """
+        codes, _ = pd.factorize(data["userId"], sort=True)
+        order = np.argsort(codes, kind="stable")
+        order = order[codes[order] >= 0]
+        lengths = np.bincount(codes[order]) if len(order) else np.zeros(0, dtype=np.int64)
+        starts = np.cumsum(lengths) - lengths
+        return order, starts, lengths
+
+    def positions_in_group(self, data: pd.DataFrame) -> t.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        :return: row positions grouped by user, length of the user of every row, position of every row in its user
+        """
+        order, starts, lengths = self.user_groups(data)
+        return order, np.repeat(lengths, lengths), np.arange(len(order)) - np.repeat(starts, lengths)
+
+    @staticmethod
+    def split_by_flag(data: pd.DataFrame, test_flag: np.ndarray, train_flag: np.ndarray = None):
+        train_flag = ~test_flag if train_flag is None else train_flag
+        return data[test_flag].reset_index(drop=True), data[train_flag].reset_index(drop=True)
+
     def splitting_kfolds(self, data: pd.DataFrame, folds=5):
         tuple_list = []
-        user_groups = data.groupby(['userId'])
-        for name, group in user_groups:
-            data.loc[group.index, 'fold'] = self.fold_list_generator(len(group), folds)
-        data["fold"] = pd.to_numeric(data["fold"], downcast='integer')
+        order, _, positions = self.positions_in_group(data)
+        # -- rows without a user are in no fold
+        fold = np.full(len(data), -1)
+        fold[order] = positions % folds
         for i in range(folds):
-            test = data[data["fold"] == i].drop(columns=["fold"]).reset_index(drop=True)
-            train = data[data["fold"] != i].drop(columns=["fold"]).reset_index(drop=True)
+            test, train = self.split_by_flag(data, fold == i, (fold != i) & (fold >= 0))
             tuple_list.append((train, test))
         return tuple_list
 
     def splitting_temporal_holdout(self, d: pd.DataFrame, ratio=0.2):
         tuple_list = []
-        data = d.copy()
-        user_size = data.groupby(['userId'], as_index=True).size()
-        user_threshold = user_size.apply(lambda x: math.floor(x * (1 - ratio)))
-        data['rank_first'] = data.groupby(['userId'])['timestamp'].rank(method='first', ascending=True, axis=1)
-        data["test_flag"] = data.apply(
-            lambda x: x["rank_first"] > user_threshold.loc[x["userId"]], axis=1)
-        test = data[data["test_flag"] == True].drop(columns=["rank_first", "test_flag"]).reset_index(drop=True)
-        train = data[data["test_flag"] == False].drop(columns=["rank_first", "test_flag"]).reset_index(drop=True)
+        user_groups = d.groupby(['userId'])['timestamp']
+        rank_first = user_groups.rank(method='first', ascending=True).to_numpy()
+        user_threshold = np.floor(user_groups.transform('size').to_numpy() * (1 - ratio))
+        test, train = self.split_by_flag(d, rank_first > user_threshold)
         tuple_list.append((train, test))
         return tuple_list
 
     def splitting_temporal_leavenout(self, d: pd.DataFrame, n=1):
         tuple_list = []
-        data = d.copy()
-        data['rank_first'] = data.groupby(['userId'])['timestamp'].rank(method='first', ascending=False, axis=1)
-        data["test_flag"] = data.apply(
-            lambda x: x["rank_first"] <= n, axis=1)
-        test = data[data["test_flag"] == True].drop(columns=["rank_first", "test_flag"]).reset_index(drop=True)
-        train = data[data["test_flag"] == False].drop(columns=["rank_first", "test_flag"]).reset_index(drop=True)
+        rank_first = d.groupby(['userId'])['timestamp'].rank(method='first', ascending=False).to_numpy()
+        test, train = self.split_by_flag(d, rank_first <= n)
         tuple_list.append((train, test))
         return tuple_list
 
     def splitting_passed_timestamp(self, d: pd.DataFrame, timestamp=1):
         tuple_list = []
-        data = d.copy()
-        data["test_flag"] = data.apply(lambda x: x["timestamp"] >= timestamp, axis=1)
-        test = data[data["test_flag"] == True].drop(columns=["test_flag"]).reset_index(drop=True)
-        train = data[data["test_flag"] == False].drop(columns=["test_flag"]).reset_index(drop=True)
+        test, train = self.split_by_flag(d, (d["timestamp"] >= timestamp).to_numpy())
         tuple_list.append((train, test))
         return tuple_list
 
@@ -260,16 +281,28 @@ class Splitter:
         np.random.shuffle(list_)
         return list_
 
+    def shuffled_flags(self, data: pd.DataFrame, n_train: t.Callable[[np.ndarray], np.ndarray]):
+        """
+        Test flags of every user: n_train(lengths) zeros followed by ones, shuffled user by user.
+        Users are shuffled in groupby order with np.random.shuffle, which consumes the random stream
+        exactly as the legacy per-user lists did.
+        :return: test flags of the rows, -1 for rows without a user
+        """
+        order, starts, lengths = self.user_groups(data)
+        positions = np.arange(len(order)) - np.repeat(starts, lengths)
+        grouped = (positions >= np.repeat(n_train(lengths), lengths)).astype(np.int8)
+        shuffle = np.random.shuffle
+        for start, stop in zip(starts.tolist(), (starts + lengths).tolist()):
+            shuffle(grouped[start:stop])
+        flags = np.full(len(data), -1, dtype=np.int8)
+        flags[order] = grouped
+        return flags
+
     def splitting_randomsubsampling_kfolds(self, d: pd.DataFrame, folds=5, ratio=0.2):
         tuple_list = []
-        data = d.copy()
-        user_groups = data.groupby(['userId'])
         for i in range(folds):
-            for name, group in user_groups:
-                data.loc[group.index, 'test_flag'] = self.subsampling_list_generator(len(group), ratio)
-            data["test_flag"] = pd.to_numeric(data["test_flag"], downcast='integer')
-            test = data[data["test_flag"] == 1].drop(columns=["test_flag"]).reset_index(drop=True)
-            train = data[data["test_flag"] == 0].drop(columns=["test_flag"]).reset_index(drop=True)
+            test_flag = self.shuffled_flags(d, lambda lengths: np.floor(lengths * (1 - ratio)).astype(np.int64))
+            test, train = self.split_by_flag(d, test_flag == 1, test_flag == 0)
             tuple_list.append((train, test))
         return tuple_list
 
@@ -282,35 +315,39 @@ class Splitter:
 
     def splitting_randomsubsampling_kfolds_leavenout(self, d: pd.DataFrame, folds=5, n=1):
         tuple_list = []
-        data = d.copy()
-        user_groups = data.groupby(['userId'])
         for i in range(folds):
-            for name, group in user_groups:
-                data.loc[group.index, 'test_flag'] = self.subsampling_leavenout_list_generator(len(group), n)
-            data["test_flag"] = pd.to_numeric(data["test_flag"], downcast='integer')
-            test = data[data["test_flag"] == 1].drop(columns=["test_flag"]).reset_index(drop=True)
-            train = data[data["test_flag"] == 0].drop(columns=["test_flag"]).reset_index(drop=True)
+            test_flag = self.shuffled_flags(d, lambda lengths: lengths - n)
+            test, train = self.split_by_flag(d, test_flag == 1, test_flag == 0)
             tuple_list.append((train, test))
         return tuple_list
 
     def splitting_best_timestamp(self, d: pd.DataFrame, min_below=1, min_over=1):
-        data = d.copy()
-        unique_timestamps = data["timestamp"].unique()
-        user_groups = data.groupby(['userId'])
-        ts_dict = {}
-        nuniques = len(unique_timestamps)
-        i = 0
-        for ts in unique_timestamps:
-            print(nuniques - i)
-            i += 1
-            ts_dict[ts] = 0
-            for name, group in user_groups:
-                below = group[group["timestamp"] < ts]["timestamp"].count()
-                over = len(group) - below
-                if (below >= min_below) and (over >= min_over):
-                    ts_dict[ts] += 1
-        max_val = max(ts_dict.values())
-        best_tie = [ts for ts,v in ts_dict.items() if v == max_val]
-        max_ts = max(best_tie)
+        """
+        Timestamp that leaves the most users with at least min_below interactions before it and min_over
+        from it on, the latest one among ties.
+        A user qualifies for the timestamps ts in (t_(min_below), t_(L - min_over + 1)] of its sorted
+        timestamps t_(1) <= ... <= t_(L): the counts of all the unique timestamps come from one sweep over
+        the sorted interval bounds.
+        """
+        order, starts, lengths = self.user_groups(d)
+        timestamps = d["timestamp"].to_numpy()
+        grouped = timestamps[order]
+        # -- timestamps sorted within every user block
+        grouped = grouped[np.lexsort((grouped, np.repeat(np.arange(len(lengths)), lengths)))]
+
+        valid = lengths - min_over >= min_below
+        starts, lengths = starts[valid], lengths[valid]
+        lower = grouped[starts + min_below - 1] if min_below > 0 else None
+        upper = grouped[starts + lengths - min_over] if min_over > 0 else None
+        if lower is not None and upper is not None:
+            non_empty = lower < upper
+            lower, upper = lower[non_empty], upper[non_empty]
+
+        unique_timestamps = np.unique(timestamps)
+        counts = np.searchsorted(np.sort(lower), unique_timestamps, side='left') if lower is not None \
+            else np.full(len(unique_timestamps), len(upper) if upper is not None else int(valid.sum()))
+        if upper is not None:
+            counts = counts - np.searchsorted(np.sort(upper), unique_timestamps, side='left')
+        max_ts = unique_timestamps[counts == counts.max()].max()
         print(f"Best Timestamp: {max_ts}")
         return self.splitting_passed_timestamp(d, max_ts)
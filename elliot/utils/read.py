@@ -122,3 +122,23 @@ def find_checkpoint(dir, restore_epochs, epochs, rec, best=0):
             if 'weights-{0}-'.format(restore_epochs) in file:
                 return dir + file.split('.')[0]
     return ''
+
+
+# file extension of every format, any other extension is read as tab separated text
+formats = {"tsv": ".tsv", "parquet": ".parquet", "feather": ".feather", "npz": ".npz"}
+
+
+def interactions_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    return next((name for name, ext in formats.items() if ext == extension), "tsv")
+
+
+def find_interactions(folder: str, name: str) -> str:
+    """
+    Path of the interaction file name (e.g. train) of a folder, in whichever format it was stored
+    """
+    for file_format in ["npz", "parquet", "feather", "tsv"]:
+        path = os.sep.join([folder, name + formats[file_format]])
+        if os.path.exists(path):
+            return path
+    return os.sep.join([folder, name + formats["tsv"]])
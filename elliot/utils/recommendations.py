@@ -0,0 +1,192 @@
+"""
+Module description:
+
+"""
+
+__version__ = '0.3.1'
+__author__ = 'Vito Walter Anelli, Claudio Pomo'
+__email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
+
+import typing as t
+from collections.abc import Mapping
+
+import numpy as np
+
+
+class TopKRecommendations(Mapping):
+    """
+    Columnar container of top-k recommendation lists.
+
+    users holds the private (internal) user ids, item_ids the users x k private item ids and scores the
+    users x k predicted scores, both sorted by decreasing score. Lists shorter than k are padded with
+    item -1 and score -inf.
+    The container is also a read-only {public_user: [(public_item, score), ...]} mapping, whose lists
+    are built on access, so that the metrics that iterate over the legacy dictionary keep working.
+    """
+
+    def __init__(self, users, items, scores, private_users, private_items):
+        """
+        :param users: private ids of the recommended users
+        :param items: users x k matrix of private item ids, -1 padded
+        :param scores: users x k matrix of scores, -inf padded
+        :param private_users: {private user id: public user id}
+        :param private_items: {private item id: public item id}
+        """
+        self._users = np.asarray(users, dtype=np.int32)
+        self._items = np.asarray(items, dtype=np.int32)
+        self._scores = np.asarray(scores, dtype=np.float32).reshape(self._items.shape)
+        self._private_users = private_users
+        self._private_items = private_items
+        self._rows = None
+
+    @classmethod
+    def from_top_k(cls, data, offset, items, scores):
+        """
+        Container of a block of consecutive users ranked by get_top_k.
+        Items scored -inf are not candidates and become padding
+        :param data: dataset object
+        :param offset: private id of the first user of the block
+        :param items: users x k matrix of private item ids
+        :param scores: users x k matrix of scores
+        """
+        items = np.array(items, dtype=np.int32)
+        scores = np.asarray(scores, dtype=np.float32)
+        items[scores == -np.inf] = -1
+        return cls(np.arange(offset, offset + len(items)), items, scores, data.private_users, data.private_items)
+
+    @classmethod
+    def from_dict(cls, recommendations, data):
+        """
+        Container of legacy {public_user: [(public_item, score), ...]} recommendations.
+        Users and items unknown to the dataset are dropped
+        :param recommendations: recommendation dictionary
+        :param data: dataset object
+        """
+        if isinstance(recommendations, cls):
+            return recommendations
+        users = [u for u in recommendations.keys() if u in data.public_users]
+        lists = [[(data.public_items[i], v) for i, v in recommendations[u] if i in data.public_items] for u in users]
+        k = max(map(len, lists), default=0)
+        items = np.full((len(users), k), -1, dtype=np.int32)
+        scores = np.full((len(users), k), -np.inf, dtype=np.float32)
+        for row, user_list in enumerate(lists):
+            if user_list:
+                user_items, user_scores = zip(*user_list)
+                items[row, :len(user_list)] = user_items
+                scores[row, :len(user_list)] = user_scores
+        return cls([data.public_users[u] for u in users], items, scores, data.private_users, data.private_items)
+
+    @classmethod
+    def concatenate(cls, blocks):
+        """
+        Stack the recommendations of disjoint sets of users, padding the lists to the longest k
+        """
+        k = max(b.k for b in blocks)
+        padded = [(np.pad(b.item_ids, ((0, 0), (0, k - b.k)), constant_values=-1),
+                   np.pad(b.scores, ((0, 0), (0, k - b.k)), constant_values=-np.inf)) for b in blocks]
+        return cls(np.concatenate([b.users for b in blocks]),
+                   np.concatenate([i for i, _ in padded]),
+                   np.concatenate([s for _, s in padded]),
+                   blocks[0].private_users, blocks[0].private_items)
+
+    @property
+    def users(self) -> np.ndarray:
+        return self._users
+
+    @property
+    def item_ids(self) -> np.ndarray:
+        return self._items
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self._scores
+
+    @property
+    def private_users(self) -> t.Dict:
+        return self._private_users
+
+    @property
+    def private_items(self) -> t.Dict:
+        return self._private_items
+
+    @property
+    def k(self) -> int:
+        return self._items.shape[1]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Number of recommended (non padding) items per user"""
+        return (self._items >= 0).sum(axis=1)
+
+    def top(self, k: int) -> "TopKRecommendations":
+        """The first k positions of every list, without copying"""
+        return TopKRecommendations(self._users, self._items[:, :k], self._scores[:, :k],
+                                   self._private_users, self._private_items)
+
+    def select_users(self, keep) -> "TopKRecommendations":
+        """
+        Subset of the users
+        :param keep: boolean array aligned with users, or array of row positions
+        """
+        return TopKRecommendations(self._users[keep], self._items[keep], self._scores[keep],
+                                   self._private_users, self._private_items)
+
+    def select(self, keep) -> "TopKRecommendations":
+        """
+        Drop single recommended items, keeping the order of the remaining ones
+        :param keep: boolean users x k matrix of the entries to keep
+        """
+        keep = np.asarray(keep, dtype=bool) & (self._items >= 0)
+        order = np.argsort(~keep, axis=1, kind='stable')
+        kept = np.take_along_axis(keep, order, axis=1)
+        items = np.where(kept, np.take_along_axis(self._items, order, axis=1), -1)
+        scores = np.where(kept, np.take_along_axis(self._scores, order, axis=1), -np.inf)
+        return TopKRecommendations(self._users, items, scores, self._private_users, self._private_items)
+
+    def gather(self, item_values: np.ndarray, fill=0) -> np.ndarray:
+        """
+        users x k matrix of the values of the recommended items, fill on the padding
+        :param item_values: array indexed by private item ids, e.g. popularity counts or a boolean mask
+        """
+        return np.where(self._items >= 0, item_values[np.maximum(self._items, 0)], fill)
+
+    def user_values(self, values) -> t.Dict:
+        """{public user: value} of per user values aligned with users"""
+        return dict(zip(map(self._private_users.get, self._users.tolist()), np.asarray(values).tolist()))
+
+    def user_recommendations(self, row: int) -> t.List[t.Tuple]:
+        """Legacy [(public_item, score), ...] list of the user in position row"""
+        length = np.count_nonzero(self._items[row] >= 0)
+        return list(zip(map(self._private_items.get, self._items[row, :length].tolist()),
+                        self._scores[row, :length].tolist()))
+
+    def to_dict(self) -> t.Dict:
+        return {self._private_users[u]: self.user_recommendations(row) for row, u in enumerate(self._users.tolist())}
+
+    def __getitem__(self, user):
+        if self._rows is None:
+            self._rows = {self._private_users[u]: row for row, u in enumerate(self._users.tolist())}
+        return self.user_recommendations(self._rows[user])
+
+    def __iter__(self):
+        return map(self._private_users.get, self._users.tolist())
+
+    def __len__(self):
+        return len(self._users)
+
+    def items(self):
+        return zip(iter(self), map(self.user_recommendations, range(len(self._users))))
+
+
+def merge_recommendations(blocks):
+    """
+    Merge the recommendations computed on blocks of users.
+    Columnar blocks are stacked, legacy dictionaries are merged into a dictionary
+    """
+    blocks = [b for b in blocks if len(b)]
+    if blocks and all(isinstance(b, TopKRecommendations) for b in blocks):
+        return TopKRecommendations.concatenate(blocks)
+    merged = {}
+    for b in blocks:
+        merged.update(b)
+    return merged
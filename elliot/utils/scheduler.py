@@ -0,0 +1,78 @@
+"""
+Module description:
+
+"""
+
+__version__ = '0.3.1'
+__author__ = 'Vito Walter Anelli, Claudio Pomo'
+__email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# shared state of the worker processes, set once by the pool initializer
+_shared = None
+
+
+def _init_worker(shared, memory_budget):
+    global _shared
+    _shared = shared
+    if memory_budget:
+        try:
+            import resource
+            budget = int(memory_budget) * 1024 ** 2
+            resource.setrlimit(resource.RLIMIT_AS, (budget, budget))
+        except (ImportError, ValueError, OSError):
+            pass
+
+
+def _run(fn, job):
+    return fn(_shared, job)
+
+
+def available_memory() -> int:
+    """Physical memory of the machine in MB, 0 if it cannot be read"""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // 1024 ** 2
+    except (ValueError, OSError, AttributeError):
+        return 0
+
+
+class JobScheduler(object):
+    """
+    Local process pool running independent experiment jobs.
+
+    The shared state (e.g. the DataSets) reaches every worker once through the pool initializer.
+    With a memory_budget (MB), each worker address space is capped to it and the number of workers is
+    reduced so that the concurrent jobs fit in the physical memory.
+    Results are returned in the order of the jobs, whatever the completion order.
+    """
+
+    def __init__(self, workers: int, memory_budget: int = 0):
+        self._memory_budget = memory_budget
+        memory = available_memory()
+        if memory_budget and memory:
+            workers = min(workers, max(1, memory // int(memory_budget)))
+        self._workers = max(1, int(workers))
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def map(self, fn, jobs, shared=None, callback=None):
+        """
+        Run fn(shared, job) for every job
+        :param fn: module level function, so that it can be sent to the workers
+        :param jobs: list of picklable job descriptions
+        :param shared: state made available to every worker
+        :param callback: function (job index, result) called in the main process as the jobs complete
+        :return: list of results in job order
+        """
+        with ProcessPoolExecutor(max_workers=self._workers, initializer=_init_worker,
+                                 initargs=(shared, self._memory_budget)) as pool:
+            futures = [pool.submit(_run, fn, job) for job in jobs]
+            if callback is not None:
+                indices = {future: index for index, future in enumerate(futures)}
+                for future in as_completed(futures):
+                    callback(indices[future], future.result())
+            return [future.result() for future in futures]
@@ -8,8 +8,12 @@ __author__ = 'Vito Walter Anelli, Claudio Pomo'
 __email__ = 'vitowalter.anelli@poliba.it, claudio.pomo@poliba.it'
 
 import numpy as np
+import pandas as pd
 import pickle
 
+from elliot.utils.read import interactions_format
+from elliot.utils.recommendations import TopKRecommendations
+
 
 def save_obj(obj, name):
     """
@@ -35,10 +39,37 @@ def save_np(npy, filename):
 def store_recommendation(recommendations, path=""):
     """
     Store recommendation list (top-k)
+    :param recommendations: TopKRecommendations or {user: [(item, score), ...]}
+    :param path: output tsv file
     :return:
     """
 
+    if isinstance(recommendations, TopKRecommendations):
+        rows, positions = np.nonzero(recommendations.item_ids >= 0)
+        users = pd.Series(recommendations.users[rows]).map(recommendations.private_users)
+        items = pd.Series(recommendations.item_ids[rows, positions]).map(recommendations.private_items)
+        scores = recommendations.scores[rows, positions]
+        pd.DataFrame({"userId": users, "itemId": items, "prediction": scores}).to_csv(path, sep='\t', header=False,
+                                                                                    index=False)
+        return
+
     with open(path, 'w') as out:
         for u, recs in recommendations.items():
             for i, value in recs:
                 out.write(str(u) + '\t' + str(i) + '\t' + str(value) + '\n')
+
+
+def write_interactions(data: pd.DataFrame, path: str):
+    """
+    Store interactions in the format of the extension of path: tsv (no header), parquet, feather or npz
+    """
+    file_format = interactions_format(path)
+    if file_format == "parquet":
+        data.to_parquet(path, index=False)
+    elif file_format == "feather":
+        data.reset_index(drop=True).to_feather(path)
+    elif file_format == "npz":
+        with open(path, "wb") as file:
+            np.savez(file, **{str(column): data[column].to_numpy() for column in data.columns})
+    else:
+        data.to_csv(path, sep='\t', index=False, header=False)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+# -- the elliot.recommender package imports the TensorFlow models
+pytest.importorskip("tensorflow")
+
+from elliot.recommender.latent_factor_models.als_solver import ALSSolver
+
+
+def _problem(seed=0, n_rows=50, n_columns=40, n_factors=4):
+    rng = np.random.default_rng(seed)
+    interactions = sp.csr_matrix((rng.random((n_rows, n_columns)) < 0.2).astype(np.float64))
+    C = interactions.copy()
+    C.data = 1 + 10 * rng.random(C.nnz)
+    # -- a row without interactions is solved too
+    C = sp.csr_matrix(C.multiply(np.arange(n_rows)[:, None] != 3))
+    return C, rng.normal(size=(n_columns, n_factors)), rng.normal(size=(n_rows, n_factors))
+
+
+def _row_by_row(C, fixed, reg):
+    """Legacy per row solution of the implicit feedback normal equations"""
+    dense = C.toarray()
+    solution = np.zeros((C.shape[0], fixed.shape[1]))
+    for u in range(C.shape[0]):
+        C_u = np.where(dense[u] > 0, dense[u], 1)
+        p_u = (dense[u] > 0).astype(float)
+        A = fixed.T.dot(C_u[:, None] * fixed) + reg * np.eye(fixed.shape[1])
+        solution[u] = np.linalg.solve(A, fixed.T.dot(C_u * p_u))
+    return solution
+
+
+def test_exact_solver_matches_the_per_row_solution():
+    C, fixed, factors = _problem()
+    ALSSolver(0.1, "exact", workers=3).solve(C, fixed, factors)
+    np.testing.assert_allclose(factors, _row_by_row(C, fixed, 0.1), rtol=1e-8, atol=1e-10)
+
+
+def test_conjugate_gradient_converges_to_the_exact_solution():
+    C, fixed, factors = _problem(1)
+    exact = factors.copy()
+    ALSSolver(0.1, "exact").solve(C, fixed, exact)
+    # -- cg is exact after as many steps as factors, up to rounding
+    ALSSolver(0.1, "cg", cg_steps=fixed.shape[1]).solve(C, fixed, factors)
+    np.testing.assert_allclose(factors, exact, rtol=1e-6, atol=1e-8)
+
+
+def test_a_few_cg_steps_approach_the_exact_solution():
+    C, fixed, start = _problem(2)
+    exact = start.copy()
+    ALSSolver(0.1, "exact").solve(C, fixed, exact)
+    one, two = start.copy(), start.copy()
+    ALSSolver(0.1, "cg", cg_steps=1).solve(C, fixed, one)
+    ALSSolver(0.1, "cg", cg_steps=2).solve(C, fixed, two)
+    assert np.linalg.norm(two - exact) < np.linalg.norm(one - exact) < np.linalg.norm(start - exact)
+
+
+def test_subset_of_rows_and_unknown_solver():
+    C, fixed, factors = _problem(3)
+    before = factors.copy()
+    ALSSolver(0.1).solve(C, fixed, factors, rows=np.array([0, 5]))
+    np.testing.assert_array_equal(factors[1:5], before[1:5])
+    np.testing.assert_allclose(factors[[0, 5]], _row_by_row(C, fixed, 0.1)[[0, 5]], rtol=1e-8, atol=1e-10)
+    with pytest.raises(ValueError):
+        ALSSolver(0.1, "lu")
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+# -- the elliot.recommender package imports the TensorFlow models
+pytest.importorskip("tensorflow")
+
+from sklearn.metrics import pairwise_distances
+from sklearn.metrics.pairwise import cosine_similarity
+
+from elliot.recommender.knn.blocked_similarity import BlockedSimilarity
+
+
+def _legacy_neighbourhoods(similarity: np.ndarray, k: int) -> sp.csr_matrix:
+    """Per column selection of the legacy ItemKNN similarity"""
+    data, rows, indptr = [], [], []
+    for column in range(similarity.shape[1]):
+        indptr.append(len(data))
+        column_data = similarity[:, column]
+        non_zero = column_data != 0
+        top = np.argsort(column_data[non_zero])[-k:]
+        data.extend(column_data[non_zero][top])
+        rows.extend(np.arange(len(column_data))[non_zero][top])
+    indptr.append(len(data))
+    return sp.csc_matrix((data, rows, indptr), shape=similarity.shape, dtype=np.float32).tocsr()
+
+
+def _items(seed=0, n_users=40, n_items=30):
+    rng = np.random.default_rng(seed)
+    # -- binary interactions: many equal similarities, i.e. ties at the top-k threshold
+    return sp.csr_matrix((rng.random((n_users, n_items)) < 0.15).astype(np.float32)).T.tocsr()
+
+
+@pytest.mark.parametrize("k", [1, 5, 29, 40])
+def test_cosine_matches_the_legacy_selection(k):
+    X = _items()
+    expected = _legacy_neighbourhoods(cosine_similarity(X), k)
+    computed = BlockedSimilarity(X, "cosine", k, workers=3, block_size=7).compute()
+    assert (abs(computed - expected) > 1e-6).nnz == 0
+
+
+def test_dot_and_distance_similarities():
+    X = _items(1)
+    for similarity, dense in [("dot", (X @ X.T).toarray()), ("l1", 1 / (1 + pairwise_distances(X, metric="l1")))]:
+        expected = _legacy_neighbourhoods(dense, 4)
+        computed = BlockedSimilarity(X, similarity, 4, workers=2, block_size=5).compute()
+        assert (abs(computed - expected) > 1e-6).nnz == 0
+
+
+def test_unknown_similarity():
+    with pytest.raises(ValueError):
+        BlockedSimilarity(_items(), "unknown", 5)
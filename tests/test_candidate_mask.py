@@ -0,0 +1,49 @@
+import numpy as np
+import scipy.sparse as sp
+
+from elliot.dataset.candidate_mask import CandidateMask
+
+
+def _matrix():
+    dense = np.array([[1, 0, 0, 1],
+                      [0, 0, 0, 0],
+                      [1, 1, 1, 1]], dtype=bool)
+    return dense, sp.csr_matrix(dense)
+
+
+def test_stored_cells_are_candidates():
+    dense, matrix = _matrix()
+    mask = CandidateMask(matrix)
+    assert mask.shape == dense.shape
+    np.testing.assert_array_equal(np.asarray(mask), dense)
+    np.testing.assert_array_equal(mask[0:2], dense[0:2])
+    np.testing.assert_array_equal(mask[2], dense[2])
+    assert mask[0, 3] and not mask[0, 1]
+    np.testing.assert_array_equal(mask.user_candidates(0), [0, 3])
+
+
+def test_complement_mask():
+    dense, matrix = _matrix()
+    mask = CandidateMask(matrix, complement=True)
+    np.testing.assert_array_equal(np.asarray(mask), ~dense)
+    np.testing.assert_array_equal(mask[1:3], ~dense[1:3])
+    np.testing.assert_array_equal(mask[-1], ~dense[-1])
+    assert mask[0, 1] and not mask[0, 0]
+    np.testing.assert_array_equal(mask.user_candidates(0), [1, 2])
+    np.testing.assert_array_equal(mask.count_nonzero(axis=1), (~dense).sum(axis=1))
+    assert mask.count_nonzero() == (~dense).sum()
+
+
+def test_pairwise_check_and_fancy_rows():
+    dense, matrix = _matrix()
+    mask = CandidateMask(matrix, complement=True)
+    users, items = np.array([0, 0, 1, 2]), np.array([0, 1, 2, 3])
+    np.testing.assert_array_equal(mask.are_candidates(users, items), ~dense[users, items])
+    np.testing.assert_array_equal(mask[np.array([2, 0])], ~dense[[2, 0]])
+    assert len(mask.are_candidates(np.zeros(0, int), np.zeros(0, int))) == 0
+
+
+def test_explicit_zeros_are_not_stored():
+    matrix = sp.csr_matrix((np.array([1, 0], dtype=float), (np.array([0, 0]), np.array([1, 2]))), shape=(1, 3))
+    mask = CandidateMask(matrix)
+    np.testing.assert_array_equal(mask[0], [False, True, False])
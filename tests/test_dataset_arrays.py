@@ -0,0 +1,43 @@
+import pickle
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from elliot.dataset.dataset import DataSet
+
+
+def _frame(n, seed, items):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"userId": rng.integers(0, 40, n), "itemId": rng.choice(items, n),
+                         "rating": rng.integers(1, 6, n).astype(np.float32)}).drop_duplicates(["userId", "itemId"])
+
+
+def _dataset():
+    items = np.array([f"i{i}" for i in range(80)], dtype=object)
+    config = SimpleNamespace(config_test=True, align_side_with_train=False)
+    # -- the test and validation sets hold items unknown to the training set
+    return DataSet(config, (_frame(800, 0, items[:70]), _frame(150, 1, items), _frame(150, 2, items)), None)
+
+
+def _assert_same(rebuilt, dataset):
+    assert rebuilt.users == dataset.users and rebuilt.items == dataset.items
+    assert rebuilt.test_dict == dataset.test_dict
+    assert rebuilt.val_dict == dataset.val_dict
+    assert (rebuilt.sp_i_train_ratings != dataset.sp_i_train_ratings).nnz == 0
+    np.testing.assert_array_equal(np.asarray(rebuilt.allunrated_mask), np.asarray(dataset.allunrated_mask))
+
+
+def test_arrays_round_trip():
+    dataset = _dataset()
+    arrays = dataset.to_arrays()
+    assert len(arrays["test_indptr"]) == dataset.num_users + 1
+    _assert_same(DataSet.from_arrays(dataset.config, arrays, None), dataset)
+
+
+def test_shared_dataset_pickles_as_its_folder(tmp_path):
+    dataset = _dataset()
+    dataset.share(str(tmp_path / "shared"))
+    payload = pickle.dumps(dataset)
+    assert len(payload) < 2048
+    _assert_same(pickle.loads(payload), dataset)
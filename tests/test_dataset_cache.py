@@ -0,0 +1,67 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from elliot.dataset.dataset import DataSetLoader
+from elliot.dataset.dataset_cache import DataSetCache
+
+
+def _write(path, n, seed):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({"userId": rng.integers(0, 30, n), "itemId": rng.integers(0, 60, n),
+                  "rating": rng.integers(1, 6, n), "timestamp": rng.integers(0, 1000, n)}) \
+        .drop_duplicates(["userId", "itemId"]).to_csv(path, sep="\t", header=False, index=False)
+
+
+def _config(tmp_path, negative_file):
+    train, test = str(tmp_path / "train.tsv"), str(tmp_path / "test.tsv")
+    if not os.path.exists(train):
+        _write(train, 600, 0)
+        _write(test, 100, 1)
+    return SimpleNamespace(config_test=False, binarize=False, random_seed=42, align_side_with_train=False,
+                           splitting=None, prefiltering=None, top_k=10,
+                           path_output_rec_result=str(tmp_path / "results"),
+                           evaluation=SimpleNamespace(paired_ttest=False, wilcoxon_test=False),
+                           negative_sampling=SimpleNamespace(strategy="random", num_items=5, file_path=negative_file),
+                           data_config=SimpleNamespace(strategy="fixed", train_path=train, test_path=test,
+                                                       side_information=[], dataloader="DataSetLoader",
+                                                       cache=str(tmp_path / "cache")))
+
+
+def _load(config):
+    loader = DataSetLoader(config)
+    return loader, loader.generate_dataobjects()[0][0]
+
+
+def test_cache_miss_then_hit(tmp_path):
+    negative_file = str(tmp_path / "negatives.tsv")
+    config = _config(tmp_path, negative_file)
+    assert DataSetCache(config).load() is None
+
+    loader, built = _load(config)
+    assert loader._cached is None
+    assert DataSetCache(config).load() is not None
+    with open(negative_file) as file:
+        negatives = file.read()
+
+    os.remove(negative_file)
+    loader, cached = _load(_config(tmp_path, negative_file))
+    assert loader._cached is not None
+    assert cached.users == built.users and cached.items == built.items
+    assert cached.test_dict == built.test_dict
+    assert (cached.sp_i_train_ratings != built.sp_i_train_ratings).nnz == 0
+    np.testing.assert_array_equal(np.asarray(cached.test_mask), np.asarray(built.test_mask))
+    # -- the negatives file of the random strategy is written on a cache hit too
+    with open(negative_file) as file:
+        assert file.read() == negatives
+
+
+def test_configuration_changes_miss_the_cache(tmp_path):
+    config = _config(tmp_path, str(tmp_path / "negatives.tsv"))
+    _load(config)
+    changed = _config(tmp_path, str(tmp_path / "negatives.tsv"))
+    changed.negative_sampling.num_items = 7
+    assert DataSetCache(changed).folder != DataSetCache(config).folder
+    assert DataSetCache(changed).load() is None
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+# -- the elliot.recommender package imports the TensorFlow models
+pytest.importorskip("tensorflow")
+
+from elliot.recommender.autoencoders.EASE_R.ease_r import EASER
+
+
+def _ratings(seed=0, n_users=60, n_items=25):
+    rng = np.random.default_rng(seed)
+    interactions = rng.random((n_users, n_items)) < 0.3
+    return sp.csr_matrix(np.where(interactions, rng.integers(1, 6, (n_users, n_items)), 0).astype(np.float64))
+
+
+def _legacy_weights(X, l2_norm):
+    G = (X.T @ X).toarray()
+    G[np.diag_indices(G.shape[0])] = np.diff(X.tocsc().indptr) + l2_norm
+    P = np.linalg.inv(G)
+    B = P / (-np.diag(P))
+    B[np.diag_indices(G.shape[0])] = 0.0
+    return B
+
+
+def test_cholesky_on_explicit_ratings_falls_back_to_the_inverse():
+    X = _ratings()
+    # -- squared ratings on the off diagonal, popularity on the diagonal: not positive definite
+    G = (X.T @ X).toarray()
+    G[np.diag_indices(G.shape[0])] = np.diff(X.tocsc().indptr) + 1.
+    assert np.linalg.eigvalsh(G).min() < 0
+
+    B = EASER.compute_weights(X, 1., "cholesky")
+    np.testing.assert_allclose(B, _legacy_weights(X, 1.), rtol=1e-8, atol=1e-10)
+
+
+@pytest.mark.parametrize("solver", ["inverse", "cholesky"])
+def test_weights_match_the_legacy_computation(solver):
+    X = _ratings(1)
+    X.data[:] = 1
+    np.testing.assert_allclose(EASER.compute_weights(X, 10., solver), _legacy_weights(X, 10.), rtol=1e-8, atol=1e-10)
+
+
+def test_float32_precision():
+    X = _ratings(2)
+    B = EASER.compute_weights(X.astype(np.float32), 500., "cholesky")
+    assert B.dtype == np.float32
+    np.testing.assert_allclose(B, _legacy_weights(X, 500.), rtol=1e-3, atol=1e-5)
+
+
+def test_neighborhood_and_threshold_sparsify_the_weights():
+    X = _ratings(3)
+    dense = _legacy_weights(X, 100.)
+    B = EASER.compute_weights(X, 100., neighborhood=3)
+    assert sp.issparse(B)
+    assert (np.diff(B.tocsc().indptr) == 3).all()
+    for column in range(dense.shape[1]):
+        kept = np.sort(np.abs(B[:, column].toarray().ravel()))[-3:]
+        np.testing.assert_allclose(kept, np.sort(np.abs(dense[:, column]))[-3:])
+    thresholded = EASER.compute_weights(X, 100., threshold=1e-2)
+    assert np.abs(thresholded.data).min() >= 1e-2
+    assert thresholded.nnz == np.count_nonzero(np.abs(dense) >= 1e-2)
@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+
+from elliot.evaluation.evaluation_context import EvaluationContext
+from elliot.evaluation.metrics.fairness.reo.reo import REO
+from elliot.evaluation.metrics.fairness.rsp.rsp import RSP
+
+
+class _Relevance(object):
+    def __init__(self, test):
+        self._test = test
+
+    def get_user_rel(self, user):
+        return list(self._test.get(user, {}))
+
+
+def _fixture(tmp_path):
+    users, items = ["a", "b", "c"], [10, 11, 12, 13, 14]
+    train = {"a": {10: 1, 11: 1}, "b": {12: 1}, "c": {10: 1, 13: 1, 14: 1}}
+    # -- item 99 is a relevant test item unknown to the training set, 98 is only in the clustering file
+    test = {"a": {12: 1, 99: 1}, "b": {10: 1, 14: 1}, "c": {11: 1}}
+    data = SimpleNamespace(public_users={u: i for i, u in enumerate(users)},
+                           public_items={i: p for p, i in enumerate(items)},
+                           num_users=len(users), num_items=len(items), train_dict=train)
+    rows = [data.public_users[u] for u, r in train.items() for _ in r]
+    cols = [data.public_items[i] for r in train.values() for i in r]
+    data.sp_i_train = sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(users), len(items)))
+
+    path = tmp_path / "clusters.tsv"
+    path.write_text("10\t0\n11\t1\n12\t0\n13\t1\n14\t0\n99\t1\n98\t0\n")
+    recommendations = {"a": [(12, 3.), (13, 2.), (14, 1.)], "b": [(10, 3.), (11, 2.), (13, 1.)],
+                       "c": [(11, 3.), (12, 2.)]}
+    eval_objects = SimpleNamespace(cutoff=2, data=data, relevance=SimpleNamespace(binary_relevance=_Relevance(test)),
+                                   context=EvaluationContext(data))
+    return recommendations, eval_objects, str(path), train, test
+
+
+def _legacy_probabilities(path, recommendations, train, cutoff, relevant=None):
+    clustering = pd.read_csv(path, sep="\t", header=None, names=["id", "cluster"])
+    clustering = clustering.groupby("cluster")["id"].apply(set).to_dict()
+    num, den = np.zeros(len(clustering)), np.zeros(len(clustering))
+    for u, u_r in recommendations.items():
+        if relevant is not None and not relevant.get(u):
+            continue
+        recommended = set(i for i, _ in u_r[:cutoff] if relevant is None or i in relevant[u])
+        for c, items in clustering.items():
+            num[c] += len(recommended & items)
+            den[c] += len((items & set(relevant[u])) - set(train[u]) if relevant is not None else items - set(train[u]))
+    return num / den
+
+
+@pytest.mark.parametrize("metric", [REO, RSP])
+def test_fairness_metrics_match_the_legacy_clustering(tmp_path, metric):
+    recommendations, eval_objects, path, train, test = _fixture(tmp_path)
+    values = metric(recommendations, None, None, eval_objects,
+                    {"clustering_file": path, "clustering_name": "Pop"}).get()
+    expected = _legacy_probabilities(path, recommendations, train, 2, test if metric is REO else None)
+    assert np.allclose([v.eval() for v in values[:-1]], expected)
+    assert np.isclose(values[-1].eval(), np.std(expected) / np.mean(expected))
+
+
+def test_side_files_are_read_once(tmp_path, monkeypatch):
+    recommendations, eval_objects, path, _, _ = _fixture(tmp_path)
+    context = eval_objects.context
+    clustering = context.item_clustering(path)
+    monkeypatch.setattr(pd, "read_csv", lambda *args, **kwargs: pytest.fail("clustering read twice"))
+    assert context.item_clustering(path) is clustering
+    RSP(recommendations, None, None, eval_objects, {"clustering_file": path, "clustering_name": "Pop"})
+
+    assert clustering.n_clusters == 2
+    assert clustering.sizes.tolist() == [4, 3]
+    assert clustering.clusters.tolist() == [0, 1, 0, 1, 0]
+    assert clustering.groups == {0: frozenset({10, 12, 14, 98}), 1: frozenset({11, 13, 99})}
+    assert not clustering.clusters.flags.writeable
@@ -0,0 +1,124 @@
+import logging
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# -- the elliot.recommender package imports the TensorFlow models
+pytest.importorskip("tensorflow")
+
+from elliot.dataset.dataset import DataSet
+from elliot.evaluation.evaluator import Evaluator
+from elliot.recommender.recommender_utils_mixin import RecMixin
+from elliot.recommender.top_k_ranker import get_top_k
+from elliot.utils.recommendations import TopKRecommendations
+
+_metrics = ['nDCG', 'Precision', 'Recall', 'ItemCoverage']
+# -- seeds of the random scores of every epoch: epochs 1 and 3 score the same, a tie
+_epoch_seeds = [3, 1, 2, 1, 5, 4]
+
+
+def _frame(rng, n):
+    return pd.DataFrame({'userId': rng.integers(0, 200, n), 'itemId': rng.integers(0, 300, n),
+                         'rating': rng.integers(1, 6, n).astype(float), 'timestamp': rng.integers(0, 10 ** 6, n)})
+
+
+@pytest.fixture(scope="module")
+def evaluator():
+    rng = np.random.default_rng(0)
+    evaluation = SimpleNamespace(cutoffs=[5, 10], relevance_threshold=0, paired_ttest=True, simple_metrics=_metrics)
+    config = SimpleNamespace(config_test=True, align_side_with_train=False, evaluation=evaluation, top_k=20)
+    data = DataSet(config, (_frame(rng, 6000), _frame(rng, 1000)), None)
+    return Evaluator(data, SimpleNamespace())
+
+
+def _recommendations(data, seed, k):
+    scores = np.random.default_rng(seed).random((data.num_users, data.num_items))
+    items, scores = get_top_k(scores, data.allunrated_mask[0:data.num_users], k)
+    recommendations = TopKRecommendations.from_top_k(data, 0, items, scores)
+    return recommendations, recommendations
+
+
+class _Model(RecMixin):
+    def __init__(self, evaluator, fast, sample=None):
+        self._validation_rate = 1
+        self._fast_validation, self._validation_sample, self._validation_users = fast, sample, None
+        self._monitored_metrics = {10: ['nDCG']}
+        self._validation_k, self._validation_metric = 10, 'nDCG'
+        self._losses, self._results, self._full_results = [], [], {}
+        self._epochs, self._seed = len(_epoch_seeds), 42
+        self._save_recs = self._save_weights = self._optimize_internal_loss = False
+        self._params = SimpleNamespace()
+        self.evaluator = evaluator
+        self.logger = logging.getLogger(__name__)
+        self.requested = []
+        self.results_calls = 0
+
+    def get_recommendations(self, k):
+        self.requested.append(k)
+        return _recommendations(self.evaluator._data, _epoch_seeds[self.epoch], k)
+
+    def get_results(self):
+        # -- AMF and AMR write their perturbation results here: evaluations must not call it
+        self.results_calls += 1
+        return super().get_results()
+
+    def fit(self):
+        for self.epoch in range(self._epochs):
+            self.evaluate(self.epoch, 1.0)
+        return self
+
+
+def test_monitored_metrics_match_the_full_evaluation(evaluator):
+    recommendations = _recommendations(evaluator._data, 1, 10)
+    full = evaluator.eval(_recommendations(evaluator._data, 1, 20))
+    fast = evaluator.eval_monitored(recommendations, {10: ['nDCG'], 5: ['recall']})
+    assert fast[10]['val_results']['nDCG'] == full[10]['val_results']['nDCG']
+    assert fast[5]['val_results'] == {'Recall': full[5]['val_results']['Recall']}
+    assert evaluator.get_monitored_recommendations({10: ['nDCG'], 5: ['recall']}) == 10
+
+
+def test_fast_validation_selects_the_same_checkpoint(evaluator):
+    full, fast = _Model(evaluator, False).fit(), _Model(evaluator, True).fit()
+    assert fast.get_best_arg() == full.get_best_arg()
+    assert fast._params.best_iteration == full._params.best_iteration
+    assert fast.best_metric_value == full.best_metric_value
+    assert fast.get_loss() == full.get_loss()
+    for k in [5, 10]:
+        for split in ['val_results', 'test_results']:
+            assert fast.get_results()[k][split] == full.get_results()[k][split]
+
+
+def test_full_suite_only_on_the_best_checkpoints(evaluator):
+    model = _Model(evaluator, True).fit()
+    monitored = [r[10]['val_results']['nDCG'] for r in model._results]
+    best = [i for i in range(len(monitored)) if np.argmax(monitored[:i + 1]) == i]
+    assert sorted(model._full_results) == best
+    assert model.requested.count(evaluator.get_needed_recommendations()) == len(best)
+    assert model.requested.count(evaluator.get_monitored_recommendations(model._monitored_metrics)) == len(monitored)
+    assert model.results_calls == 0
+    assert set(model.get_results()[5]['test_results']) == set(_metrics)
+
+
+def test_full_results_of_a_fast_evaluation(evaluator):
+    model = _Model(evaluator, True).fit()
+    last = len(model._results) - 1
+    assert set(model._results[last][10]['val_results']) == {'nDCG'}
+    expected = len(model.requested) + (0 if last in model._full_results else 1)
+    results = model.get_full_results(last)
+    assert set(results[10]['test_results']) == set(_metrics)
+    reference = _Model(evaluator, False).fit()._results[last]
+    assert all(results[k][split] == reference[k][split] for k in [5, 10] for split in ['val_results', 'test_results'])
+    # -- evaluated on the full suite at most once, then cached
+    assert model.get_full_results(last) is results
+    assert len(model.requested) == expected
+    assert model.get_full_results() is model._results[last]
+
+
+def test_sampled_validation_users_are_fixed(evaluator):
+    model = _Model(evaluator, True, sample=0.3).fit()
+    users = model.get_validation_users()
+    assert np.array_equal(users, evaluator.sample_monitored_users(0.3, 42))
+    assert len(users) < evaluator._data.num_users
+    assert set(model.get_results()[5]['test_results']) == set(_metrics)
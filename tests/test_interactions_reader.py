@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from elliot.dataset.interactions_reader import IdFactorizer, InteractionsReader
+
+_columns = ["userId", "itemId", "rating", "timestamp"]
+
+
+def _write(path, rows):
+    path.write_text("".join("\t".join(str(value) for value in row) + "\n" for row in rows))
+    return str(path)
+
+
+def _numeric_rows(n=50, seed=0):
+    rng = np.random.default_rng(seed)
+    return [(rng.integers(1, 20), rng.integers(100, 140), rng.integers(1, 6), 1000 + i) for i in range(n)]
+
+
+@pytest.mark.parametrize("chunk_size", [0, 7, 1000])
+def test_numeric_files_get_compact_dtypes(tmp_path, chunk_size):
+    rows = _numeric_rows()
+    data = InteractionsReader(_columns, chunk_size).read(_write(tmp_path / "train.tsv", rows))
+    assert [data[column].dtype for column in _columns] == [np.int32, np.int32, np.float32, np.int64]
+    expected = pd.DataFrame(rows, columns=_columns)
+    assert (data.to_numpy() == expected.to_numpy()).all()
+
+
+def test_chunks_give_the_same_frame_as_whole_files(tmp_path):
+    rows = [(f"u{i % 7}", f"i{i % 11}", 1 + i % 5, i) for i in range(40)]
+    path = _write(tmp_path / "train.tsv", rows)
+    whole = InteractionsReader(_columns).read(path)
+    chunked = InteractionsReader(_columns, chunk_size=6).read(path)
+    pd.testing.assert_frame_equal(whole, chunked)
+
+
+@pytest.mark.parametrize("chunk_size", [0, 3, 4])
+def test_mixed_ids_across_a_chunk_boundary(tmp_path, chunk_size):
+    # -- the first chunk only holds numeric user ids, the second one a string id and the same numeric ids
+    rows = [(1, 10, 5, 0), (2, 11, 4, 1), (3, 10, 3, 2), ("u4", 12, 2, 3), (1, 12, 1, 4), (2, 10, 5, 5)]
+    data = InteractionsReader(_columns, chunk_size).read(_write(tmp_path / "train.tsv", rows))
+    assert data["userId"].tolist() == ["1", "2", "3", "u4", "1", "2"]
+    assert data["userId"].nunique() == 4
+    # -- every occurrence of an id is the same object
+    ones = data["userId"][data["userId"] == "1"]
+    assert ones.iloc[0] is ones.iloc[1]
+    assert data["itemId"].dtype == np.int32
+
+
+def test_string_ids_are_shared_by_the_files_of_a_reader(tmp_path):
+    reader = InteractionsReader(_columns, chunk_size=2)
+    train = reader.read(_write(tmp_path / "train.tsv", [("a", "x", 1, 0), ("b", "y", 1, 1), ("c", "x", 1, 2)]))
+    # -- a numeric id in a later file is the same id as its text in the earlier ones
+    test = reader.read(_write(tmp_path / "test.tsv", [(1, "y", 1, 3), ("b", "x", 1, 4)]))
+    assert test["userId"].tolist() == ["1", "b"]
+    assert test["userId"].iloc[1] is train["userId"].iloc[1]
+    assert test["itemId"].iloc[1] is train["itemId"].iloc[0]
+
+
+def test_missing_timestamps_stay_missing(tmp_path):
+    data = InteractionsReader(_columns, chunk_size=2).read(_write(tmp_path / "train.tsv", [(1, 2, 3), (4, 5, 1)]))
+    assert data["timestamp"].isna().all()
+    assert data["rating"].tolist() == [3, 1]
+
+
+def test_id_factorizer_codes_in_order_of_first_appearance():
+    factorizer = IdFactorizer()
+    codes, ids = factorizer.add(pd.Series(["b", "a", np.nan, "b"], dtype=object))
+    assert codes.tolist() == [0, 1, -1, 0]
+    codes, ids = factorizer.add(pd.Series(["c", "a"], dtype=object))
+    assert codes.tolist() == [2, 1]
+    assert factorizer.uniques.tolist() == ["b", "a", "c"]
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        InteractionsReader(_columns, engine="unknown")
+
+
+def test_pyarrow_reads_mixed_ids_as_pandas(tmp_path):
+    pytest.importorskip("pyarrow")
+    rows = [(i, 10 + i % 3, 1, i) for i in range(30)] + [("u", 10, 1, 30), (0, 11, 1, 31)]
+    path = _write(tmp_path / "train.tsv", rows)
+    expected = InteractionsReader(_columns, chunk_size=8).read(path)
+    data = InteractionsReader(_columns, chunk_size=8, engine="pyarrow").read(path)
+    assert data["userId"].tolist() == expected["userId"].tolist()
+    assert data["itemId"].tolist() == expected["itemId"].tolist()
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import numpy as np
+import scipy.sparse as sp
+
+from elliot.negative_sampling.negative_sampling import NegativeSampler
+
+
+def _positives(n_users=300, n_items=60, density=0.2, seed=0):
+    rng = np.random.default_rng(seed)
+    positives = rng.random((n_users, n_items)) < density
+    # -- users left with a few candidates, or none at all, draw from their complement row
+    positives[0] = np.arange(n_items) < n_items - 3
+    positives[1] = True
+    return sp.csr_matrix(positives)
+
+
+def test_negatives_are_distinct_non_positive_items():
+    positives = _positives()
+    negatives = NegativeSampler.sample_by_random_uniform(positives, 10, np.random.default_rng(1))
+    n_candidates = positives.shape[1] - np.diff(positives.indptr)
+    assert negatives.dtype == bool
+    assert np.array_equal(np.diff(negatives.indptr), np.minimum(n_candidates, 10))
+    assert negatives.multiply(positives).nnz == 0
+    assert negatives[0].indices.tolist() == [57, 58, 59]
+    assert negatives[1].nnz == 0
+
+
+def test_draws_depend_on_the_generator_only():
+    positives = _positives()
+    first = NegativeSampler.sample_by_random_uniform(positives, 10, np.random.default_rng(7))
+    np.random.seed(0)
+    second = NegativeSampler.sample_by_random_uniform(positives, 10, np.random.default_rng(7))
+    other = NegativeSampler.sample_by_random_uniform(positives, 10, np.random.default_rng(8))
+    assert (first != second).nnz == 0
+    assert (first != other).nnz > 0
+
+
+def test_negatives_are_uniform_among_the_candidates():
+    n_users, n_items, k = 20000, 20, 3
+    positives = sp.csr_matrix(np.tile(np.arange(n_items) < 3, (n_users, 1)))
+    negatives = NegativeSampler.sample_by_random_uniform(positives, k, np.random.default_rng(3))
+    frequencies = np.asarray(negatives.sum(axis=0)).ravel()
+    assert frequencies[:3].sum() == 0
+    expected = n_users * k / (n_items - 3)
+    assert np.all(np.abs(frequencies[3:] - expected) < 0.05 * expected)
+
+
+def test_random_strategy_writes_the_negatives_it_samples(tmp_path):
+    n_users, n_items = 40, 30
+    train = _positives(n_users, n_items, 0.1, seed=2)
+    public_users = {100 + u: u for u in range(n_users)}
+    public_items = {500 + i: i for i in range(n_items)}
+    private_users = {u: p for p, u in public_users.items()}
+    private_items = {i: p for p, i in public_items.items()}
+    test = {100 + u: {500 + (u * 7) % n_items: 1.} for u in range(2, n_users)}
+    path = str(tmp_path / "negatives.tsv")
+    config = SimpleNamespace(random_seed=11, negative_sampling=SimpleNamespace(strategy="random", num_items=5,
+                                                                               file_path=path))
+
+    _, negatives = NegativeSampler.sample(config, public_users, public_items, private_users, private_items,
+                                          train, None, test)
+    again = NegativeSampler.sample(config, public_users, public_items, private_users, private_items,
+                                   train, None, test)[1]
+    assert (negatives != again).nnz == 0
+    for u, items in test.items():
+        for i in items:
+            assert not negatives[public_users[u], public_items[i]]
+    assert negatives.multiply(train).nnz == 0
+    assert (NegativeSampler.read_from_files(public_users, public_items, path) != negatives).nnz == 0
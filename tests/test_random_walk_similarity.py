@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+# -- the elliot.recommender package imports the TensorFlow models
+pytest.importorskip("tensorflow")
+
+from sklearn.preprocessing import normalize
+
+from elliot.recommender.graph_based.random_walk_similarity import RandomWalkSimilarity, top_k_columns
+
+
+def _legacy_similarity(train: sp.csr_matrix, k: int, alpha: float, beta: float,
+                       normalize_similarity: bool) -> sp.csr_matrix:
+    """
+    Row loop and per column selection of the legacy RP3beta training.
+    The default argsort is not stable on every numpy build (SIMD sorts), so the reference uses the stable
+    kind on the same keys: the tie order of the legacy code on builds where it is deterministic.
+    """
+    Pui = normalize(train, norm='l1', axis=1)
+    X_bool = train.transpose(copy=True)
+    X_bool.data = np.ones(X_bool.data.size, np.float32)
+    X_bool_sum = np.array(X_bool.sum(axis=1)).ravel()
+    degree = np.zeros(train.shape[1])
+    degree[X_bool_sum != 0.0] = np.power(X_bool_sum[X_bool_sum != 0.0], -beta)
+    Piu = normalize(X_bool, norm='l1', axis=1)
+    if alpha != 1.:
+        Pui, Piu = Pui.power(alpha), Piu.power(alpha)
+
+    rows, cols, values = [], [], []
+    similarity = (Piu * Pui).toarray()
+    for item in range(train.shape[1]):
+        row_data = np.multiply(similarity[item, :], degree)
+        row_data[item] = 0
+        best = row_data.argsort(kind="stable")[::-1][:k]
+        non_zero = row_data[best] != 0.0
+        rows.extend([item] * int(non_zero.sum()))
+        cols.extend(best[non_zero])
+        values.extend(row_data[best][non_zero])
+    W = sp.csr_matrix((np.array(values, dtype=np.float32), (rows, cols)), shape=(train.shape[1],) * 2)
+    if normalize_similarity:
+        W = normalize(W, norm='l1', axis=1)
+    W = W.tocsc()
+
+    data, rows_indices, indptr = [], [], []
+    for item in range(train.shape[1]):
+        indptr.append(len(data))
+        column_data = W.data[W.indptr[item]:W.indptr[item + 1]]
+        column_rows = W.indices[W.indptr[item]:W.indptr[item + 1]]
+        non_zero = column_data != 0
+        top = np.argsort(column_data[non_zero], kind="stable")[-k:]
+        data.extend(column_data[non_zero][top])
+        rows_indices.extend(column_rows[non_zero][top])
+    indptr.append(len(data))
+    return sp.csc_matrix((data, rows_indices, indptr), shape=W.shape, dtype=np.float32).tocsr()
+
+
+def _train(seed=0, n_users=12, n_items=14):
+    rng = np.random.default_rng(seed)
+    # -- few binary interactions: many equal transition probabilities, i.e. ties at the top-k threshold
+    return sp.csr_matrix((rng.random((n_users, n_items)) < 0.25).astype(np.float32))
+
+
+@pytest.mark.parametrize("k", [1, 3, 13, 20])
+@pytest.mark.parametrize("alpha, beta", [(1., 0.), (0.8, 0.5)])
+@pytest.mark.parametrize("normalize_similarity", [False, True])
+def test_matches_the_legacy_similarity(k, alpha, beta, normalize_similarity):
+    train = _train()
+    expected = _legacy_similarity(train, k, alpha, beta, normalize_similarity)
+    computed = RandomWalkSimilarity(train, k, alpha, beta, workers=3, block_size=4).compute()
+    if normalize_similarity:
+        computed = normalize(computed, norm='l1', axis=1)
+    computed = top_k_columns(computed, k)
+    assert computed.shape == expected.shape
+    assert (abs(computed - expected) > 1e-6).nnz == 0
+    # -- the same entries are kept, not only entries with the same values
+    assert ((computed != 0) != (expected != 0)).nnz == 0
+
+
+def test_rows_keep_at_most_k_entries_without_self_loops():
+    train = _train(1, 30, 25)
+    similarity = RandomWalkSimilarity(train, 4, beta=0.3, workers=2, block_size=6).compute()
+    assert np.diff(similarity.indptr).max() <= 4
+    assert similarity.diagonal().sum() == 0
+
+
+@pytest.mark.parametrize("k", [2, 7, 40])
+def test_ties_at_the_kth_value_keep_the_highest_items(k):
+    # -- a larger sparse binary matrix: most rows tie on the k-th value, many of them with a few non-zeros
+    train = _train(3, 80, 120)
+    expected = _legacy_similarity(train, k, 1., 0., False)
+    computed = top_k_columns(RandomWalkSimilarity(train, k, workers=2, block_size=16).compute(), k)
+    assert ((computed != 0) != (expected != 0)).nnz == 0
+    assert (abs(computed - expected) > 1e-6).nnz == 0
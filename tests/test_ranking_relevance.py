@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from elliot.evaluation.relevance.ranking_relevance import RankingRelevance, RelevanceMatrix
+from elliot.utils.recommendations import TopKRecommendations
+
+
+def _data(n_users=2, n_items=6):
+    private_users = {u: u for u in range(n_users)}
+    private_items = {i: i for i in range(n_items)}
+    return SimpleNamespace(private_users=private_users, private_items=private_items,
+                           public_users=dict(private_users), public_items=dict(private_items),
+                           num_users=n_users, num_items=n_items)
+
+
+def _relevance():
+    data = _data()
+    # -- user 0: items 1 (gain 5) and 3 (gain 2, under the threshold), user 1: item 5 and an unknown item
+    test = {0: {1: 5., 3: 2.}, 1: {5: 4., 99: 5.}}
+    matrix = RelevanceMatrix(test, 3, data)
+    recs = TopKRecommendations(np.array([0, 1]), np.array([[0, 1, 3], [5, 2, -1]]),
+                               np.array([[3., 2., 1.], [2., 1., -np.inf]]), data.private_users, data.private_items)
+    return RankingRelevance(recs, matrix), matrix
+
+
+def test_hits_and_counts():
+    ranking, matrix = _relevance()
+    np.testing.assert_array_equal(ranking.hit_matrix, [[False, True, False], [True, False, False]])
+    np.testing.assert_array_equal(matrix.n_rated, [2, 2])
+    np.testing.assert_array_equal(matrix.n_relevant, [1, 2])
+    np.testing.assert_array_equal(ranking.hits(1), [0, 1])
+    np.testing.assert_array_equal(ranking.hits(3), [1, 1])
+
+
+def test_accuracy_metrics():
+    ranking, _ = _relevance()
+    np.testing.assert_allclose(ranking.precision(2), [.5, .5])
+    np.testing.assert_allclose(ranking.recall(3), [1., .5])
+    np.testing.assert_allclose(ranking.hit_rate(1), [0., 1.])
+    np.testing.assert_allclose(ranking.reciprocal_rank(3), [.5, 1.])
+    np.testing.assert_allclose(ranking.f_score(2), [2 * .5 * 1 / 1.5, 2 * .5 * .5 / 1.])
+
+
+def test_ndcg_uses_gains_and_ideal_ranking():
+    ranking, _ = _relevance()
+    discounts = np.log(2) / np.log(np.arange(3) + 2)
+    # -- user 0 ranks gains (0, 5, 2), ideally (5, 2); user 1 ranks (4, 0), ideally (5, 4)
+    dcg = np.array([5 * discounts[1] + 2 * discounts[2], 4 * discounts[0]])
+    idcg = np.array([5 * discounts[0] + 2 * discounts[1], 5 * discounts[0] + 4 * discounts[1]])
+    np.testing.assert_allclose(ranking.ndcg(3), dcg / idcg)
+
+
+def test_cutoff_longer_than_the_lists():
+    ranking, _ = _relevance()
+    np.testing.assert_array_equal(ranking.hits(10), ranking.hits(3))
+    np.testing.assert_allclose(ranking.precision(10), [.1, .1])
+
+
+def test_expected_novelty():
+    ranking, _ = _relevance()
+    novelty = np.arange(6, dtype=float)
+    discounts = np.log(2) / np.log(np.arange(3) + 2)
+    expected = [discounts[1] * 1 / discounts.sum(), discounts[0] * 5 / discounts[:2].sum()]
+    np.testing.assert_allclose(ranking.expected_novelty(3, novelty), expected)
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from elliot.utils.recommendations import TopKRecommendations, merge_recommendations
+
+
+def _data(n_users=3, n_items=5):
+    private_users = {u: f"u{u}" for u in range(n_users)}
+    private_items = {i: 100 + i for i in range(n_items)}
+    return SimpleNamespace(private_users=private_users, private_items=private_items,
+                           public_users={v: k for k, v in private_users.items()},
+                           public_items={v: k for k, v in private_items.items()})
+
+
+def test_from_top_k_pads_non_candidates():
+    data = _data()
+    items = np.array([[3, 1, 0], [2, 4, 1]])
+    scores = np.array([[.9, .5, -np.inf], [.8, .7, .1]])
+    recs = TopKRecommendations.from_top_k(data, 1, items, scores)
+    np.testing.assert_array_equal(recs.users, [1, 2])
+    np.testing.assert_array_equal(recs.lengths, [2, 3])
+    assert recs["u1"] == [(103, np.float32(.9)), (101, np.float32(.5))]
+    assert list(recs) == ["u1", "u2"]
+    assert recs.k == 3 and len(recs) == 2
+
+
+def test_legacy_dictionary_round_trip():
+    data = _data()
+    legacy = {"u0": [(102, 3.), (100, 2.)], "u2": [(104, 1.)], "unknown": [(100, 1.)]}
+    recs = TopKRecommendations.from_dict(legacy, data)
+    assert TopKRecommendations.from_dict(recs, data) is recs
+    assert recs.to_dict() == {"u0": [(102, 3.), (100, 2.)], "u2": [(104, 1.)]}
+    assert dict(recs.items()) == recs.to_dict()
+
+
+def test_top_select_and_gather():
+    data = _data()
+    recs = TopKRecommendations.from_top_k(data, 0, np.array([[4, 2, 0], [1, 3, 2]]),
+                                          np.array([[3., 2., 1.], [3., 2., 1.]]))
+    np.testing.assert_array_equal(recs.top(2).item_ids, [[4, 2], [1, 3]])
+    np.testing.assert_array_equal(recs.select_users(np.array([False, True])).users, [1])
+
+    kept = recs.select(np.array([[True, False, True], [False, True, True]]))
+    np.testing.assert_array_equal(kept.item_ids, [[4, 0, -1], [3, 2, -1]])
+    np.testing.assert_array_equal(kept.scores[:, 2], [-np.inf, -np.inf])
+
+    values = np.arange(5) * 10
+    np.testing.assert_array_equal(kept.gather(values, fill=-1), [[40, 0, -1], [30, 20, -1]])
+    assert kept.user_values([1, 2]) == {"u0": 1, "u1": 2}
+
+
+def test_merge_recommendations():
+    data = _data()
+    first = TopKRecommendations.from_top_k(data, 0, np.array([[1]]), np.array([[1.]]))
+    second = TopKRecommendations.from_top_k(data, 1, np.array([[2, 3]]), np.array([[2., 1.]]))
+    merged = merge_recommendations([first, second])
+    np.testing.assert_array_equal(merged.item_ids, [[1, -1], [2, 3]])
+    assert merge_recommendations([{"u0": [(101, 1.)]}, {"u1": []}]) == {"u0": [(101, 1.)], "u1": []}
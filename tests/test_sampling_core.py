@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from elliot.dataset.samplers.sampling_core import SamplingCore, prefetch
+
+
+def _ratings():
+    # -- user 2 rated every item and user 3 none of them: neither can be sampled
+    return {0: {1: 5., 4: 3.}, 1: {0: 1.}, 2: {i: 1. for i in range(6)}, 3: {}, 4: {5: 2., 2: 4., 3: 1.}}
+
+
+def test_csr_structure():
+    core = SamplingCore(_ratings())
+    assert core.n_users == 5 and core.n_items == 6
+    np.testing.assert_array_equal(core.indptr, [0, 2, 3, 9, 9, 12])
+    np.testing.assert_array_equal(core.indices[9:12], [2, 3, 5])
+    positions = core.sample_positions(np.array([4, 4, 0]))
+    assert np.all((positions >= np.array([9, 9, 0])) & (positions < np.array([12, 12, 2])))
+    np.testing.assert_array_equal(core.ratings_at(np.array([9, 10, 11])), [4., 1., 2.])
+
+
+def test_training_matrix_and_dict_give_the_same_core():
+    ratings = _ratings()
+    rows = [u for u, row in ratings.items() for _ in row]
+    cols = [i for row in ratings.values() for i in row]
+    values = [r for row in ratings.values() for r in row.values()]
+    matrix = sp.csr_matrix((values, (rows, cols)), shape=(5, 6))
+    # -- a matrix with unsorted rows is sorted on a copy, the one of the DataSet is left as it is
+    matrix.indices[9:12], matrix.data[9:12] = [5, 2, 3], [2., 4., 1.]
+    matrix.has_sorted_indices = False
+    from_matrix, from_dict = SamplingCore(matrix, seed=3), SamplingCore(ratings, seed=3)
+    np.testing.assert_array_equal(matrix.indices[9:12], [5, 2, 3])
+    np.testing.assert_array_equal(from_matrix.indptr, from_dict.indptr)
+    np.testing.assert_array_equal(from_matrix.indices, from_dict.indices)
+    positions = np.arange(12)
+    np.testing.assert_array_equal(from_matrix.ratings_at(positions), from_dict.ratings_at(positions))
+    users = from_matrix.sample_users(50)
+    np.testing.assert_array_equal(users, from_dict.sample_users(50))
+    np.testing.assert_array_equal(from_matrix.sample_negatives(users), from_dict.sample_negatives(users))
+
+
+def test_sampled_users_and_triples_are_valid():
+    ratings = _ratings()
+    core = SamplingCore(ratings, seed=7)
+    users = core.sample_users(2000)
+    assert set(users.tolist()) == {0, 1, 4}
+    positives = core.sample_positives(users)
+    negatives = core.sample_negatives(users)
+    for u, i, j in zip(users.tolist(), positives.tolist(), negatives.tolist()):
+        assert i in ratings[u] and j not in ratings[u]
+    np.testing.assert_array_equal(core.is_positive(users, positives), np.ones(len(users), dtype=bool))
+    assert not core.is_positive(users, negatives).any()
+
+
+def test_negatives_are_uniform_over_the_unrated_items():
+    core = SamplingCore(_ratings(), seed=0)
+    negatives = core.sample_negatives(np.zeros(6000, dtype=np.int64))
+    counts = np.bincount(negatives, minlength=6)
+    assert counts[1] == counts[4] == 0
+    np.testing.assert_allclose(counts[[0, 2, 3, 5]] / 6000, 0.25, atol=0.03)
+
+
+def test_user_items_and_seeded_draws():
+    core = SamplingCore(_ratings(), seed=3)
+    rows, items = core.user_items(np.array([4, 0]))
+    np.testing.assert_array_equal(rows, [0, 0, 0, 1, 1])
+    np.testing.assert_array_equal(items, [2, 3, 5, 1, 4])
+    again = SamplingCore(_ratings(), seed=3)
+    np.testing.assert_array_equal(core.sample_users(50), again.sample_users(50))
+
+
+def test_prefetch_keeps_the_order_and_the_errors():
+    assert list(prefetch(iter(range(20)), depth=3)) == list(range(20))
+    assert list(prefetch(range(5))) == list(range(5))
+
+    def failing():
+        yield 1
+        raise RuntimeError("broken batch")
+
+    batches = prefetch(failing(), depth=2)
+    assert next(batches) == 1
+    with pytest.raises(RuntimeError, match="broken batch"):
+        next(batches)
@@ -0,0 +1,29 @@
+import time
+
+import numpy as np
+
+from elliot.utils.scheduler import JobScheduler, available_memory
+
+
+def _score(shared, job):
+    seed, size = job
+    # -- later jobs finish first, results must still come back in job order
+    time.sleep(0.01 * (4 - seed))
+    return float(np.random.RandomState(seed).random_sample(size).dot(shared))
+
+
+def test_parallel_run_matches_serial_run():
+    shared = np.arange(5, dtype=float)
+    jobs = [(seed, 5) for seed in range(4)]
+    completed = {}
+    results = JobScheduler(2).map(_score, jobs, shared, callback=completed.__setitem__)
+    serial = [_score(shared, job) for job in jobs]
+    assert results == serial
+    assert completed == dict(enumerate(serial))
+
+
+def test_workers_are_capped_by_the_memory_budget():
+    assert JobScheduler(0).workers == 1
+    assert JobScheduler(3).workers == 3
+    # -- a budget larger than the machine leaves room for a single worker
+    assert JobScheduler(8, memory_budget=10 ** 9).workers == (1 if available_memory() else 8)
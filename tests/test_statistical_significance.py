@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from elliot.evaluation.statistical_significance import PairedTTest, UserValues, WilcoxonTest
+
+
+def _legacy_p_values(arr_0, arr_1):
+    """Dict-based tests of the per user {public user: value} results"""
+    users = list(arr_0.keys() & arr_1.keys())
+    list_0, list_1 = list(map(arr_0.get, users)), list(map(arr_1.get, users))
+    wilcoxon = stats.wilcoxon(list_0, list_1)[1] if any(np.array(list_0) - np.array(list_1)) else np.nan
+    return stats.ttest_rel(list_0, list_1)[1], wilcoxon
+
+
+def _user_values(seed=0, n=300):
+    rng = np.random.default_rng(seed)
+    # -- metric averages of few recommended items: their differences are close, but not equal, in float64
+    values_0 = rng.integers(0, 6, n) / 5 + rng.integers(0, 4, n) / 3
+    values_1 = values_0 + rng.choice([-0.1, 0.1, 0.2], n) + rng.integers(0, 3, n) * 1e-9
+    public = {f"u{u}": u for u in range(n + 20)}
+    arr_0 = {f"u{u}": v for u, v in enumerate(values_0.tolist())}
+    # -- the second model misses some users and has a few others
+    arr_1 = {f"u{u + 10}": v for u, v in enumerate(values_1.tolist())}
+    return arr_0, arr_1, public
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_p_values_match_the_dict_based_tests(seed):
+    arr_0, arr_1, public = _user_values(seed)
+    expected_t, expected_w = _legacy_p_values(arr_0, arr_1)
+    values_0, values_1 = UserValues.from_dict(arr_0, public), UserValues.from_dict(arr_1, public)
+    users = WilcoxonTest.common_users(values_0, values_1)
+    assert len(users) == len(arr_0.keys() & arr_1.keys())
+    assert WilcoxonTest.compare(values_0, values_1, users) == pytest.approx(expected_w, rel=1e-12)
+    assert PairedTTest.compare(values_0, values_1, users) == pytest.approx(expected_t, rel=1e-12)
+
+
+def test_values_are_kept_in_float64_and_sorted_by_user():
+    values = UserValues([3, 0, 2], [0.1 + 0.2, 1 / 3, 2 / 3])
+    assert values.values.dtype == np.float64
+    assert values.users.tolist() == [0, 2, 3]
+    assert values.values_of(np.array([0, 3])).tolist() == [1 / 3, 0.1 + 0.2]
+
+
+def test_identical_results_have_no_wilcoxon_p_value():
+    arr_0, _, public = _user_values()
+    values = UserValues.from_dict(arr_0, public)
+    assert np.isnan(WilcoxonTest.compare(values, values, values.users))
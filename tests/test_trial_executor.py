@@ -0,0 +1,56 @@
+from collections import Counter
+
+import numpy as np
+from hyperopt import STATUS_OK, Trials, base, hp, tpe
+
+from elliot.hyperoptimization.trial_executor import ParallelTrialExecutor
+
+_startup = 20
+
+
+class _Coordinator(object):
+    model_config_index = None
+
+    def objective(self, config):
+        return {"loss": (config["x"] - 3) ** 2 + abs(config["y"]), "status": STATUS_OK}
+
+
+class _RecordingTPE(object):
+    """tpe.suggest, recording the number of finished trials and the trials returned at every call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, new_ids, domain, trials, seed):
+        docs = tpe.suggest(new_ids, domain, trials, seed, n_startup_jobs=_startup)
+        finished = sum(trial["state"] == base.JOB_STATE_DONE for trial in trials.trials)
+        self.calls.append((finished, len(docs)))
+        return docs
+
+
+def _search(workers, max_evals, seed):
+    algo = _RecordingTPE()
+    space = {"x": hp.uniform("x", -10, 10), "y": hp.uniform("y", -1, 1)}
+    trials = ParallelTrialExecutor(_Coordinator(), workers).fmin(space, algo, max_evals, Trials(),
+                                                                 np.random.default_rng(seed))
+    return trials, algo.calls
+
+
+def test_tpe_batches_stay_full_after_the_startup_trials():
+    trials, calls = _search(4, 34, 42)
+    assert len(trials) == 34
+    assert all(trial["state"] == base.JOB_STATE_DONE for trial in trials.trials)
+    assert all(returned == 1 for _, returned in calls)
+    # -- the calls of a batch all see the same finished trials: batches of 4 past the 20 startup trials too
+    batches = Counter(finished for finished, _ in calls)
+    assert [batches[finished] for finished in sorted(batches)] == [4] * 8 + [2]
+    assert max(batches) > _startup
+
+
+def test_search_is_determined_by_rstate():
+    first, _ = _search(3, 26, 7)
+    second, _ = _search(3, 26, 7)
+    other, _ = _search(3, 26, 8)
+    assert [t["misc"]["vals"] for t in first.trials] == [t["misc"]["vals"] for t in second.trials]
+    assert first.losses() == second.losses()
+    assert [t["misc"]["vals"] for t in first.trials] != [t["misc"]["vals"] for t in other.trials]